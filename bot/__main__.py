@@ -1,5 +1,11 @@
 import asyncio
+import sys
 
-from bot.main import run
+if len(sys.argv) > 1:
+    from bot.cli import main
 
-asyncio.run(run())
+    main()
+else:
+    from bot.main import run
+
+    asyncio.run(run())
@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+from web3 import Web3
+
+from bot.cache import strategy_names
+from bot.config import BASE_STRATEGY_ABI, NETWORK_RPC_ENVS, network_cfg, w3_contract
+from bot.governor import govern
+from bot.risk import RISK_THRESHOLDS, RiskThresholds, breached_thresholds, risk_calls, risk_snapshot
+from bot.rpc import RpcBatch, RpcError
+
+# =============================================================================
+# Threshold Backtest
+# =============================================================================
+#
+# Replays the risk-check reads plus tendTrigger() for every configured strategy at sampled historical
+# blocks (eth_call at a block tag, so this needs an archive node). Blocks are fetched in parallel, one
+# JSON-RPC batch each. Every block's results are cached to disk, so a rerun with other thresholds makes
+# no requests. Alerts fire on transitions, so the report counts episodes (a strategy entering breach)
+# next to the share of sampled blocks spent in breach. Strategies are today's config, and blocks from
+# before a strategy was deployed read as "no position".
+#
+#   python -m bot.backtest --network ethereum --from-block 21000000 --step 300 --liquidation-distance 0.08
+
+BACKTEST_CACHE_DIR = os.getenv("BACKTEST_CACHE_DIR", "backtest_cache")
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", "8"))
+BACKTEST_STEP = int(os.getenv("BACKTEST_STEP", "300"))  # ~1 hour of mainnet blocks
+
+FLAGS = ("warning", "liquidation", "leverage", "tend")
+
+
+def _call_key(fn: Any) -> str:
+    return f"{str(fn.address).lower()}.{fn.fn_name}"
+
+
+def _read_block(w3: Web3, network_key: str, calls: Sequence[Any], block: int) -> dict[str, Any]:
+    """Values of `calls` at `block` (None where the read failed), from the disk cache where possible. Only
+    answers the chain gave are cached: a revert or undecodable return data is stored as None, a node
+    error is returned as None but left out of the cache so the next run asks again."""
+    path = os.path.join(BACKTEST_CACHE_DIR, network_key, f"{block}.json")
+    try:
+        with open(path) as f:
+            cached: dict[str, Any] = json.load(f)
+    except FileNotFoundError:
+        cached = {}
+
+    missing = [fn for fn in calls if _call_key(fn) not in cached]
+    if not missing:
+        return cached
+
+    batch = RpcBatch(w3, block)
+    for fn in missing:
+        batch.call(fn)
+    failed: dict[str, Any] = {}
+    for fn, value in zip(missing, batch.execute(return_exceptions=True)):
+        if isinstance(value, RpcError) and not value.reverted:
+            print(f"{_call_key(fn)} at block {block}: {value}")
+            failed[_call_key(fn)] = None
+            continue
+        if isinstance(value, Exception):
+            value = None
+        elif isinstance(value, tuple):  # tendTrigger() -> (bool, bytes)
+            value = bool(value[0])
+        cached[_call_key(fn)] = value
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(cached, f)
+    return cached | failed
+
+
+def backtest(
+    w3: Web3, network_key: str, blocks: Sequence[int], thresholds: RiskThresholds, workers: int = BACKTEST_WORKERS
+) -> tuple[list[str], dict[str, npt.NDArray[np.bool_]]]:
+    """(strategies, flag -> (blocks, strategies) bool array of when each threshold was breached)."""
+    net_cfg = network_cfg(network_key)
+    lb_addrs = list(net_cfg["lender_borrowers"]) + list(net_cfg["liquity_lender_borrowers"].keys())
+    looper_addrs = (
+        list(net_cfg["morpho_loopers"])
+        + list(net_cfg["aave_loopers"])
+        + list(net_cfg["flex_loopers"])
+        + list(net_cfg["pawnbroker_loopers"])
+    )
+    addrs = lb_addrs + looper_addrs
+    calls = risk_calls(w3, lb_addrs, looper_addrs)
+    tend_calls = [w3_contract(w3, a, BASE_STRATEGY_ABI).functions.tendTrigger() for a in addrs]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backtest") as pool:
+        per_block = list(pool.map(lambda b: _read_block(w3, network_key, calls + tend_calls, b), blocks))
+
+    fired = {flag: np.zeros((len(blocks), len(addrs)), dtype=np.bool_) for flag in FLAGS}
+    for i, values in enumerate(per_block):
+        raw = [values[_call_key(fn)] for fn in calls]
+        snapshot = risk_snapshot(lb_addrs, looper_addrs, [np.nan if v is None else v for v in raw])
+        for j, flags in enumerate(breached_thresholds(snapshot, thresholds)):
+            for flag in flags:
+                fired[flag][i, j] = True
+        fired["tend"][i] = [bool(values[_call_key(fn)]) for fn in tend_calls]
+    return addrs, fired
+
+
+def backtest_lines(names: Sequence[str], fired: dict[str, npt.NDArray[np.bool_]]) -> list[str]:
+    lines = []
+    for flag, breached in fired.items():
+        n_blocks = max(breached.shape[0], 1)
+        # an episode starts wherever a strategy goes from not breached to breached
+        starts = breached & ~np.vstack([np.zeros((1, breached.shape[1]), dtype=np.bool_), breached[:-1]])
+        lines.append(
+            f"{flag}: {int(starts.sum())} alerts, "
+            f"{breached.any(axis=1).sum() / n_blocks * 100:.1f}% of sampled blocks with a breach"
+        )
+        for name, episodes, share in zip(names, starts.sum(axis=0), breached.mean(axis=0)):
+            if episodes:
+                lines.append(f"  {name}: {int(episodes)} alerts, in breach {share * 100:.1f}% of the time")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backtest risk alert thresholds over historical blocks")
+    parser.add_argument("--network", default=os.getenv("NETWORK", "ethereum"))
+    parser.add_argument("--from-block", type=int, required=True)
+    parser.add_argument("--to-block", type=int, help="defaults to the latest block")
+    parser.add_argument("--step", type=int, default=BACKTEST_STEP, help="blocks between samples")
+    parser.add_argument("--workers", type=int, default=BACKTEST_WORKERS)
+    parser.add_argument("--warning-headroom", type=float, default=RISK_THRESHOLDS.min_warning_headroom)
+    parser.add_argument("--liquidation-distance", type=float, default=RISK_THRESHOLDS.min_liquidation_distance)
+    parser.add_argument("--leverage-utilization", type=float, default=RISK_THRESHOLDS.max_leverage_utilization)
+    args = parser.parse_args()
+
+    rpc_url = os.environ.get(NETWORK_RPC_ENVS.get(args.network, "RPC_URL"), "") or os.environ["RPC_URL"]
+    w3 = govern(Web3(Web3.HTTPProvider(rpc_url)), args.network)
+    to_block = args.to_block if args.to_block is not None else w3.eth.block_number
+    blocks = list(range(args.from_block, to_block + 1, args.step))
+    if not blocks:
+        parser.error("empty block range")
+    thresholds = RiskThresholds(args.warning_headroom, args.liquidation_distance, args.leverage_utilization)
+
+    addrs, fired = backtest(w3, args.network, blocks, thresholds, args.workers)
+    names = strategy_names(w3, args.network, addrs)
+    print(f"{args.network}: {len(addrs)} strategies, {len(blocks)} blocks ({blocks[0]}..{blocks[-1]})")
+    print("\n".join(backtest_lines(names, fired)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Mapping, Sequence
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+from eth_abi.abi import decode
+from web3 import Web3
+
+from bot.config import MULTICALL3_ABI, MULTICALL3_ADDRESS, TOKENIZED_STRATEGY_ABI, w3_contract
+
+# =============================================================================
+# Block-Keyed Read Cache
+# =============================================================================
+#
+# Reads are keyed by (network, block number, call) and the multicall is pinned to that block. Concurrent
+# requests for the same read at the same block share one in-flight multicall (single-flight), and entries
+# for a network are dropped as soon as a newer block is observed, so results never outlive the block they
+# were read at.
+# Both the bot loop and the Telegram listener thread go through here, hence the threading primitives.
+
+BLOCK_NUMBER_TTL = float(os.getenv("BLOCK_NUMBER_TTL", "2"))  # seconds between eth_blockNumber polls
+
+ReadKey = tuple[str, int, tuple[str, str, str]]
+
+_lock = threading.Lock()
+# network -> (fetched_at, block_number)
+_block_numbers: dict[str, tuple[float, int]] = {}
+_block_fetches: dict[str, Future[int]] = {}
+# a done future is a cached result; a pending one is an in-flight read
+_reads: dict[ReadKey, Future[Any]] = {}
+
+
+def _call_key(call: Any) -> tuple[str, str, str]:
+    return (str(call.address).lower(), str(call.fn_name), repr(call.args))
+
+
+def _evict_older_blocks(network_key: str, block: int) -> None:
+    stale = [key for key in _reads if key[0] == network_key and key[1] < block]
+    for key in stale:
+        del _reads[key]
+    _block_read_stats.evictions += len(stale)
+
+
+def current_block(w3: Web3, network_key: str) -> int:
+    """Latest block number for a network, polled at most once per BLOCK_NUMBER_TTL."""
+    with _lock:
+        cached = _block_numbers.get(network_key)
+        if cached is not None and time.monotonic() - cached[0] < BLOCK_NUMBER_TTL:
+            return cached[1]
+        fetch = _block_fetches.get(network_key)
+        owner = fetch is None
+        if fetch is None:
+            fetch = _block_fetches[network_key] = Future()
+
+    if not owner:
+        return fetch.result()
+
+    try:
+        block = int(w3.eth.block_number)
+    except Exception as e:
+        with _lock:
+            del _block_fetches[network_key]
+        fetch.set_exception(e)
+        raise
+
+    with _lock:
+        previous = _block_numbers.get(network_key)
+        if previous is None or block >= previous[1]:
+            _block_numbers[network_key] = (time.monotonic(), block)
+            _evict_older_blocks(network_key, block)
+        del _block_fetches[network_key]
+    fetch.set_result(block)
+    return block
+
+
+def _multicall_at(w3: Web3, calls: Sequence[Any], block: int) -> list[Any]:
+    # tinybot's multicall() run at `block` instead of "latest", decoded the same way
+    mc = w3_contract(w3, MULTICALL3_ADDRESS, MULTICALL3_ABI)
+    encoded = [(call.address, False, call._encode_transaction_data()) for call in calls]
+    decoded = []
+    for call, (_, data) in zip(calls, mc.functions.aggregate3(encoded).call(block_identifier=block)):
+        result = decode([output["type"] for output in call.abi["outputs"]], data)
+        decoded.append(result[0] if len(result) == 1 else result)
+    return decoded
+
+
+def cached_multicall(w3: Web3, network_key: str, calls: Sequence[Any]) -> list[Any]:
+    """Drop-in for `multicall(w3, calls)` that shares reads at the current block."""
+    if not calls:
+        return []
+
+    block = current_block(w3, network_key)
+    keys: list[ReadKey] = [(network_key, block, _call_key(call)) for call in calls]
+
+    owned: list[int] = []
+    futures: list[Future[Any]] = []
+    with _lock:
+        for i, key in enumerate(keys):
+            future = _reads.get(key)
+            if future is None:
+                future = _reads[key] = Future()
+                owned.append(i)
+            futures.append(future)
+        _block_read_stats.hits += len(calls) - len(owned)
+        _block_read_stats.misses += len(owned)
+
+    if owned:
+        try:
+            results = _multicall_at(w3, [calls[i] for i in owned], block)
+        except Exception as e:
+            with _lock:
+                for i in owned:
+                    _reads.pop(keys[i], None)
+            for i in owned:
+                futures[i].set_exception(e)
+            raise
+        for i, result in zip(owned, results):
+            futures[i].set_result(result)
+
+    return [future.result() for future in futures]
+
+
+# =============================================================================
+# Bounded Caches
+# =============================================================================
+#
+# Everything else the bot keeps between runs lives in named namespaces: LRU, capped by entry count and
+# optionally by estimated bytes, with an optional TTL. Entry sizes are estimated once when stored (a
+# recursive getsizeof over builtin containers, so client objects only count their shell), which keeps
+# the accounting approximate but free on reads. Each namespace counts hits, misses and evictions, and
+# cache_lines() reports them next to the block-keyed reads above, so it's visible which caches pay off.
+
+STRATEGY_NAME_TTL = float(os.getenv("STRATEGY_NAME_TTL", "3600"))  # seconds a strategy name is reused
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0  # dropped for space or expired
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def _sizeof(obj: Any, depth: int = 4) -> int:
+    size = sys.getsizeof(obj)
+    if depth <= 0:
+        return size
+    if isinstance(obj, dict):
+        return size + sum(_sizeof(k, depth - 1) + _sizeof(v, depth - 1) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(_sizeof(item, depth - 1) for item in obj)
+    return size
+
+
+class CacheNamespace(Generic[K, V]):
+    def __init__(self, name: str, max_entries: int, ttl: float | None = None, max_bytes: int | None = None) -> None:
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self.bytes = 0
+        # key -> (stored_at, size, value), least recently used first
+        self._entries: OrderedDict[K, tuple[float, int, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, key: K) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[0] > self.ttl:
+                self._drop(key)
+                self.stats.evictions += 1
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[2]
+
+    def set(self, key: K, value: V) -> None:
+        size = _sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic(), size, value)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.bytes > self.max_bytes and len(self._entries) > 1
+            ):
+                self._drop(next(iter(self._entries)))
+                self.stats.evictions += 1
+
+    def pop(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._drop(key)
+            return entry[2]
+
+    def get_or_load(self, key: K, load: Callable[[], V]) -> V:
+        value = self.get(key)
+        if value is None:
+            value = load()
+            self.set(key, value)
+        return value
+
+
+_namespaces: dict[str, CacheNamespace[Any, Any]] = {}
+_block_read_stats = CacheStats()
+
+
+def cache_namespace(
+    name: str, max_entries: int, ttl: float | None = None, max_bytes: int | None = None
+) -> CacheNamespace[Any, Any]:
+    """The namespace called `name`, created on first use. Settings of later calls are ignored."""
+    with _lock:
+        if name not in _namespaces:
+            _namespaces[name] = CacheNamespace(name, max_entries, ttl, max_bytes)
+        return _namespaces[name]
+
+
+def _stats_text(stats: CacheStats) -> str:
+    return f"{stats.hits} hits / {stats.misses} misses ({stats.hit_rate * 100:.0f}%), {stats.evictions} evicted"
+
+
+def cache_lines() -> list[str]:
+    """One line per cache, for /cache and the periodic log."""
+    with _lock:
+        namespaces = sorted(_namespaces.items())
+        reads = [f.result() for f in _reads.values() if f.done() and f.exception() is None]
+    lines = [
+        f"block_reads: {len(reads)} entries, ~{sum(_sizeof(r) for r in reads) / 1024:.0f} KiB, "
+        f"{_stats_text(_block_read_stats)}"
+    ]
+    for name, ns in namespaces:
+        lines.append(f"{name}: {len(ns)}/{ns.max_entries} entries, ~{ns.bytes / 1024:.0f} KiB, {_stats_text(ns.stats)}")
+    return lines
+
+
+_strategy_names: CacheNamespace[tuple[str, str], str] = cache_namespace(
+    "strategy_names", max_entries=2048, ttl=STRATEGY_NAME_TTL
+)
+
+
+def known_strategy_names(network_key: str, addrs: Sequence[str]) -> dict[str, str]:
+    """Lowercased strategy -> name() for the strategies whose name is cached and still fresh."""
+    names = {a.lower(): _strategy_names.get((network_key, a.lower())) for a in addrs}
+    return {addr: name for addr, name in names.items() if name is not None}
+
+
+def remember_strategy_names(network_key: str, names: Mapping[str, str]) -> None:
+    for addr, name in names.items():
+        _strategy_names.set((network_key, addr.lower()), str(name))
+
+
+def strategy_names(w3: Web3, network_key: str, addrs: Sequence[str]) -> list[str]:
+    """name() of each strategy, re-read at most once per STRATEGY_NAME_TTL."""
+    names = known_strategy_names(network_key, addrs)
+    missing = list(dict.fromkeys(a for a in addrs if a.lower() not in names))
+    if missing:
+        fetched = cached_multicall(
+            w3, network_key, [w3_contract(w3, a, TOKENIZED_STRATEGY_ABI).functions.name() for a in missing]
+        )
+        fetched_names = {addr.lower(): str(name) for addr, name in zip(missing, fetched)}
+        remember_strategy_names(network_key, fetched_names)
+        names.update(fetched_names)
+    return [names[a.lower()] for a in addrs]
@@ -0,0 +1,109 @@
+import atexit
+import copy
+import gzip
+import json
+import os
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from web3 import Web3
+
+from bot.rpc import wrap_provider
+
+# =============================================================================
+# RPC / HTTP Cassettes
+# =============================================================================
+#
+# CASSETTE_MODE=record stores every JSON-RPC response (single and batch) and every Kong response in
+# CASSETTE_FILE, a gzipped JSON keyed by request. CASSETTE_MODE=replay serves them back without any
+# network access, so a handler can be re-run against the exact chain state it saw. Each request key
+# keeps its responses in order (a repeated eth_blockNumber advances like it did live), with runs of
+# identical responses stored once. Once a key's tape runs out its last response is repeated. A request
+# that was never recorded raises CassetteMiss.
+
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "")  # "record", "replay", or "" for off
+CASSETTE_FILE = os.getenv("CASSETTE_FILE", "cassette.json.gz")
+
+
+class CassetteMiss(LookupError):
+    pass
+
+
+class Cassette:
+    def __init__(self, path: str, mode: str) -> None:
+        self.path = path
+        self.mode = mode
+        # request key -> [[times seen in a row, response], ...]
+        self._tapes: dict[str, list[list[Any]]] = {}
+        self._cursor: dict[str, tuple[int, int]] = {}  # key -> (entry, repeats served)
+        self._lock = threading.Lock()
+        if mode == "replay":
+            with gzip.open(path, "rt") as f:
+                self._tapes = json.load(f)
+
+    def play(self, key: str, live: Callable[[], Any]) -> Any:
+        if self.mode == "replay":
+            return self._replay(key)
+        response = live()
+        if self.mode == "record":
+            with self._lock:
+                tape = self._tapes.setdefault(key, [])
+                if tape and tape[-1][1] == response:
+                    tape[-1][0] += 1
+                else:
+                    tape.append([1, copy.deepcopy(response)])
+        return response
+
+    def _replay(self, key: str) -> Any:
+        with self._lock:
+            tape = self._tapes.get(key)
+            if not tape:
+                raise CassetteMiss(key)
+            entry, served = self._cursor.get(key, (0, 0))
+            if served >= tape[entry][0] and entry + 1 < len(tape):
+                entry, served = entry + 1, 0
+            self._cursor[key] = (entry, served + 1)
+            return copy.deepcopy(tape[entry][1])
+
+    def save(self) -> None:
+        with self._lock, gzip.open(self.path, "wt") as f:
+            json.dump(self._tapes, f, separators=(",", ":"))
+
+
+cassette = Cassette(CASSETTE_FILE, CASSETTE_MODE) if CASSETTE_MODE in ("record", "replay") else None
+if cassette is not None and cassette.mode == "record":
+    atexit.register(cassette.save)
+
+
+def _key(*parts: Any) -> str:
+    return json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+
+
+def attach_cassette(w3: Web3, network_key: str) -> Web3:
+    """Record or replay w3's traffic when a cassette is active; otherwise leave w3 alone."""
+    if cassette is None:
+        return w3
+    tape = cassette
+
+    def wrap(make_request: Callable[..., Any]) -> Callable[..., Any]:
+        def taped(method: Any, params: Any) -> Any:
+            return tape.play(_key("rpc", network_key, method, params), lambda: make_request(method, params))
+
+        return taped
+
+    def wrap_batch(make_batch_request: Callable[..., Any]) -> Callable[..., Any]:
+        def taped(requests_info: Any) -> Any:
+            key = _key("batch", network_key, [[method, params] for method, params in requests_info])
+            return tape.play(key, lambda: make_batch_request(requests_info))
+
+        return taped
+
+    return wrap_provider(w3, wrap, wrap_batch)
+
+
+def taped_http(url: str, fetch: Callable[[], Any]) -> Any:
+    """fetch() (an HTTP GET of `url` returning JSON), recorded or replayed when a cassette is active."""
+    if cassette is None:
+        return fetch()
+    return cassette.play(_key("http", url), fetch)
@@ -0,0 +1,112 @@
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import time
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+from tinybot import TinyBot
+
+from bot.cassette import CASSETTE_MODE
+from bot.config import NETWORK_RPC_ENVS, NETWORKS
+from bot.risk import STRESS_REPORT_LEVELS
+from bot.timing import timing, timing_lines
+from bot.utils import dry_run
+
+# =============================================================================
+# One-Shot Runner
+# =============================================================================
+#
+# Runs a single handler once, prints the messages it would send and a per-phase timing breakdown:
+#
+#   python -m bot run report --network ethereum --dry-run
+#
+# Only what the handler needs is set up: no scheduler, event listeners, watchdog or Telegram listener,
+# and the Telegram side (bot.tg) is only imported for the commands that live there. With --dry-run the
+# messages go to stdout instead of Telegram, state isn't written, and no signer is loaded, so tend-check
+# reports what it would tend without sending anything. Without it the handler runs for real. Telegram
+# commands (status, exposure, stress) only ever print, as their replies go to whoever asked. Under
+# CASSETTE_MODE=replay every run is a dry run.
+
+HANDLERS = ("report", "tend-check", "risk-check", "status", "exposure", "stress")
+
+
+def _main_handler(name: str, private_key: str, rpc_url: str) -> Callable[[], Coroutine[Any, Any, list[str]]]:
+    from bot import main
+
+    handlers: dict[str, Callable[[TinyBot], Coroutine[Any, Any, None]]] = {
+        "report": main.send_status_report,
+        "tend-check": main.check_tend_triggers,
+        "risk-check": main.check_risk_thresholds,
+    }
+
+    async def _run() -> list[str]:
+        await handlers[name](main.make_bot(private_key, rpc_url))
+        return []
+
+    return _run
+
+
+def _command_handler(name: str, network_key: str) -> Callable[[], Coroutine[Any, Any, list[str]]]:
+    from bot import tg
+
+    async def _run() -> list[str]:
+        if name == "status":
+            result = tg._build_network_status(network_key)
+            return [result] if result else []
+        if name == "stress":
+            result = tg._build_network_stress(network_key, STRESS_REPORT_LEVELS)
+            return [result] if result else []
+        return tg._build_network_exposure(network_key)
+
+    return _run
+
+
+def run_handler(name: str, network_key: str, dry: bool) -> None:
+    # a replay is offline: nothing it decides may reach Telegram or the chain
+    dry = dry or CASSETTE_MODE == "replay"
+    # handlers resolve the network and its RPC from the environment at call time; the network's own RPC
+    # wins, RPC_URL only fills in when it's unset
+    os.environ["NETWORK"] = network_key
+    rpc_env = NETWORK_RPC_ENVS.get(network_key, "RPC_URL")
+    if not os.getenv(rpc_env) and os.getenv("RPC_URL"):
+        os.environ[rpc_env] = os.environ["RPC_URL"]
+    rpc_url = os.getenv(rpc_env, "")
+
+    private_key = "" if dry else os.getenv("BOT_PRIVATE_KEY", "")
+    if name in ("status", "exposure", "stress"):
+        handler = _command_handler(name, network_key)
+    else:
+        handler = _main_handler(name, private_key, rpc_url)
+
+    outbox_context: contextlib.AbstractContextManager[list[str]]
+    if dry:
+        outbox_context = dry_run()
+    else:
+        outbox_context = contextlib.nullcontext([])  # live: messages go out as usual
+    with outbox_context as outbox, timing() as phases:
+        start = time.perf_counter()
+        messages: list[str] = asyncio.run(handler())
+        total = time.perf_counter() - start
+
+    # main.py handlers send through notify(), which a dry run collects; tg builders return theirs
+    for msg in outbox + messages:
+        print(msg, end="\n\n")
+    print(f"--- {name} on {network_key}: {len(outbox) + len(messages)} message(s) ---", file=sys.stderr)
+    for line in timing_lines(phases, total):
+        print(line, file=sys.stderr)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m bot", description="Run one handler once and time it")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run a single handler")
+    run_parser.add_argument("handler", choices=HANDLERS)
+    run_parser.add_argument("--network", default=os.getenv("NETWORK", "ethereum"), choices=sorted(NETWORKS))
+    run_parser.add_argument("--dry-run", action="store_true", help="print messages instead of sending them")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        run_handler(args.handler, args.network, args.dry_run)
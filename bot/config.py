@@ -1,8 +1,10 @@
+import copy
 import json
 import os
 from collections.abc import Mapping, Sequence
 from pathlib import Path
-from typing import Any, TypedDict
+from typing import Any, NamedTuple, TypedDict, cast
+from urllib.parse import urlencode
 
 from web3 import Web3
 from web3.contract import Contract
@@ -42,6 +44,7 @@ MORPHO_IRM_ABI = load_abi("IMorphoIRM.json")
 AAVE_DATA_PROVIDER_ABI = load_abi("IAaveDataProvider.json")
 REGISTRY_ABI = load_abi("IRegistry.json")
 VAULT_ABI = load_abi("IVault.json")
+MULTICALL3_ABI = load_abi("IMulticall3.json")
 
 # Yearn v3 registries (same address on all chains)
 REGISTRY_ADDRESSES = [
@@ -70,7 +73,7 @@ class NetworkCfg(TypedDict):
     uptime_push_key: str
 
 
-NETWORKS: Mapping[str, NetworkCfg] = {
+NETWORKS: dict[str, NetworkCfg] = {
     "ethereum": {
         "lender_borrowers": [
             "0xfd2E20643CE740F0FE72ebC0328747bb415cf055",  # Aave v3 wstETH/yvUSD Lender Borrower
@@ -212,6 +215,121 @@ NETWORK_RPC_ENVS: Mapping[str, str] = {
 }
 
 APR_ORACLE_ADDRESS = "0x1981AD9F44F2EA9aDd2dC4AD7D075c102C70aF92"
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"  # same address on all chains
+
+
+# =============================================================================
+# Network Config File
+# =============================================================================
+#
+# NETWORKS above are the built-in defaults. NETWORKS_FILE (JSON: network -> any NetworkCfg keys) overrides
+# them key by key and is re-read whenever its mtime changes, so strategies and vaults can be added or
+# removed without a restart. Entries in NETWORKS are replaced, never mutated, so readers on other threads
+# see either the old or the new config of a network. Everything reads through network_cfg() on each run;
+# reload_networks() reports what changed for the few places that keep their own copy (event listeners,
+# pending tends). A file that doesn't parse or validate is reported once and the last good config stays.
+
+NETWORKS_FILE = os.getenv("NETWORKS_FILE", "config/networks.json")
+
+_BUILTIN_NETWORKS: dict[str, NetworkCfg] = copy.deepcopy(NETWORKS)
+_ADDRESS_LIST_KEYS = (
+    "lender_borrowers",
+    "ybold",
+    "morpho_loopers",
+    "aave_loopers",
+    "flex_loopers",
+    "pawnbroker_loopers",
+    "allocator_vaults",
+)
+_networks_file_mtime: float | None = None
+
+
+class NetworkDiff(NamedTuple):
+    added: dict[str, list[str]]  # config key -> addresses
+    removed: dict[str, list[str]]
+    changed: list[str]  # other keys whose value changed
+
+
+def _validate_overrides(data: Any) -> dict[str, dict[str, Any]]:
+    if not isinstance(data, dict):
+        raise ValueError("expected an object of network -> config")
+    for network_key, overrides in data.items():
+        if not isinstance(overrides, dict):
+            raise ValueError(f"{network_key}: expected an object")
+        for key, value in overrides.items():
+            if key not in NetworkCfg.__annotations__:
+                raise ValueError(f"{network_key}.{key}: unknown key")
+            if key in _ADDRESS_LIST_KEYS:
+                if not isinstance(value, list) or not all(isinstance(a, str) and Web3.is_address(a) for a in value):
+                    raise ValueError(f"{network_key}.{key}: expected a list of addresses")
+            elif key == "liquity_lender_borrowers":
+                if not isinstance(value, dict) or not all(
+                    Web3.is_address(a) and isinstance(i, int) for a, i in value.items()
+                ):
+                    raise ValueError(f"{network_key}.{key}: expected an object of address -> collIndex")
+        missing = set(NetworkCfg.__annotations__) - set(overrides)
+        if network_key not in _BUILTIN_NETWORKS and missing:
+            raise ValueError(f"{network_key}: new network is missing {', '.join(sorted(missing))}")
+    return data
+
+
+def _diff(old: NetworkCfg, new: NetworkCfg) -> NetworkDiff:
+    diff = NetworkDiff({}, {}, [])
+    old_values, new_values = cast(dict[str, Any], old), cast(dict[str, Any], new)
+    for key in NetworkCfg.__annotations__:
+        before, after = old_values.get(key), new_values.get(key)
+        if key in _ADDRESS_LIST_KEYS or key == "liquity_lender_borrowers":
+            before_set = {a.lower(): a for a in before or []}
+            after_set = {a.lower(): a for a in after or []}
+            added = [a for k, a in after_set.items() if k not in before_set]
+            removed = [a for k, a in before_set.items() if k not in after_set]
+            if added:
+                diff.added[key] = added
+            if removed:
+                diff.removed[key] = removed
+        elif before != after:
+            diff.changed.append(key)
+    return diff
+
+
+def reload_networks() -> dict[str, NetworkDiff]:
+    """Apply NETWORKS_FILE if it changed since the last call. Returns the networks whose config changed.
+    Raises ValueError (once per file version) when the file is invalid."""
+    global _networks_file_mtime
+    try:
+        mtime: float | None = os.path.getmtime(NETWORKS_FILE)
+    except FileNotFoundError:
+        mtime = None
+    if mtime == _networks_file_mtime:
+        return {}
+    _networks_file_mtime = mtime
+
+    overrides: dict[str, dict[str, Any]] = {}
+    if mtime is not None:
+        try:
+            with open(NETWORKS_FILE) as f:
+                overrides = _validate_overrides(json.load(f))
+        except (OSError, ValueError) as e:
+            raise ValueError(f"{NETWORKS_FILE} ignored, keeping the current config: {e}") from e
+
+    diffs: dict[str, NetworkDiff] = {}
+    for network_key in list(_BUILTIN_NETWORKS) + [k for k in overrides if k not in _BUILTIN_NETWORKS]:
+        merged = dict(_BUILTIN_NETWORKS.get(network_key, {}))
+        merged.update(overrides.get(network_key, {}))
+        new = cast(NetworkCfg, merged)
+        old = NETWORKS.get(network_key)
+        if old is None or new != old:
+            diffs[network_key] = _diff(old or cast(NetworkCfg, {}), new)
+            NETWORKS[network_key] = new
+    for network_key in [k for k in NETWORKS if k not in _BUILTIN_NETWORKS and k not in overrides]:
+        diffs[network_key] = _diff(NETWORKS.pop(network_key), cast(NetworkCfg, {}))
+    return diffs
+
+
+try:
+    reload_networks()
+except ValueError as e:
+    print(e)
 
 
 # =============================================================================
@@ -223,20 +341,79 @@ def network() -> str:
     return os.getenv("NETWORK", "ethereum")
 
 
+def network_cfg(network_key: str) -> NetworkCfg:
+    """A network's config with discovered strategies (see bot/discovery.py) merged into its lists."""
+    base = NETWORKS.get(network_key, NETWORKS["ethereum"])
+    found = discovered_strategies(network_key)
+    if not found:
+        return base
+
+    configured = {a.lower() for a in _strategy_addrs(base)} | DISCOVERY_IGNORE
+    merged: dict[str, Any] = dict(base)
+    for kind, addrs in found.items():
+        merged[kind] = list(merged[kind]) + [a for a in addrs if a.lower() not in configured]
+    return cast(NetworkCfg, merged)
+
+
 def cfg() -> NetworkCfg:
-    return NETWORKS.get(network(), NETWORKS["ethereum"])
+    return network_cfg(network())
+
+
+# =============================================================================
+# Discovered Strategies
+# =============================================================================
+
+DISCOVERY_FILE = "discovery.json"
+DISCOVERABLE_KINDS = ("lender_borrowers", "morpho_loopers", "aave_loopers", "flex_loopers", "pawnbroker_loopers")
+# Strategies discovery must never add, e.g. retired ones still sitting in a queue
+DISCOVERY_IGNORE = {a.strip().lower() for a in os.getenv("DISCOVERY_IGNORE", "").split(",") if a.strip()}
+
+# network -> kind -> addresses; loaded from DISCOVERY_FILE on first use
+_discovered: dict[str, dict[str, list[str]]] | None = None
+
+
+def _strategy_addrs(c: NetworkCfg) -> list[str]:
+    return (
+        list(c["lender_borrowers"])
+        + list(c["liquity_lender_borrowers"].keys())
+        + list(c["ybold"])
+        + list(c["morpho_loopers"])
+        + list(c["aave_loopers"])
+        + list(c["flex_loopers"])
+        + list(c["pawnbroker_loopers"])
+    )
+
+
+def _all_discovered() -> dict[str, dict[str, list[str]]]:
+    global _discovered
+    if _discovered is None:
+        try:
+            with open(DISCOVERY_FILE) as f:
+                data = json.load(f)
+            _discovered = {net: dict(entry.get("active", {})) for net, entry in data.items()}
+        except FileNotFoundError:
+            _discovered = {}
+    return _discovered
+
+
+def discovered_strategies(network_key: str) -> dict[str, list[str]]:
+    return _all_discovered().get(network_key, {})
+
+
+def set_discovered_strategies(network_key: str, kinds: dict[str, list[str]]) -> None:
+    _all_discovered()[network_key] = kinds
 
 
 def explorer_base_url() -> str:
     return cfg()["explorer"]
 
 
-def uptime_push_url() -> str | None:
+def uptime_push_url(status: str = "up", msg: str = "OK", ping: str = "") -> str | None:
     host = os.getenv("UPTIME_KUMA_HOST", "")
     key = cfg()["uptime_push_key"]
     if not host or not key:
         return None
-    return f"https://{host}/api/push/{key}?status=up&msg=OK&ping="
+    return f"https://{host}/api/push/{key}?{urlencode({'status': status, 'msg': msg, 'ping': ping})}"
 
 
 def w3_contract(w3: Web3, address: str, abi: list[dict[str, Any]]) -> Contract:
@@ -244,16 +421,7 @@ def w3_contract(w3: Web3, address: str, abi: list[dict[str, Any]]) -> Contract:
 
 
 def all_strategy_addrs() -> list[str]:
-    c = cfg()
-    return (
-        list(c["lender_borrowers"])
-        + list(c["liquity_lender_borrowers"].keys())
-        + list(c["ybold"])
-        + list(c["morpho_loopers"])
-        + list(c["aave_loopers"])
-        + list(c["flex_loopers"])
-        + list(c["pawnbroker_loopers"])
-    )
+    return _strategy_addrs(cfg())
 
 
 def lender_borrower_addrs() -> list[str]:
@@ -284,6 +452,16 @@ def all_looper_addrs() -> list[str]:
     return morpho_looper_addrs() + aave_looper_addrs() + flex_looper_addrs() + pawnbroker_looper_addrs()
 
 
+def looper_venues(network_key: str | None = None) -> dict[str, str]:
+    """Looper address -> venue ("morpho", "aave", "flex", "pawnbroker")."""
+    c = network_cfg(network_key) if network_key else cfg()
+    venues: dict[str, str] = {}
+    for venue in ("morpho", "aave", "flex", "pawnbroker"):
+        for addr in c[f"{venue}_loopers"]:  # type: ignore[literal-required]
+            venues[addr] = venue
+    return venues
+
+
 def allocator_vault_addrs() -> list[str]:
     return list(cfg()["allocator_vaults"])
 
@@ -0,0 +1,110 @@
+import os
+from collections.abc import Sequence
+from typing import Any, NamedTuple
+
+from bot.report import StrategyReport
+from bot.utils import chunk_messages
+
+# =============================================================================
+# Status Digest
+# =============================================================================
+#
+# The daily report compares each strategy's metrics with the last values it reported and only sends
+# the ones that moved past their threshold. A metric's baseline only advances when its change is
+# reported, so slow drift still shows up once it adds up. Strategies seen for the first time get
+# their full report. The full dump for everything is still available via STATUS_REPORT_MODE=full
+# or /report.
+
+
+class DigestMetric(NamedTuple):
+    label: str
+    threshold: float | None  # None: any change is material
+    unit: str = ""  # "%" (threshold in percentage points), "x", or "" (threshold in % of the old value)
+
+
+DIGEST_METRICS: dict[str, DigestMetric] = {
+    "ltv": DigestMetric("LTV", float(os.getenv("DIGEST_LTV_PP", "1")), "%"),
+    "leverage": DigestMetric("Leverage", float(os.getenv("DIGEST_LEVERAGE_X", "0.1")), "x"),
+    "apr": DigestMetric("Expected APR", float(os.getenv("DIGEST_APR_PP", "0.5")), "%"),
+    "borrow_rate": DigestMetric("Borrow Rate", float(os.getenv("DIGEST_BORROW_RATE_PP", "0.5")), "%"),
+    "trove_rate": DigestMetric("Trove Interest Rate", float(os.getenv("DIGEST_TROVE_RATE_PP", "0.1")), "%"),
+    "max_withdraw": DigestMetric("Lender Max Withdraw", float(os.getenv("DIGEST_MAX_WITHDRAW_PP", "10")), "%"),
+    "total_assets": DigestMetric("Total Assets", float(os.getenv("DIGEST_ASSETS_PCT", "5"))),
+    "debt": DigestMetric("Amount Borrowed", float(os.getenv("DIGEST_DEBT_PCT", "5"))),
+    "debt_in_front": DigestMetric("Debt In Front", float(os.getenv("DIGEST_DEBT_IN_FRONT_PCT", "20"))),
+    "trove_status": DigestMetric("Trove Status", None),
+    "tend_trigger": DigestMetric("Tend Trigger", None),
+}
+
+
+def _format(metric: DigestMetric, value: Any) -> str:
+    if metric.threshold is None:
+        return str(value)
+    if metric.unit == "%":
+        return f"{value:.2f}%"
+    if metric.unit == "x":
+        return f"{value:.2f}x"
+    return f"{value:,.2f}"
+
+
+def _change(metric: DigestMetric, old: Any, new: Any) -> str | None:
+    """The change as text if it's material, else None."""
+    if metric.threshold is None:
+        return "" if old != new else None
+    if metric.unit == "%":
+        return f" ({new - old:+.2f}pp)" if abs(new - old) >= metric.threshold else None
+    if metric.unit == "x":
+        return f" ({new - old:+.2f}x)" if abs(new - old) >= metric.threshold else None
+    if old == 0:
+        return " (new)" if new != 0 else None
+    pct = (new - old) / abs(old) * 100
+    return f" ({pct:+.1f}%)" if abs(pct) >= metric.threshold else None
+
+
+def material_changes(previous: dict[str, Any], current: dict[str, Any]) -> tuple[list[str], dict[str, Any]]:
+    """Lines for the metrics that moved past their threshold, and the strategy's new baseline."""
+    lines = []
+    baseline = dict(current)
+    for key, metric in DIGEST_METRICS.items():
+        if key not in current or key not in previous:
+            continue
+        change = _change(metric, previous[key], current[key])
+        if change is None:
+            baseline[key] = previous[key]
+            continue
+        lines.append(
+            f"<b>{metric.label}:</b> {_format(metric, previous[key])} → {_format(metric, current[key])}{change}"
+        )
+    return lines, baseline
+
+
+def build_digest(
+    network_key: str, reports: Sequence[StrategyReport], previous: dict[str, dict[str, Any]], explorer_url: str
+) -> tuple[list[str], dict[str, dict[str, Any]]]:
+    """(messages to send, snapshots to keep) for one network's daily report."""
+    messages: list[str] = []
+    snapshots: dict[str, dict[str, Any]] = {}
+    blocks: list[str] = []
+    unchanged = 0
+
+    for report in reports:
+        old = previous.get(report.address)
+        if old is None:
+            messages.append(report.message)
+            snapshots[report.address] = report.metrics
+            continue
+        lines, snapshots[report.address] = material_changes(old, report.metrics)
+        if not lines:
+            unchanged += 1
+            continue
+        name = report.metrics["name"]
+        blocks.append(f"<a href='{explorer_url}{report.address}'>{name}</a>\n" + "\n".join(lines))
+
+    gone = [snapshot.get("name", addr) for addr, snapshot in previous.items() if addr not in snapshots]
+    if gone:
+        blocks.append("<b>No longer reported:</b> " + ", ".join(gone))
+
+    header = f"📋 <b>{network_key.capitalize()} daily digest</b>"
+    footer = f"<i>{unchanged} strateg{'y' if unchanged == 1 else 'ies'} unchanged · /report for the full dump</i>"
+    messages += chunk_messages(header, blocks + [footer])
+    return messages, snapshots
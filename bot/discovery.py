@@ -0,0 +1,240 @@
+import json
+import os
+import threading
+from collections.abc import Sequence
+from typing import Any
+
+from tinybot import multicall
+from web3 import Web3
+
+from bot.config import (
+    DISCOVERY_FILE,
+    MULTI_STRATEGY_VAULT_TYPE,
+    REGISTRY_ABI,
+    REGISTRY_ADDRESSES,
+    VAULT_ABI,
+    set_discovered_strategies,
+    w3_contract,
+)
+from bot.rpc import RpcBatch, batch_request
+
+# =============================================================================
+# Strategy Discovery
+# =============================================================================
+#
+# Candidates are the default-queue strategies of every multi-strategy vault endorsed in the Yearn
+# registries plus the configured allocator vaults. Each new candidate is classified once by probing
+# venue-specific selectors with eth_call in JSON-RPC batches (a missing selector reverts), and the
+# classification is cached on disk, so a refresh only probes strategies it hasn't seen before.
+# Liquity lender-borrowers (which need a collIndex) and yBOLD strategies are still configured by hand.
+
+DISCOVERY_PROBE_CHUNK = 100  # candidates per JSON-RPC batch
+
+_PROBES = ("maxLeverageRatio", "marketId", "DATA_PROVIDER", "PAWN_BROKER", "TROVE_MANAGER", "lenderVault")
+_SELECTORS = {name: Web3.to_hex(Web3.keccak(text=f"{name}()")[:4]) for name in _PROBES}
+
+
+def endorsed_vaults(w3: Web3) -> tuple[list[str], dict[str, str]]:
+    """Endorsed vaults across both registries, and the registry that knows each (lowercased) vault."""
+    vault_addrs: list[str] = []
+    registry_for_vault: dict[str, str] = {}
+    # address[][] returns don't fit multicall, so the registries are read in one JSON-RPC batch instead
+    batch = RpcBatch(w3)
+    for registry_addr in REGISTRY_ADDRESSES:
+        batch.call(w3_contract(w3, registry_addr, REGISTRY_ABI).functions.getAllEndorsedVaults())
+    for registry_addr, nested in zip(REGISTRY_ADDRESSES, batch.execute(return_exceptions=True)):
+        if isinstance(nested, Exception):
+            continue
+        for sub in nested:
+            for a in sub:
+                key = a.lower()
+                if key not in registry_for_vault:
+                    registry_for_vault[key] = registry_addr
+                    vault_addrs.append(a)
+    return vault_addrs, registry_for_vault
+
+
+def multi_strategy_vaults(w3: Web3) -> list[str]:
+    vault_addrs, registry_for_vault = endorsed_vaults(w3)
+    if not vault_addrs:
+        return []
+
+    # vaultInfo against the registry that actually knows each vault
+    info_calls = []
+    for addr in vault_addrs:
+        registry = w3_contract(w3, registry_for_vault[addr.lower()], REGISTRY_ABI)
+        info_calls.append(registry.functions.vaultInfo(Web3.to_checksum_address(addr)))
+    info_results = multicall(w3, info_calls)
+
+    vaults: list[str] = []
+    for addr, info in zip(vault_addrs, info_results):
+        # info: (asset, releaseVersion, vaultType, deploymentTimestamp, index, tag)
+        try:
+            if info[2] == MULTI_STRATEGY_VAULT_TYPE:
+                vaults.append(addr)
+        except Exception:
+            continue
+    return vaults
+
+
+def _classify(probes: dict[str, bool]) -> str:
+    """Config list a strategy belongs in, or "" if it isn't a kind we monitor."""
+    if probes["maxLeverageRatio"]:
+        if probes["marketId"]:
+            return "morpho_loopers"
+        if probes["DATA_PROVIDER"]:
+            return "aave_loopers"
+        if probes["PAWN_BROKER"]:
+            return "pawnbroker_loopers"
+        if probes["TROVE_MANAGER"]:
+            return "flex_loopers"
+        return ""
+    if probes["lenderVault"] and not probes["TROVE_MANAGER"]:
+        return "lender_borrowers"
+    return ""
+
+
+def _probe(w3: Web3, candidates: Sequence[str]) -> dict[str, str]:
+    kinds: dict[str, str] = {}
+    for start in range(0, len(candidates), DISCOVERY_PROBE_CHUNK):
+        chunk = candidates[start : start + DISCOVERY_PROBE_CHUNK]
+        requests = [
+            ("eth_call", [{"to": Web3.to_checksum_address(addr), "data": _SELECTORS[name]}, "latest"])
+            for addr in chunk
+            for name in _PROBES
+        ]
+        responses = iter(batch_request(w3, requests))
+        for addr in chunk:
+            probes = {}
+            for name in _PROBES:
+                response = next(responses)
+                probes[name] = "error" not in response and response.get("result", "0x") not in ("0x", None)
+            kinds[addr.lower()] = _classify(probes)
+    return kinds
+
+
+def _load() -> dict[str, Any]:
+    try:
+        with open(DISCOVERY_FILE) as f:
+            return dict(json.load(f))
+    except FileNotFoundError:
+        return {}
+
+
+def discover_strategies(w3: Web3, network_key: str, allocator_vaults: Sequence[str]) -> dict[str, list[str]]:
+    """Refresh the discovered strategies of a network. Returns kind -> addresses currently in a queue."""
+    data = _load()
+    entry = data.setdefault(network_key, {"kinds": {}, "active": {}})
+    known: dict[str, str] = entry["kinds"]
+
+    vaults = list(dict.fromkeys(multi_strategy_vaults(w3) + list(allocator_vaults)))
+    queues = multicall(w3, [w3_contract(w3, v, VAULT_ABI).functions.get_default_queue() for v in vaults])
+    in_queue = list(dict.fromkeys(Web3.to_checksum_address(s) for queue in queues for s in queue))
+
+    known.update(_probe(w3, [s for s in in_queue if s.lower() not in known]))
+
+    active: dict[str, list[str]] = {}
+    for addr in in_queue:
+        kind = known.get(addr.lower(), "")
+        if kind:
+            active.setdefault(kind, []).append(addr)
+    entry["active"] = active
+
+    with open(DISCOVERY_FILE, "w") as f:
+        json.dump(data, f)
+    set_discovered_strategies(network_key, active)
+    return active
+
+
+# =============================================================================
+# Vault Strategy History
+# =============================================================================
+#
+# A strategy can leave the default queue while the vault still holds debt in it, so the queue alone
+# misses part of a vault's exposure. StrategyChanged events give every strategy a vault has added and
+# not revoked (revoking needs the debt gone, or written off). Each vault keeps its own log cursor on
+# disk, vaults sharing a cursor are scanned with one eth_getLogs, and a range the node refuses is
+# halved and retried. The chunk size that worked is remembered per network.
+
+VAULT_STRATEGIES_FILE = "vault_strategies.json"
+VAULT_LOG_START_BLOCK = int(os.getenv("VAULT_LOG_START_BLOCK", "0"))
+VAULT_LOG_CHUNK = int(os.getenv("VAULT_LOG_CHUNK", "5000000"))  # blocks per eth_getLogs, halved when refused
+VAULT_LOG_MIN_CHUNK = 1000
+VAULT_LOG_MAX_REQUESTS = int(os.getenv("VAULT_LOG_MAX_REQUESTS", "20"))  # per sync, spreads the backfill
+
+STRATEGY_ADDED = 1
+STRATEGY_REVOKED = 2
+STRATEGY_CHANGED_TOPIC = Web3.to_hex(Web3.keccak(text="StrategyChanged(address,uint256)"))
+
+# exposure refreshes run one thread per network, all against the same file
+_vault_strategies_lock = threading.Lock()
+
+
+def _load_vault_strategies() -> dict[str, Any]:
+    try:
+        with open(VAULT_STRATEGIES_FILE) as f:
+            return dict(json.load(f))
+    except FileNotFoundError:
+        return {}
+
+
+def _scan_strategy_changes(w3: Web3, entry: dict[str, Any], vaults: Sequence[str]) -> None:
+    cursors: dict[str, Any] = entry.setdefault("vaults", {})
+    head = w3.eth.block_number
+    for _ in range(VAULT_LOG_MAX_REQUESTS):
+        groups: dict[int, list[str]] = {}
+        for v in vaults:
+            state = cursors.setdefault(v.lower(), {"last_block": VAULT_LOG_START_BLOCK - 1, "strategies": []})
+            if state["last_block"] < head:
+                groups.setdefault(state["last_block"], []).append(v)
+        if not groups:
+            return
+
+        last_block = min(groups)
+        group = groups[last_block]
+        chunk = entry.get("chunk", VAULT_LOG_CHUNK)
+        from_block = last_block + 1
+        to_block = min(from_block + chunk - 1, head)
+        try:
+            logs = w3.eth.get_logs(
+                {
+                    "address": [Web3.to_checksum_address(v) for v in group],
+                    "fromBlock": from_block,
+                    "toBlock": to_block,
+                    "topics": [STRATEGY_CHANGED_TOPIC],
+                }
+            )
+        except Exception:
+            if chunk <= VAULT_LOG_MIN_CHUNK:
+                raise
+            entry["chunk"] = max(chunk // 2, VAULT_LOG_MIN_CHUNK)
+            continue
+
+        for log in logs:
+            strategies: list[str] = cursors[str(log["address"]).lower()]["strategies"]
+            strategy = Web3.to_checksum_address(bytes(log["topics"][1])[-20:])
+            change_type = int.from_bytes(bytes(log["topics"][2]), "big")
+            if change_type == STRATEGY_ADDED and strategy not in strategies:
+                strategies.append(strategy)
+            elif change_type == STRATEGY_REVOKED and strategy in strategies:
+                strategies.remove(strategy)
+        for v in group:
+            cursors[v.lower()]["last_block"] = to_block
+
+
+def vault_strategies(w3: Web3, network_key: str, vaults: Sequence[str]) -> dict[str, list[str]]:
+    """Strategies each vault has added and not revoked, keyed by lowercased vault. Vaults still being
+    backfilled (see VAULT_LOG_MAX_REQUESTS) only list what has been scanned so far."""
+    with _vault_strategies_lock:
+        entry = _load_vault_strategies().get(network_key, {})
+    try:
+        _scan_strategy_changes(w3, entry, vaults)
+    finally:
+        # keep whatever was scanned, even when a later request failed
+        with _vault_strategies_lock:
+            data = _load_vault_strategies()
+            data[network_key] = entry
+            with open(VAULT_STRATEGIES_FILE, "w") as f:
+                json.dump(data, f)
+    cursors = entry.get("vaults", {})
+    return {v.lower(): list(cursors.get(v.lower(), {}).get("strategies", [])) for v in vaults}
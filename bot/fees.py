@@ -0,0 +1,70 @@
+import os
+import statistics
+import time
+from collections import deque
+from typing import cast
+
+from web3 import Web3
+
+# =============================================================================
+# Fee Oracle
+# =============================================================================
+#
+# Keeps a rolling eth_feeHistory window, refreshed once per block by a background job, so a tend
+# submission reads its fee parameters from memory instead of fetching the latest block. The tip is a
+# reward percentile over the window (higher for more urgent tends) and maxFeePerGas leaves room for the
+# base fee to keep rising at the protocol max of 12.5% per block for a few blocks.
+
+FEE_HISTORY_BLOCKS = int(os.getenv("FEE_HISTORY_BLOCKS", "20"))  # rolling window size
+FEE_REFRESH_INTERVAL = int(os.getenv("FEE_REFRESH_INTERVAL", "12"))  # once per mainnet block
+FEE_MAX_AGE = int(os.getenv("FEE_MAX_AGE", "120"))  # older than this, submissions fall back to get_block
+MIN_PRIORITY_FEE_GWEI = float(os.getenv("MIN_PRIORITY_FEE_GWEI", "0.001"))
+
+# urgency -> (reward percentile, blocks of base fee growth to cover)
+URGENCY_LEVELS: dict[str, tuple[float, int]] = {
+    "low": (10.0, 2),
+    "normal": (50.0, 4),
+    "high": (90.0, 6),
+}
+_PERCENTILES = sorted({p for p, _ in URGENCY_LEVELS.values()})
+
+
+class FeeOracle:
+    def __init__(self) -> None:
+        # (block number, base fee, {percentile: reward}) per block, all in wei
+        self._window: deque[tuple[int, int, dict[float, int]]] = deque(maxlen=FEE_HISTORY_BLOCKS)
+        self._next_base_fee = 0
+        self.updated_at = 0.0
+
+    @property
+    def fresh(self) -> bool:
+        return bool(self._window) and time.time() - self.updated_at < FEE_MAX_AGE
+
+    def refresh(self, w3: Web3) -> None:
+        head = w3.eth.block_number
+        last = self._window[-1][0] if self._window else head - FEE_HISTORY_BLOCKS
+        count = min(head - last, FEE_HISTORY_BLOCKS)
+        if count <= 0:
+            self.updated_at = time.time()
+            return
+
+        history = w3.eth.fee_history(count, head, _PERCENTILES)
+        oldest = history["oldestBlock"]
+        base_fees = history["baseFeePerGas"]
+        reward_rows = cast(list[list[int]], history.get("reward") or [[0] * len(_PERCENTILES)] * count)
+        for i, rewards in enumerate(reward_rows):
+            self._window.append((oldest + i, base_fees[i], dict(zip(_PERCENTILES, rewards))))
+        # baseFeePerGas has one extra entry: the base fee of the block after `head`
+        self._next_base_fee = base_fees[-1]
+        self.updated_at = time.time()
+
+    def fees(self, urgency: str = "normal") -> tuple[float, float]:
+        """(max_fee_gwei, max_priority_fee_gwei) for a tend of the given urgency."""
+        percentile, growth_blocks = URGENCY_LEVELS[urgency]
+        tip = statistics.median(rewards[percentile] for _, _, rewards in self._window) / 1e9
+        priority_fee_gwei = max(tip, MIN_PRIORITY_FEE_GWEI)
+        max_fee_gwei = self._next_base_fee / 1e9 * 1.125**growth_blocks + priority_fee_gwei
+        return max_fee_gwei, priority_fee_gwei
+
+
+fee_oracle = FeeOracle()
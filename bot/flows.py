@@ -0,0 +1,155 @@
+import os
+import threading
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
+# =============================================================================
+# Allocator Vault Flows
+# =============================================================================
+#
+# Deposits and withdrawals are folded into rolling windows per vault as they arrive. Each window is a
+# fixed ring of time buckets, and every slot remembers which bucket it holds, so a slot is reset when it
+# is reused and expired slots are masked out when the window is read. Memory per vault is constant
+# whatever the event rate, and a window's edge is accurate to one bucket. Events are stamped when the
+# listener delivers them, up to VAULT_EVENT_POLL_INTERVAL late, which is fine at these window sizes.
+# The aggregates live in memory only and start empty after a restart.
+
+# window -> (seconds, buckets)
+FLOW_WINDOWS: dict[str, tuple[int, int]] = {
+    "1h": (3600, 60),
+    "24h": (86400, 48),
+    "7d": (7 * 86400, 84),
+}
+
+# window -> net outflow, in % of what the vault held when the window started, that raises an alert
+FLOW_ALERT_OUTFLOW_PCT: dict[str, float] = {
+    "1h": float(os.getenv("FLOW_ALERT_OUTFLOW_PCT_1H", "5")),
+    "24h": float(os.getenv("FLOW_ALERT_OUTFLOW_PCT_24H", "10")),
+    "7d": float(os.getenv("FLOW_ALERT_OUTFLOW_PCT_7D", "25")),
+}
+
+# columns of a bucket
+_INFLOW, _OUTFLOW, _DEPOSITS, _WITHDRAWALS, _LARGEST_DEPOSIT, _LARGEST_WITHDRAWAL = range(6)
+
+
+class FlowStats(NamedTuple):
+    inflow: float
+    outflow: float
+    deposits: int
+    withdrawals: int
+    largest_deposit: float
+    largest_withdrawal: float
+
+    @property
+    def net(self) -> float:
+        return self.inflow - self.outflow
+
+
+class _Ring:
+    def __init__(self, seconds: int, buckets: int) -> None:
+        self.width = seconds // buckets
+        self.epochs: npt.NDArray[np.int64] = np.full(buckets, -1, dtype=np.int64)
+        self.values: npt.NDArray[np.float64] = np.zeros((buckets, 6), dtype=np.float64)
+
+    def add(self, ts: int, amount: float, deposit: bool) -> None:
+        epoch = ts // self.width
+        slot = epoch % len(self.epochs)
+        if self.epochs[slot] > epoch:
+            return  # older than the window
+        if self.epochs[slot] != epoch:
+            self.epochs[slot] = epoch
+            self.values[slot] = 0.0
+        row = self.values[slot]
+        if deposit:
+            row[_INFLOW] += amount
+            row[_DEPOSITS] += 1
+            row[_LARGEST_DEPOSIT] = max(row[_LARGEST_DEPOSIT], amount)
+        else:
+            row[_OUTFLOW] += amount
+            row[_WITHDRAWALS] += 1
+            row[_LARGEST_WITHDRAWAL] = max(row[_LARGEST_WITHDRAWAL], amount)
+
+    def stats(self, now_ts: int) -> FlowStats:
+        live = self.values[self.epochs > now_ts // self.width - len(self.epochs)]
+        if not len(live):
+            return FlowStats(0.0, 0.0, 0, 0, 0.0, 0.0)
+        sums = live.sum(axis=0)
+        peaks = live.max(axis=0)
+        return FlowStats(
+            float(sums[_INFLOW]),
+            float(sums[_OUTFLOW]),
+            int(sums[_DEPOSITS]),
+            int(sums[_WITHDRAWALS]),
+            float(peaks[_LARGEST_DEPOSIT]),
+            float(peaks[_LARGEST_WITHDRAWAL]),
+        )
+
+
+class FlowTracker:
+    def __init__(self) -> None:
+        self._rings: dict[str, dict[str, _Ring]] = {}  # vault -> window -> ring
+        self._labels: dict[str, tuple[str, str]] = {}  # vault -> (name, asset symbol)
+        self._alerted: set[tuple[str, str]] = set()  # (vault, window) currently over its alert level
+        # written by the event listener, read by /flows on the Telegram thread
+        self._lock = threading.Lock()
+
+    def record(self, vault: str, name: str, symbol: str, assets: float, deposit: bool, ts: int) -> None:
+        key = vault.lower()
+        with self._lock:
+            rings = self._rings.get(key)
+            if rings is None:
+                rings = self._rings[key] = {w: _Ring(seconds, n) for w, (seconds, n) in FLOW_WINDOWS.items()}
+            self._labels[key] = (name, symbol)
+            for ring in rings.values():
+                ring.add(ts, assets, deposit)
+
+    def stats(self, vault: str, now_ts: int) -> dict[str, FlowStats]:
+        with self._lock:
+            rings = self._rings.get(vault.lower(), {})
+            return {window: ring.stats(now_ts) for window, ring in rings.items()}
+
+    def crossed(self, vault: str, total_assets: float, now_ts: int) -> dict[str, FlowStats]:
+        """Windows whose net outflow just went past their alert level. A window alerts once per crossing
+        and re-arms when it's checked back under the level."""
+        key = vault.lower()
+        crossed = {}
+        for window, stats in self.stats(vault, now_ts).items():
+            level = FLOW_ALERT_OUTFLOW_PCT.get(window)
+            over = level is not None and stats.net < 0 and outflow_pct(stats, total_assets) >= level
+            with self._lock:
+                if over and (key, window) not in self._alerted:
+                    self._alerted.add((key, window))
+                    crossed[window] = stats
+                elif not over:
+                    self._alerted.discard((key, window))
+        return crossed
+
+    def lines(self, now_ts: int) -> list[str]:
+        """One block per vault seen so far, for /flows."""
+        with self._lock:
+            vaults = sorted(self._labels.items(), key=lambda item: item[1][0])
+        blocks = []
+        for vault, (name, symbol) in vaults:
+            block = f"<b>{name}</b>"
+            for window, stats in self.stats(vault, now_ts).items():
+                block += f"\n<b>{window}:</b> {flow_line(stats, symbol)}"
+            blocks.append(block)
+        return blocks
+
+
+def outflow_pct(stats: FlowStats, total_assets: float) -> float:
+    """Net outflow as a share of the assets at the start of the window (today's total plus what left)."""
+    start = total_assets - stats.net
+    return -stats.net / start * 100 if start > 0 else 0.0
+
+
+def flow_line(stats: FlowStats, symbol: str) -> str:
+    line = f"net {stats.net:+,.2f} {symbol} · {stats.deposits} in / {stats.withdrawals} out"
+    if stats.largest_withdrawal or stats.largest_deposit:
+        line += f" · largest {stats.largest_deposit:,.2f} in / {stats.largest_withdrawal:,.2f} out"
+    return line
+
+
+flow_tracker = FlowTracker()
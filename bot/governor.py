@@ -0,0 +1,273 @@
+import asyncio
+import contextlib
+import functools
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Coroutine, Iterator
+from contextvars import ContextVar
+from typing import Any, ParamSpec, TypeVar
+
+from web3 import Web3
+
+from bot.rpc import wrap_provider
+
+# =============================================================================
+# RPC Budget Governor
+# =============================================================================
+#
+# Every request a governed Web3 sends goes through a per-network token bucket denominated in compute
+# units (CU), the unit RPC plans bill in, with a per-method weight. The provider itself is wrapped,
+# so raw batches and debug calls made on w3.provider are charged too. Callers run at a priority (a context variable, so
+# it follows asyncio tasks and to_thread): lower priorities must leave part of the bucket untouched,
+# so reports and Telegram commands queue behind tends instead of competing with them. A 429 or
+# "limit exceeded" response halves the refill rate and pauses the network briefly, and the request
+# is retried. Each successful request then nudges the rate back towards the budget (AIMD). Waiting
+# is capped at RPC_MAX_WAIT: past it the request goes out anyway and the provider has the last word.
+# Waiting means sleeping on the calling thread, so only tends may wait on the event loop: tinybot
+# awaits its handlers one at a time, and a throttled report would hold up the next tend tick. A
+# lower-priority request that would have to wait there raises RpcThrottled instead, and the handler
+# runs again on its next tick (listeners re-read the same blocks).
+
+RPC_BUDGET_CUPS = float(os.getenv("RPC_BUDGET_CUPS", "300"))  # compute units per second, per network
+RPC_BURST_SECONDS = float(os.getenv("RPC_BURST_SECONDS", "10"))  # bucket size, in seconds of budget
+RPC_MAX_WAIT = float(os.getenv("RPC_MAX_WAIT", "10"))  # seconds a request may wait for tokens
+RPC_RATE_LIMIT_RETRIES = int(os.getenv("RPC_RATE_LIMIT_RETRIES", "2"))
+MAX_BACKOFF = 60.0  # seconds
+MIN_RATE_FRACTION = 0.05  # backoff never drops the rate below this share of the budget
+RATE_RECOVERY = 0.01  # share of the budget regained per successful request
+USAGE_WINDOW = 60  # seconds of history behind the consumption figure
+
+# Compute units per method, roughly what the big providers charge
+METHOD_WEIGHTS: dict[str, int] = {
+    "eth_blockNumber": 10,
+    "eth_chainId": 0,
+    "eth_call": 26,
+    "eth_estimateGas": 87,
+    "eth_feeHistory": 10,
+    "eth_gasPrice": 20,
+    "eth_getBalance": 19,
+    "eth_getBlockByNumber": 16,
+    "eth_getLogs": 75,
+    "eth_getTransactionCount": 26,
+    "eth_getTransactionReceipt": 15,
+    "eth_maxPriorityFeePerGas": 10,
+    "eth_sendRawTransaction": 250,
+    "debug_traceCall": 300,
+}
+DEFAULT_METHOD_WEIGHT = 20
+
+# priority -> share of the bucket that must remain after the request
+PRIORITY_RESERVES: dict[str, float] = {
+    "tend": 0.0,
+    "monitor": 0.2,
+    "report": 0.5,
+    "command": 0.5,
+}
+
+_RATE_LIMIT_MARKERS = ("limit exceeded", "rate limit", "too many requests", "capacity exceeded")
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+_priority: ContextVar[str] = ContextVar("rpc_priority", default="monitor")
+
+
+class RpcThrottled(RuntimeError):
+    pass
+
+
+def _must_not_block(priority: str) -> bool:
+    if priority == "tend":
+        return False
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False  # worker thread, free to wait
+    return True
+
+
+@contextlib.contextmanager
+def rpc_priority(priority: str) -> Iterator[None]:
+    """Run the enclosed web3 calls at the given priority (see PRIORITY_RESERVES)."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def at_priority(priority: str) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Coroutine[Any, Any, T]]]:
+    """Decorator form of rpc_priority() for async handlers."""
+
+    def decorator(handler: Callable[P, Awaitable[T]]) -> Callable[P, Coroutine[Any, Any, T]]:
+        @functools.wraps(handler)
+        async def _run(*args: P.args, **kwargs: P.kwargs) -> T:
+            with rpc_priority(priority):
+                return await handler(*args, **kwargs)
+
+        return _run
+
+    return decorator
+
+
+class RpcBudget:
+    def __init__(self, network_key: str, budget: float = RPC_BUDGET_CUPS) -> None:
+        self.network_key = network_key
+        self.budget = budget
+        self.capacity = budget * RPC_BURST_SECONDS
+        self.rate = budget
+        self.tokens = self.capacity
+        self.paused_until = 0.0
+        self.backoff = 1.0
+        self.rate_limited = 0
+        self.throttled = 0
+        self._updated = time.monotonic()
+        self._spent: deque[tuple[float, int]] = deque()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, weight: int, priority: str) -> None:
+        reserve = self.capacity * PRIORITY_RESERVES.get(priority, PRIORITY_RESERVES["monitor"])
+        deadline = time.monotonic() + RPC_MAX_WAIT
+        waited = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens - weight >= reserve:
+                    break
+                if now >= deadline:
+                    break  # over budget, but not stalling the caller any longer
+                if _must_not_block(priority):
+                    self.throttled += 1
+                    raise RpcThrottled(f"{self.network_key}: RPC budget exhausted for {priority} requests")
+                wait = max(self.paused_until - now, (weight + reserve - self.tokens) / self.rate, 0.01)
+            waited = True
+            time.sleep(min(wait, max(deadline - time.monotonic(), 0.0)))
+
+        with self._lock:
+            self.tokens -= weight
+            self._spent.append((time.time(), weight))
+            if waited:
+                self.throttled += 1
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.budget, self.rate + self.budget * RATE_RECOVERY)
+            self.backoff = 1.0
+
+    def on_rate_limited(self) -> float:
+        """Back off; returns how long to wait before retrying."""
+        with self._lock:
+            self.rate_limited += 1
+            self.rate = max(self.rate / 2, self.budget * MIN_RATE_FRACTION)
+            delay = self.backoff
+            self.backoff = min(self.backoff * 2, MAX_BACKOFF)
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+            return delay
+
+    def usage(self) -> dict[str, float]:
+        """Consumption over the last USAGE_WINDOW seconds against the budget, in CU/s."""
+        with self._lock:
+            cutoff = time.time() - USAGE_WINDOW
+            while self._spent and self._spent[0][0] < cutoff:
+                self._spent.popleft()
+            spent = sum(weight for _, weight in self._spent)
+            return {
+                "consumed_cups": spent / USAGE_WINDOW,
+                "rate_cups": self.rate,
+                "budget_cups": self.budget,
+                "rate_limited": self.rate_limited,
+                "throttled": self.throttled,
+            }
+
+
+_budgets: dict[str, RpcBudget] = {}
+_budgets_lock = threading.Lock()
+
+
+def rpc_budget(network_key: str) -> RpcBudget:
+    with _budgets_lock:
+        if network_key not in _budgets:
+            budget = float(os.getenv(f"RPC_BUDGET_CUPS_{network_key.upper()}", str(RPC_BUDGET_CUPS)))
+            _budgets[network_key] = RpcBudget(network_key, budget)
+        return _budgets[network_key]
+
+
+def budget_lines() -> list[str]:
+    """One line per network seen so far, for /rpc and the periodic log."""
+    with _budgets_lock:
+        budgets = sorted(_budgets.items())
+    lines = []
+    for network_key, budget in budgets:
+        u = budget.usage()
+        lines.append(
+            f"{network_key.capitalize()}: {u['consumed_cups']:.0f}/{u['budget_cups']:.0f} CU/s "
+            f"(rate {u['rate_cups']:.0f}, {u['throttled']} throttled, {u['rate_limited']} rate limited)"
+        )
+    return lines
+
+
+def _is_rate_limited(response: Any = None, error: Exception | None = None) -> bool:
+    if error is not None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+        return status == 429 or any(m in str(error).lower() for m in _RATE_LIMIT_MARKERS)
+    if isinstance(response, dict) and "error" in response:
+        return any(m in str(response["error"]).lower() for m in _RATE_LIMIT_MARKERS)
+    return False
+
+
+def _governed(budget: RpcBudget, weight: int, send: Callable[[], Any], failed: Callable[[Any], bool]) -> Any:
+    priority = _priority.get()
+    retries = RPC_RATE_LIMIT_RETRIES
+    while True:
+        budget.acquire(weight, priority)
+        try:
+            response = send()
+        except Exception as e:
+            if not _is_rate_limited(error=e):
+                raise
+            delay = budget.on_rate_limited()
+            if not retries or _must_not_block(priority):
+                raise
+        else:
+            if not failed(response):
+                budget.on_success()
+                return response
+            delay = budget.on_rate_limited()
+            if not retries or _must_not_block(priority):
+                return response  # still rate limited, the caller sees the provider's error
+        retries -= 1
+        time.sleep(delay)
+
+
+def _batch_rate_limited(responses: Any) -> bool:
+    if isinstance(responses, dict):
+        return _is_rate_limited(responses)
+    return any(_is_rate_limited(r) for r in responses)
+
+
+def govern(w3: Web3, network_key: str) -> Web3:
+    """Route all of w3's requests through the network's RPC budget."""
+    budget = rpc_budget(network_key)
+
+    def wrap(make_request: Callable[..., Any]) -> Callable[..., Any]:
+        def governed(method: Any, params: Any) -> Any:
+            weight = METHOD_WEIGHTS.get(str(method), DEFAULT_METHOD_WEIGHT)
+            return _governed(budget, weight, lambda: make_request(method, params), _is_rate_limited)
+
+        return governed
+
+    def wrap_batch(make_batch_request: Callable[..., Any]) -> Callable[..., Any]:
+        def governed(requests_info: Any) -> Any:
+            weight = sum(METHOD_WEIGHTS.get(str(method), DEFAULT_METHOD_WEIGHT) for method, _ in requests_info)
+            return _governed(budget, weight, lambda: make_batch_request(requests_info), _batch_rate_limited)
+
+        return governed
+
+    return wrap_provider(w3, wrap, wrap_batch)
@@ -1,48 +1,55 @@
-import math
+import asyncio
 import os
-import random
 import time
 from typing import Any
 from urllib.request import Request, urlopen
 
-from tinybot import TinyBot, multicall, notify_group_chat
+from tinybot import TinyBot, multicall
 from web3 import Web3
 
+from bot.cache import CacheNamespace, cache_lines, cache_namespace, cached_multicall, strategy_names
+from bot.cassette import CASSETTE_MODE, attach_cassette
 from bot.config import (
-    AAVE_DATA_PROVIDER_ABI,
-    APR_ORACLE_ABI,
-    APR_ORACLE_ADDRESS,
-    BASE_STRATEGY_ABI,
-    DEBT_IN_FRONT_HELPER_ABI,
-    EMOJIS,
     ERC20_ABI,
     LENDER_BORROWER_ABI,
-    LENDER_VAULT_ABI,
     LOOPER_ABI,
-    MORPHO_ABI,
-    MORPHO_IRM_ABI,
-    PAWN_BROKER_ABI,
     RELAYER_ABI,
-    TOKENIZED_STRATEGY_ABI,
-    TROVE_MANAGER_ABI,
     VAULT_ABI,
-    aave_looper_addrs,
     all_looper_addrs,
     all_strategy_addrs,
     allocator_vault_addrs,
     cfg,
     explorer_base_url,
-    flex_looper_addrs,
     lender_borrower_addrs,
     liquity_lender_borrower_map,
-    morpho_address,
-    morpho_looper_addrs,
     network,
-    pawnbroker_looper_addrs,
+    reload_networks,
     uptime_push_url,
     w3_contract,
 )
-from bot.utils import format_time_ago, load_state, save_state
+from bot.digest import build_digest
+from bot.discovery import discover_strategies
+from bot.fees import FEE_REFRESH_INTERVAL, fee_oracle
+from bot.flows import FLOW_ALERT_OUTFLOW_PCT, flow_line, flow_tracker, outflow_pct
+from bot.governor import at_priority, budget_lines, govern
+from bot.oracles import oracle_watcher
+from bot.report import network_reports
+from bot.risk import (
+    RISK_THRESHOLDS,
+    STRESS_REPORT_LEVELS,
+    breached_thresholds,
+    fetch_risk_snapshot,
+    shock_grid,
+    stress_lines,
+    stress_test,
+)
+from bot.rpc import batch_request, revert_reason
+from bot.tends import TendJob, fund_tends, tend_cost, tend_gas_limit, urgency_scores
+from bot.tick import TickContext, fetch_tick_context
+from bot.timing import attach_timing
+from bot.troves import sync_trove_index
+from bot.utils import load_state, notify, save_state
+from bot.watchdog import health, start_watchdog, supervised
 
 # =============================================================================
 # Constants
@@ -50,19 +57,27 @@ from bot.utils import format_time_ago, load_state, save_state
 
 TEND_CHECK_INTERVAL = int(os.getenv("TEND_CHECK_INTERVAL", "60"))  # 60 seconds default
 STATUS_REPORT_CRON = os.getenv("STATUS_REPORT_CRON", "0 8 * * *")  # Daily at 8 AM UTC
+STATUS_REPORT_MODE = os.getenv("STATUS_REPORT_MODE", "digest")  # "digest" (changes only) or "full"
 ALERT_COOLDOWN_SECONDS = int(os.getenv("TEND_TRIGGER_ALERT_COOLDOWN_SECONDS", "600"))  # 10 minutes default
 MIN_SIGNER_BALANCE = int(os.getenv("MIN_SIGNER_BALANCE", str(5 * 10**16)))  # 0.05 ETH default
 BALANCE_CHECK_INTERVAL = int(os.getenv("BALANCE_CHECK_INTERVAL", "18000"))  # 5 hours default
 UPTIME_PING_INTERVAL = int(os.getenv("UPTIME_PING_INTERVAL", "540"))  # 9 minutes default
+RPC_BUDGET_LOG_INTERVAL = int(os.getenv("RPC_BUDGET_LOG_INTERVAL", "3600"))  # 1 hour default
 VAULT_EVENT_POLL_INTERVAL = int(os.getenv("VAULT_EVENT_POLL_INTERVAL", "180"))  # 3 minutes default
-
-DEBT_IN_FRONT_HELPER = "0x4bb5E28FDB12891369b560f2Fab3C032600677c6"
-MAX_UINT256 = 2**256 - 1
-TROVE_STATUS = ["Non Existent", "Active", "Closed By Owner", "Closed By Liquidation", "Zombie"]
-LOOPER_VENUE_LABELS = {"morpho": "Morpho", "aave": "Aave", "flex": "Flex", "pawnbroker": "Pawn Broker"}
-
-# Track pending tends: strategy_address -> nonce used
-_pending_tends: dict[str, int] = {}
+RISK_CHECK_INTERVAL = int(os.getenv("RISK_CHECK_INTERVAL", str(TEND_CHECK_INTERVAL)))  # tend tick default
+TROVE_INDEX_SYNC_INTERVAL = int(os.getenv("TROVE_INDEX_SYNC_INTERVAL", "12"))  # every mainnet block
+MIN_DEBT_IN_FRONT = int(os.getenv("MIN_DEBT_IN_FRONT", str(1_000_000 * 10**18)))  # 1M BOLD default
+HANDLER_SLO_FACTOR = int(os.getenv("HANDLER_SLO_FACTOR", "3"))  # missed runs before a handler counts as stale
+DISCOVERY_INTERVAL = int(os.getenv("DISCOVERY_INTERVAL", "3600"))  # 1 hour default
+STRESS_CHECK_INTERVAL = int(os.getenv("STRESS_CHECK_INTERVAL", "3600"))  # 1 hour default
+ORACLE_POLL_INTERVAL = int(os.getenv("ORACLE_POLL_INTERVAL", "12"))  # every mainnet block
+NETWORK_CONFIG_POLL_INTERVAL = int(os.getenv("NETWORK_CONFIG_POLL_INTERVAL", "30"))  # NETWORKS_FILE mtime check
+STRESS_ALERT_SHOCK = float(os.getenv("STRESS_ALERT_SHOCK", "0.1"))  # alert if a 10% collateral drop liquidates
+VAULT_META_TTL = int(os.getenv("VAULT_META_TTL", "86400"))  # vault names rarely change, decimals never
+CACHE_STATS_LOG_INTERVAL = int(os.getenv("CACHE_STATS_LOG_INTERVAL", "3600"))  # 1 hour default
+
+# Track pending tends: strategy_address -> nonce used. Never expires: dropping an entry early could double-send.
+_pending_tends: CacheNamespace[str, int] = cache_namespace("pending_tends", max_entries=1024)
 
 
 # =============================================================================
@@ -70,463 +85,477 @@ _pending_tends: dict[str, int] = {}
 # =============================================================================
 
 
-async def check_tend_triggers(bot: TinyBot) -> None:
-    strategy_addrs = all_strategy_addrs()
+@at_priority("tend")
+async def check_tend_triggers(bot: TinyBot, strategy_addrs: list[str] | None = None) -> None:
+    if strategy_addrs is None:
+        strategy_addrs = all_strategy_addrs()
     if not strategy_addrs:
         return
 
-    w3 = bot.w3
-    calls = [w3_contract(w3, addr, BASE_STRATEGY_ABI).functions.tendTrigger() for addr in strategy_addrs]
-    results = multicall(w3, calls)
+    # Block, base fee, signer balance and nonce, every tendTrigger() and the names in one round trip
+    signer = bot.executor.address if bot.executor else None
+    ctx = fetch_tick_context(bot.w3, network(), strategy_addrs, signer)
 
     now_ts = int(time.time())
     net = network().capitalize()
 
-    for addr, (needs_tend, _data) in zip(strategy_addrs, results):
-        if not needs_tend:
-            continue
-
+    due: list[tuple[str, str]] = []
+    for addr in ctx.due:
         # Check cooldown
         state = load_state()
         last_ts = state.get("tend_alerts_ts", {}).get(addr, 0)
         if now_ts - last_ts < ALERT_COOLDOWN_SECONDS:
             continue
 
-        strategy_name = w3_contract(w3, addr, TOKENIZED_STRATEGY_ABI).functions.name().call()
-
         # Update cooldown
         state.setdefault("tend_alerts_ts", {})[addr] = now_ts
         save_state(state)
+        due.append((addr, ctx.names[addr]))
+
+    if not due:
+        return
+
+    # Simulate every due tend in one batched round trip; only broadcast the ones that would succeed
+    try:
+        simulations = simulate_tends(bot, [addr for addr, _ in due])
+    except Exception as e:
+        print(f"Tend simulation failed: {e}")
+        simulations = {}
+
+    # Most urgent first, each funded from the signer balance in that order
+    try:
+        jobs = queue_tends(bot, due, simulations, now_ts, ctx)
+    except Exception as e:
+        print(f"Tend queue ranking failed: {e}")
+        jobs = [TendJob(addr, name, 0.0, simulations.get(addr, (None, None))[0], funded=True) for addr, name in due]
+
+    for job in jobs:
+        gas_estimate, revert = simulations.get(job.address, (None, None))
+        if revert is not None:
+            simulation_line = f"<b>Simulation:</b> ❌ {revert}\n\n<i>Skipping tend...</i>\n"
+        elif not job.funded:
+            simulation_line = "<i>Skipping tend, signer balance can't cover it...</i>\n"
+        elif gas_estimate is not None:
+            simulation_line = f"<b>Simulation:</b> ✅ {gas_estimate:,} gas\n\n<i>Attempting to tend...</i>\n"
+        else:
+            simulation_line = "<i>Attempting to tend...</i>\n"
 
-        await notify_group_chat(
+        await notify(
             f"🚨 <b>Strategy needs tending!</b>\n\n"
-            f"<b>Name:</b> {strategy_name}\n"
-            f"<b>Network:</b> {net}\n\n"
-            f"<i>Attempting to tend...</i>\n"
+            f"<b>Name:</b> {job.name}\n"
+            f"<b>Network:</b> {net}\n"
+            f"{simulation_line}"
             f"<i>Sleeping for {int(ALERT_COOLDOWN_SECONDS / 60)} minutes...</i>\n\n"
-            f"<a href='{explorer_base_url()}{addr}'>🔗 View Strategy</a>"
+            f"<a href='{explorer_base_url()}{job.address}'>🔗 View Strategy</a>"
+        )
+
+        if revert is None and job.funded:
+            await execute_tend(bot, job.address, job.name, net, ctx, gas_estimate)
+
+    unfunded = [job for job in jobs if not job.funded]
+    if unfunded and bot.executor and ctx.balance is not None:
+        needed = sum(job.cost for job in jobs)
+        await notify(
+            f"💸 <b>Signer can't fund every due tend!</b>\n\n"
+            f"<b>Balance:</b> {ctx.balance / 1e18:.4f} ETH\n"
+            f"<b>Needed:</b> {needed / 1e18:.4f} ETH\n"
+            f"<b>Unfunded:</b> {', '.join(job.name for job in unfunded)}\n"
+            f"<b>Network:</b> {net}\n"
+            f"<b>Address:</b> <code>{bot.executor.address}</code>"
         )
 
-        await execute_tend(bot, addr, strategy_name, net)
+
+def queue_tends(
+    bot: TinyBot,
+    due: list[tuple[str, str]],
+    simulations: dict[str, tuple[int | None, str | None]],
+    now_ts: int,
+    ctx: TickContext,
+) -> list[TendJob]:
+    """Due tends ranked by urgency, with the ones the signer balance can pay for marked funded."""
+    addrs = {addr for addr, _ in due}
+    lb_addrs = [a for a in lender_borrower_addrs() + list(liquity_lender_borrower_map().keys()) if a in addrs]
+    looper_addrs = [a for a in all_looper_addrs() if a in addrs]
+    snapshot = fetch_risk_snapshot(bot.w3, network(), lb_addrs, looper_addrs)
+
+    # lastTend is on-chain for loopers; otherwise use our own last submission
+    submitted: dict[str, int] = load_state().get("tend_submitted_ts", {})
+    last_tend = {addr: submitted.get(addr, 0) for addr in addrs}
+    if looper_addrs:
+        calls = [w3_contract(bot.w3, a, LOOPER_ABI).functions.lastTend() for a in looper_addrs]
+        last_tend.update(zip(looper_addrs, cached_multicall(bot.w3, network(), calls)))
+    scores = urgency_scores(snapshot, last_tend, now_ts)
+
+    fallback_fee_gwei = None if fee_oracle.fresh else _fallback_fees(ctx.base_fee)[0]
+    jobs = []
+    for addr, name in due:
+        gas, revert = simulations.get(addr, (None, None))
+        max_fee_gwei = fallback_fee_gwei or fee_oracle.fees(_tend_urgency(addr))[0]
+        cost = 0 if revert is not None else tend_cost(gas, max_fee_gwei)
+        jobs.append(TendJob(addr, name, scores[addr], gas, cost))
+
+    if ctx.balance is None:
+        for job in jobs:
+            job.funded = True
+        return sorted(jobs, key=lambda job: job.urgency, reverse=True)
+    return fund_tends(jobs, ctx.balance)
+
+
+def simulate_tends(bot: TinyBot, strategy_addrs: list[str]) -> dict[str, tuple[int | None, str | None]]:
+    """eth_estimateGas every relayer.tendStrategy() against the pending block in one JSON-RPC batch.
+    Returns strategy -> (gas estimate, None) on success or (None, revert reason)."""
+    relayer_addr = cfg()["relayer"]
+    if not bot.executor or not relayer_addr or not strategy_addrs:
+        return {}
+
+    relayer_contract = w3_contract(bot.w3, relayer_addr, RELAYER_ABI)
+    requests = []
+    for addr in strategy_addrs:
+        tx = {
+            "from": bot.executor.address,
+            "to": relayer_contract.address,
+            "data": relayer_contract.encode_abi("tendStrategy", args=[Web3.to_checksum_address(addr)]),
+        }
+        requests.append(("eth_estimateGas", [tx, "pending"]))
+
+    simulations: dict[str, tuple[int | None, str | None]] = {}
+    for addr, response in zip(strategy_addrs, batch_request(bot.w3, requests)):
+        if "error" in response:
+            simulations[addr] = (None, revert_reason(response["error"]))
+        else:
+            simulations[addr] = (int(response["result"], 16), None)
+    return simulations
+
+
+def _tend_urgency(strategy_address: str) -> str:
+    # Strategies currently breaching a risk threshold (see check_risk_thresholds) pay for fast inclusion
+    return "high" if load_state().get("risk_breaches", {}).get(strategy_address) else "normal"
 
 
-async def execute_tend(bot: TinyBot, strategy_address: str, strategy_name: str, network_name: str) -> None:
+def _fallback_fees(base_fee: int) -> tuple[float, float]:
+    # (max fee, priority fee) in gwei for when the fee oracle has gone stale: base fee with 2x headroom + a fixed tip
+    priority_fee_gwei = 3 if network() == "ethereum" else 0.1
+    return base_fee / 1e9 * 2 + priority_fee_gwei, priority_fee_gwei
+
+
+@at_priority("tend")
+async def refresh_fee_oracle(bot: TinyBot) -> None:
     if not bot.executor:
         return
+    try:
+        fee_oracle.refresh(bot.w3)
+    except Exception as e:
+        print(f"Fee oracle refresh failed: {e}")
+
+
+async def execute_tend(
+    bot: TinyBot,
+    strategy_address: str,
+    strategy_name: str,
+    network_name: str,
+    ctx: TickContext,
+    gas_estimate: int | None = None,
+) -> None:
+    if not bot.executor or ctx.nonce is None:
+        return
 
     relayer_addr = cfg()["relayer"]
     if not relayer_addr:
         return
 
+    nonce = ctx.nonce
+
     # Skip if a tend tx for this strategy is still pending
-    if strategy_address in _pending_tends:
-        pending_nonce = _pending_tends[strategy_address]
-        current_nonce = bot.w3.eth.get_transaction_count(bot.executor.address)
-        if current_nonce <= pending_nonce:
-            return  # Previous tx still pending
-        del _pending_tends[strategy_address]  # Previous tx confirmed, clear it
+    pending_nonce = _pending_tends.get(strategy_address)
+    if pending_nonce is not None and nonce <= pending_nonce:
+        return  # Previous tx still pending (a confirmed one is simply overwritten below)
 
     # Track the nonce we're about to use
-    nonce = bot.w3.eth.get_transaction_count(bot.executor.address)
-    _pending_tends[strategy_address] = nonce
+    _pending_tends.set(strategy_address, nonce)
 
     relayer_contract = w3_contract(bot.w3, relayer_addr, RELAYER_ABI)
     call = relayer_contract.functions.tendStrategy(Web3.to_checksum_address(strategy_address))
 
     # Node reserves gas_limit * maxFeePerGas. A fixed maxFeePerGas either over-reserves
     # (high value -> "insufficient funds") or stalls when base fee climbs past it. Derive
-    # it from the live base fee: 2x headroom for inclusion + the priority tip.
-    priority_fee_gwei = 3 if network() == "ethereum" else 0.1
-    base_fee_gwei = bot.w3.eth.get_block("latest")["baseFeePerGas"] / 1e9
-    max_fee_gwei = base_fee_gwei * 2 + priority_fee_gwei
+    # it from the fee oracle's feeHistory window; only fall back to the live base fee with
+    # 2x headroom + a fixed tip if the oracle has gone stale.
+    if fee_oracle.fresh:
+        max_fee_gwei, priority_fee_gwei = fee_oracle.fees(_tend_urgency(strategy_address))
+    else:
+        max_fee_gwei, priority_fee_gwei = _fallback_fees(ctx.base_fee)
 
+    # Send with the gas limit queue_tends budgeted (the executor's own estimate pads by 1.5x), and skip
+    # the executor's eth_call when the batched simulation already ran
     tx_hash = bot.executor.execute(
-        call, max_fee_gwei=max_fee_gwei, max_priority_fee_gwei=priority_fee_gwei, wait=0
+        call,
+        gas_limit=tend_gas_limit(gas_estimate),
+        max_fee_gwei=max_fee_gwei,
+        max_priority_fee_gwei=priority_fee_gwei,
+        simulate=gas_estimate is None,
+        wait=0,
     )
 
+    state = load_state()
+    state.setdefault("tend_submitted_ts", {})[strategy_address] = int(time.time())
+    save_state(state)
+
     explorer_tx = explorer_base_url().replace("/address/", "/tx/")
-    await notify_group_chat(
-        f"✅ <b>Tend tx submitted</b>\n\n"
-        f"<b>Name:</b> {strategy_name}\n"
-        f"<b>Network:</b> {network_name}\n\n"
-        f"<a href='{explorer_tx}{tx_hash}'>🔗 View Transaction</a>"
-    )
+    msg = f"✅ <b>Tend tx submitted</b>\n\n<b>Name:</b> {strategy_name}\n<b>Network:</b> {network_name}\n"
+    if gas_estimate is not None:
+        msg += f"<b>Simulated Gas:</b> {gas_estimate:,}\n"
+    msg += f"\n<a href='{explorer_tx}{tx_hash}'>🔗 View Transaction</a>"
+    await notify(msg)
 
 
 # =============================================================================
-# Status Report
+# Risk Threshold Monitoring
 # =============================================================================
 
+RISK_FLAG_LABELS = {
+    "warning": "LTV at/over warning",
+    "liquidation": "Close to liquidation",
+    "leverage": "Leverage near max",
+}
 
-async def report_status(bot: TinyBot) -> None:
-    w3 = bot.w3
-    regular_addrs = lender_borrower_addrs()
-    liquity_map = liquity_lender_borrower_map()
-    liquity_addrs_set = set(liquity_map.keys())
-    all_lb_addrs = regular_addrs + list(liquity_map.keys())
+
+async def check_risk_thresholds(bot: TinyBot, only: set[str] | None = None) -> None:
+    lb_addrs = lender_borrower_addrs() + list(liquity_lender_borrower_map().keys())
     looper_addrs = all_looper_addrs()
-    morpho_set = {a.lower() for a in morpho_looper_addrs()}
-    flex_set = {a.lower() for a in flex_looper_addrs()}
-    pawn_set = {a.lower() for a in pawnbroker_looper_addrs()}
+    if only is not None:
+        lb_addrs = [a for a in lb_addrs if a in only]
+        looper_addrs = [a for a in looper_addrs if a in only]
+    if not lb_addrs and not looper_addrs:
+        return
 
-    if not all_lb_addrs and not looper_addrs:
+    w3 = bot.w3
+    snapshot = fetch_risk_snapshot(w3, network(), lb_addrs, looper_addrs)
+    breaches = breached_thresholds(snapshot, RISK_THRESHOLDS)
+
+    # Alert on transitions only: a new flag appearing, or a strategy clearing all of its flags
+    state = load_state()
+    previous: dict[str, list[str]] = state.get("risk_breaches", {})
+    changed = [
+        i for i, (addr, flags) in enumerate(zip(snapshot.addrs, breaches)) if set(flags) != set(previous.get(addr, []))
+    ]
+    if not changed:
         return
 
-    now_ts = int(time.time())
+    # A partial check only replaces the flags of the strategies it looked at
+    kept = {} if only is None else {a: f for a, f in previous.items() if a not in snapshot.addrs}
+    state["risk_breaches"] = kept | {addr: flags for addr, flags in zip(snapshot.addrs, breaches) if flags}
+    save_state(state)
+
     net = network().capitalize()
-    explorer_url = explorer_base_url()
-    oracle = w3_contract(w3, APR_ORACLE_ADDRESS, APR_ORACLE_ABI)
-
-    for addr in all_lb_addrs:
-        is_liquity = addr in liquity_addrs_set
-        coll_index = liquity_map.get(addr, 0)
-        await report_strategy(w3, addr, is_liquity, coll_index, now_ts, oracle, net, explorer_url)
-
-    for addr in looper_addrs:
-        if addr.lower() in morpho_set:
-            venue = "morpho"
-        elif addr.lower() in flex_set:
-            venue = "flex"
-        elif addr.lower() in pawn_set:
-            venue = "pawnbroker"
+    names = strategy_names(w3, network(), [snapshot.addrs[i] for i in changed])
+    for i, name in zip(changed, names):
+        addr = snapshot.addrs[i]
+        new_flags = [f for f in breaches[i] if f not in previous.get(addr, [])]
+        if not breaches[i]:
+            header = "✅ <b>Strategy back within risk thresholds</b>"
+        elif not new_flags:
+            continue  # only some flags cleared, nothing new to shout about
         else:
-            venue = "aave"
-        await report_looper(w3, addr, venue, now_ts, oracle, net, explorer_url)
+            header = "⚠️ <b>Risk threshold crossed!</b>\n\n" + "\n".join(
+                f"<b>{RISK_FLAG_LABELS[f]}</b>" for f in new_flags
+            )
 
+        msg = (
+            f"{header}\n\n"
+            f"<b>Name:</b> {name}\n"
+            f"<b>LTV:</b> {snapshot.ltv[i] * 100:.2f}%\n"
+            f"<b>Liquidation LTV:</b> {snapshot.liquidation_ltv[i] * 100:.2f}%\n"
+            f"<b>Liquidation Distance:</b> {snapshot.liquidation_distance[i] * 100:.1f}% price drop\n"
+        )
+        if snapshot.is_looper[i]:
+            msg += (
+                f"<b>Leverage:</b> {snapshot.leverage[i]:.2f}x "
+                f"(target {snapshot.target_leverage[i]:.2f}x, max {snapshot.max_leverage[i]:.2f}x)\n"
+            )
+        else:
+            msg += f"<b>Warning LTV:</b> {snapshot.warning_ltv[i] * 100:.2f}%\n"
+        msg += f"<b>Network:</b> {net}\n\n<a href='{explorer_base_url()}{addr}'>🔗 View Strategy</a>"
 
-async def report_strategy(
-    w3: Web3,
-    address: str,
-    is_liquity: bool,
-    coll_index: int,
-    now_ts: int,
-    oracle: object,
-    network_name: str,
-    explorer_url: str,
-) -> None:
-    addr = Web3.to_checksum_address(address)
-    contract = w3_contract(w3, address, LENDER_BORROWER_ABI)
-    strategy = w3_contract(w3, address, TOKENIZED_STRATEGY_ABI)
-
-    # Prepare base multicall
-    calls = [
-        strategy.functions.totalAssets(),
-        contract.functions.name(),
-        contract.functions.getCurrentLTV(),
-        contract.functions.getLiquidateCollateralFactor(),
-        contract.functions.targetLTVMultiplier(),
-        contract.functions.warningLTVMultiplier(),
-        contract.functions.balanceOfDebt(),
-        contract.functions.balanceOfLentAssets(),
-        contract.functions.lastReport(),
-        contract.functions.tendTrigger(),
-        contract.functions.asset(),
-        contract.functions.borrowToken(),
-    ]
+        await notify(msg)
 
-    if not is_liquity:
-        calls.append(contract.functions.lenderVault())
 
-    if is_liquity:
-        calls.append(contract.functions.troveId())
-        calls.append(contract.functions.TROVE_MANAGER())
+async def check_stress(bot: TinyBot) -> None:
+    lb_addrs = lender_borrower_addrs() + list(liquity_lender_borrower_map().keys())
+    looper_addrs = all_looper_addrs()
+    if not lb_addrs and not looper_addrs:
+        return
 
-    results = multicall(w3, calls)
+    w3 = bot.w3
+    snapshot = fetch_risk_snapshot(w3, network(), lb_addrs, looper_addrs)
+    result = stress_test(snapshot, shock_grid())
+    i = result.at(STRESS_ALERT_SHOCK)
+    liquidated = sorted(addr for addr, hit in zip(snapshot.addrs, result.crosses_liquidation[i]) if hit)
+
+    # Only alert when the set of positions liquidated at the alert shock changes
+    state = load_state()
+    if liquidated == state.get("stress_liquidated", []):
+        return
+    state["stress_liquidated"] = liquidated
+    save_state(state)
+    if not liquidated:
+        return
+
+    names = strategy_names(w3, network(), snapshot.addrs)
+    await notify(
+        f"💥 <b>Stress test: {len(liquidated)} position(s) liquidated at -{STRESS_ALERT_SHOCK * 100:g}%</b>\n\n"
+        + "\n".join(stress_lines(names, result, STRESS_REPORT_LEVELS))
+        + f"\n\n<b>Network:</b> {network().capitalize()}"
+    )
 
-    # Skip if no assets
-    total_assets = results[0]
-    if total_assets == 0:
+
+# =============================================================================
+# Redemption Risk
+# =============================================================================
+
+
+async def check_redemption_risk(bot: TinyBot) -> None:
+    liquity_map = liquity_lender_borrower_map()
+    if not liquity_map:
         return
 
-    # Unpack base results
-    (
-        _,
-        name,
-        raw_current_ltv,
-        collateral_factor,
-        target_ltv_mult,
-        warning_ltv_mult,
-        balance_of_debt,
-        balance_of_lent_assets,
-        last_report,
-        tend_trigger_result,
-        asset_address,
-        borrow_token_address,
-    ) = results[:12]
-
-    # Second multicall: token info + APR + conditional data
-    borrow_token = w3_contract(w3, borrow_token_address, ERC20_ABI)
-    calls2 = [
-        borrow_token.functions.decimals(),
-        borrow_token.functions.symbol(),
-        oracle.functions.getStrategyApr(addr, 0),
-    ]
+    w3 = bot.w3
+    calls = []
+    for addr in liquity_map:
+        contract = w3_contract(w3, addr, LENDER_BORROWER_ABI)
+        calls.extend([contract.functions.troveId(), contract.functions.TROVE_MANAGER()])
+    results = cached_multicall(w3, network(), calls)
 
-    # For non-liquity, fetch lender vault max withdraw
-    if not is_liquity:
-        lender_vault_address = results[12]
-        lender_vault = w3_contract(w3, lender_vault_address, LENDER_VAULT_ABI)
-        calls2.append(lender_vault.functions.maxWithdraw(addr))
-
-    # For liquity, fetch trove data and debt in front via direct calls (tuple returns not supported by multicall)
-    if is_liquity:
-        trove_id, trove_manager_address = results[12], results[13]
-        trove_manager = w3_contract(w3, trove_manager_address, TROVE_MANAGER_ABI)
-        debt_helper = w3_contract(w3, DEBT_IN_FRONT_HELPER, DEBT_IN_FRONT_HELPER_ABI)
-
-    token_results = multicall(w3, calls2)
-    borrow_decimals, borrow_symbol = token_results[0], token_results[1]
-    expected_apr = token_results[2] / 1e16
-
-    # Calculate values
-    debt_formatted = balance_of_debt / (10**borrow_decimals)
-    lent_formatted = balance_of_lent_assets / (10**borrow_decimals)
-
-    if not is_liquity:
-        lender_max_withdraw = token_results[3]
-        max_withdraw_formatted = lender_max_withdraw / (10**borrow_decimals)
-        max_withdraw_pct = (lender_max_withdraw / balance_of_lent_assets * 100) if balance_of_lent_assets > 0 else 0.0
-
-    expected_profit = max(0, lent_formatted - debt_formatted)
-    time_str = format_time_ago(now_ts - last_report)
-    tend_status = tend_trigger_result[0]
-    liquidation_threshold = collateral_factor / 1e16
-
-    # Build message
-    msg = (
-        f"{random.choice(EMOJIS)} <b>{name}</b>\n\n"
-        f"<b>LTV:</b> {raw_current_ltv / 1e16:.1f}%\n"
-        f"<b>Target:</b> {liquidation_threshold * target_ltv_mult / 1e4:.1f}%\n"
-        f"<b>Warning:</b> {liquidation_threshold * warning_ltv_mult / 1e4:.1f}%\n"
-        f"<b>Liquidation:</b> {liquidation_threshold:.1f}%\n"
-        f"<b>Expected APR:</b> {expected_apr:.2f}%\n"
-    )
+    now_ts = int(time.time())
+    state = load_state()
+    exposed: list[str] = state.get("redemption_exposed", [])
+    for i, addr in enumerate(liquity_map):
+        trove_id, trove_manager_address = results[2 * i], results[2 * i + 1]
+        # the backfill is up to TROVE_INDEX_MAX_CHUNKS eth_getLogs, and a report thread may hold the index
+        index = await asyncio.to_thread(sync_trove_index, w3, trove_manager_address)
+        if not index.ready:
+            continue  # still backfilling
+        debt_in_front = await asyncio.to_thread(index.debt_in_front, trove_id, now_ts)
+        if debt_in_front is None:
+            continue
 
-    if is_liquity:
-        trove_data = trove_manager.functions.getLatestTroveData(trove_id).call()
-        annual_interest_rate = trove_data[6]  # annualInterestRate is at index 6
-        last_rate_adj_time = trove_data[9]  # lastInterestRateAdjTime is at index 9
-        trove_status_raw = trove_manager.functions.getTroveStatus(trove_id).call()
-        trove_status = TROVE_STATUS[trove_status_raw]
-        debt_result = debt_helper.functions.getDebtBetweenInterestRateAndTrove(
-            coll_index, 0, MAX_UINT256, trove_id, 0, 0
-        ).call()
-        debt_in_front = debt_result[0]
-        msg += f"\n<b>Trove Status:</b> {trove_status}\n"
-        msg += f"<b>Trove Interest Rate:</b> {annual_interest_rate / 1e16:.2f}%\n"
-        msg += f"<b>Last Rate Adjustment:</b> {format_time_ago(now_ts - last_rate_adj_time)}\n"
-        msg += f"<b>Debt In Front:</b> {debt_in_front / 1e18:,.2f} {borrow_symbol}\n"
-
-    msg += (
-        f"\n<b>Amount Borrowed:</b> {debt_formatted:.2f} {borrow_symbol}\n"
-        f"<b>Amount in Lender Vault:</b> {lent_formatted:.2f} {borrow_symbol}\n"
-        f"<b>Expected Profit:</b> {expected_profit:.2f} {borrow_symbol}\n"
-    )
+        # Alert once when debt in front drops below the minimum, re-arm when it recovers
+        if debt_in_front >= MIN_DEBT_IN_FRONT:
+            if addr in exposed:
+                exposed.remove(addr)
+            continue
+        if addr in exposed:
+            continue
+        exposed.append(addr)
+
+        (strategy_name,) = strategy_names(w3, network(), [addr])
+        await notify(
+            f"🎯 <b>Redemption risk!</b>\n\n"
+            f"<b>Name:</b> {strategy_name}\n"
+            f"<b>Debt In Front:</b> {debt_in_front / 1e18:,.2f}\n"
+            f"<b>Minimum:</b> {MIN_DEBT_IN_FRONT / 1e18:,.2f}\n"
+            f"<b>Network:</b> {network().capitalize()}\n\n"
+            f"<a href='{explorer_base_url()}{addr}'>🔗 View Strategy</a>"
+        )
+
+    state["redemption_exposed"] = exposed
+    save_state(state)
+
+
+# =============================================================================
+# Strategy Discovery
+# =============================================================================
 
-    if not is_liquity:
-        msg += f"<b>Lender Max Withdraw:</b> {max_withdraw_formatted:,.2f} {borrow_symbol} ({max_withdraw_pct:.1f}%)\n"
 
-    msg += (
-        f"\n<b>Last Report:</b> {time_str}\n"
-        f"<b>Tend Trigger:</b> {tend_status}\n"
-        f"<b>Network:</b> {network_name}\n\n"
-        f"<a href='{explorer_url}{address}'>🔗 View Strategy</a>"
+async def refresh_discovery(bot: TinyBot) -> None:
+    before = set(all_strategy_addrs())
+    try:
+        discover_strategies(bot.w3, network(), allocator_vault_addrs())
+    except Exception as e:
+        print(f"Strategy discovery failed: {e}")
+        return
+
+    added = [addr for addr in all_strategy_addrs() if addr not in before]
+    if not added:
+        return
+    shown = added[:20]  # keep the message well under Telegram's size limit on a first run
+    names = strategy_names(bot.w3, network(), shown)
+    lines = "\n".join(f"<a href='{explorer_base_url()}{a}'>{name}</a>" for a, name in zip(shown, names))
+    if len(added) > len(shown):
+        lines += f"\n<i>...and {len(added) - len(shown)} more</i>"
+    await notify(
+        f"🔭 <b>Now monitoring {len(added)} discovered strateg{'y' if len(added) == 1 else 'ies'}</b>\n\n"
+        f"{lines}\n\n<b>Network:</b> {network().capitalize()}"
     )
 
-    await notify_group_chat(msg)
 
+# =============================================================================
+# Oracle Updates
+# =============================================================================
 
-async def report_looper(
-    w3: Web3,
-    address: str,
-    venue: str,
-    now_ts: int,
-    oracle: object,
-    network_name: str,
-    explorer_url: str,
-) -> None:
-    addr = Web3.to_checksum_address(address)
-    looper = w3_contract(w3, address, LOOPER_ABI)
-
-    # Base multicall
-    calls = [
-        looper.functions.totalAssets(),
-        looper.functions.name(),
-        looper.functions.asset(),
-        looper.functions.collateralToken(),
-        looper.functions.estimatedTotalAssets(),
-        looper.functions.balanceOfCollateral(),
-        looper.functions.balanceOfAsset(),
-        looper.functions.position(),
-        looper.functions.getCurrentLTV(),
-        looper.functions.getCurrentLeverageRatio(),
-        looper.functions.targetLeverageRatio(),
-        looper.functions.leverageBuffer(),
-        looper.functions.maxLeverageRatio(),
-        looper.functions.getLiquidateCollateralFactor(),
-        looper.functions.minTendInterval(),
-        looper.functions.reportBuffer(),
-        looper.functions.lastTend(),
-        looper.functions.lastReport(),
-        looper.functions.tendTrigger(),
-    ]
 
-    if venue == "morpho":
-        calls.append(looper.functions.marketId())
-    elif venue == "aave":
-        calls.append(looper.functions.DATA_PROVIDER())
-    elif venue == "flex":
-        # flex loopers borrow via a Liquity-style trove; fetch its id + manager for the rate
-        calls.append(looper.functions.troveId())
-        calls.append(looper.functions.TROVE_MANAGER())
-    elif venue == "pawnbroker":
-        # pawn broker loopers borrow from a PawnBroker; fetch its address for the rate
-        calls.append(looper.functions.PAWN_BROKER())
-
-    results = multicall(w3, calls)
-
-    total_assets = results[0]
-    if total_assets == 0:
+async def learn_oracle_feeds(bot: TinyBot) -> None:
+    lb_addrs = lender_borrower_addrs() + list(liquity_lender_borrower_map().keys())
+    await asyncio.to_thread(oracle_watcher.learn, bot.w3, lb_addrs + all_looper_addrs())
+
+
+async def check_oracle_updates(bot: TinyBot) -> None:
+    """Re-run the risk and tend checks for just the strategies whose price feeds moved."""
+    affected = oracle_watcher.poll(bot.w3)
+    if not affected:
         return
+    await check_risk_thresholds(bot, only=affected)
+    await check_tend_triggers(bot, [addr for addr in all_strategy_addrs() if addr in affected])
 
-    (
-        _,
-        name,
-        asset_addr,
-        collateral_addr,
-        estimated_assets,
-        collateral_amount,
-        idle_amount,
-        position_data,
-        current_ltv,
-        current_leverage,
-        target_leverage,
-        buffer,
-        max_leverage,
-        liquidation_ltv,
-        min_tend,
-        report_buffer,
-        last_tend,
-        last_report,
-        tend_trigger_result,
-    ) = results[:19]
-
-    collateral_value, position_debt = position_data[0], position_data[1]
-    trigger, reason = tend_trigger_result[0], tend_trigger_result[1]
-
-    # Token info multicall
-    asset_token = w3_contract(w3, asset_addr, ERC20_ABI)
-    collateral_token = w3_contract(w3, collateral_addr, ERC20_ABI)
-    token_results = multicall(
-        w3,
-        [
-            asset_token.functions.decimals(),
-            asset_token.functions.symbol(),
-            collateral_token.functions.decimals(),
-            collateral_token.functions.symbol(),
-            oracle.functions.getStrategyApr(addr, 0),
-        ],
-    )
-    asset_decimals, asset_symbol, collateral_decimals, collateral_symbol, expected_apr_raw = token_results
-    expected_apr = expected_apr_raw / 1e16
 
-    asset_scale = 10**asset_decimals
-    collateral_scale = 10**collateral_decimals
+# =============================================================================
+# Status Report
+# =============================================================================
+
+
+# background report runs, kept referenced until done
+_report_tasks: set[asyncio.Task[None]] = set()
 
-    # Borrow rate (venue-specific)
-    borrow_rate_str = ""
-    if venue == "morpho":
-        market_id = results[19]
-        morpho = w3_contract(w3, morpho_address(), MORPHO_ABI)
-        try:
-            market_params = morpho.functions.idToMarketParams(market_id).call()
-            market_data = morpho.functions.market(market_id).call()
-            irm_addr = market_params[3]
-            irm = w3_contract(w3, irm_addr, MORPHO_IRM_ABI)
-            borrow_rate_wad = irm.functions.borrowRateView(market_params, market_data).call()
-            seconds_per_year = 365 * 24 * 60 * 60
-            rate_per_second = borrow_rate_wad / 1e18
-            apy = (math.exp(rate_per_second * seconds_per_year) - 1) * 100
-            borrow_rate_str = f"{apy:.2f}% APY"
-        except Exception as e:
-            borrow_rate_str = f"n/a ({e})"
-    elif venue == "aave":
-        data_provider_addr = results[19]
-        try:
-            data_provider = w3_contract(w3, data_provider_addr, AAVE_DATA_PROVIDER_ABI)
-            reserve_data = data_provider.functions.getReserveData(Web3.to_checksum_address(asset_addr)).call()
-            variable_borrow_rate_ray = reserve_data[6]
-            seconds_per_year = 365 * 24 * 60 * 60
-            apr = (variable_borrow_rate_ray / 1e27) * 100
-            apy = ((1 + (variable_borrow_rate_ray / 1e27) / seconds_per_year) ** seconds_per_year - 1) * 100
-            borrow_rate_str = f"{apr:.2f}% APR ({apy:.2f}% APY)"
-        except Exception as e:
-            borrow_rate_str = f"n/a ({e})"
-    elif venue == "flex":
-        # flex loopers borrow from a Liquity-style trove; the trove's annualInterestRate is the
-        # borrow rate, scaled by the borrow token's decimals (asset_scale).
-        trove_id, trove_manager_addr = results[19], results[20]
-        try:
-            trove_manager = w3_contract(w3, trove_manager_addr, TROVE_MANAGER_ABI)
-            trove = trove_manager.functions.troves(trove_id).call()
-            annual_interest_rate = trove[2]
-            borrow_rate_str = f"{annual_interest_rate / asset_scale * 100:.2f}% APR"
-        except Exception as e:
-            borrow_rate_str = f"n/a ({e})"
-    elif venue == "pawnbroker":
-        # pawn broker loopers borrow from a PawnBroker; rate() is the annualized rate in basis points
-        pawn_broker_addr = results[19]
-        try:
-            pawn_broker = w3_contract(w3, pawn_broker_addr, PAWN_BROKER_ABI)
-            rate_bps = pawn_broker.functions.rate().call()
-            borrow_rate_str = f"{rate_bps / 100:.2f}% APR"
-        except Exception as e:
-            borrow_rate_str = f"n/a ({e})"
-
-    # Calculations
-    target_min = target_leverage - buffer if target_leverage > buffer else 0
-    target_max = target_leverage + buffer
-    report_discount_amount = collateral_value * report_buffer // 10_000 if report_buffer > 0 else 0
-    no_buffer_estimated_assets = estimated_assets + report_discount_amount
-
-    # Build message
-    venue_label = LOOPER_VENUE_LABELS.get(venue, venue.capitalize())
-    msg = (
-        f"{random.choice(EMOJIS)} <b>{name}</b>\n\n"
-        f"<b>Venue:</b> {venue_label}\n"
-        f"<b>Collateral:</b> {collateral_symbol}\n"
-        f"<b>Borrowed:</b> {asset_symbol}\n\n"
-        f"<b>Total Assets:</b> {total_assets / asset_scale:,.4f} {asset_symbol}\n"
-        f"<b>Estimated Assets:</b> {estimated_assets / asset_scale:,.4f} {asset_symbol}\n"
-        f"<b>Idle Assets:</b> {idle_amount / asset_scale:,.4f} {asset_symbol}\n"
-        f"<b>Report Buffer:</b> {report_buffer / 100:.2f}%\n"
-    )
-    if report_buffer > 0:
-        msg += (
-            f"<b>No-Buffer Estimated:</b> {no_buffer_estimated_assets / asset_scale:,.4f} {asset_symbol} "
-            f"(discount {report_discount_amount / asset_scale:,.4f})\n"
-        )
-    msg += (
-        f"\n<b>Collateral:</b> {collateral_amount / collateral_scale:,.4f} {collateral_symbol}\n"
-        f"<b>Collateral Value:</b> {collateral_value / asset_scale:,.4f} {asset_symbol}\n"
-        f"<b>Debt:</b> {position_debt / asset_scale:,.4f} {asset_symbol}\n\n"
-        f"<b>Current LTV:</b> {current_ltv / 1e16:.2f}%\n"
-        f"<b>Liquidation LTV:</b> {liquidation_ltv / 1e16:.2f}%\n\n"
-        f"<b>Current Leverage:</b> {current_leverage / 1e18:.2f}x\n"
-        f"<b>Target Leverage:</b> {target_leverage / 1e18:.2f}x "
-        f"(range {target_min / 1e18:.2f}x - {target_max / 1e18:.2f}x)\n"
-        f"<b>Max Leverage:</b> {max_leverage / 1e18:.2f}x\n\n"
-        f"<b>Borrow Rate:</b> {borrow_rate_str}\n"
-        f"<b>Expected APR:</b> {expected_apr:.2f}%\n\n"
-        f"<b>Tend Trigger:</b> {trigger}\n"
-        f"<b>Min Tend Interval:</b> {min_tend // 60} min\n"
-        f"<b>Last Tend:</b> {format_time_ago(now_ts - last_tend)}\n"
-        f"<b>Last Report:</b> {format_time_ago(now_ts - last_report)}\n\n"
-        f"<b>Network:</b> {network_name}\n\n"
-        f"<a href='{explorer_url}{address}'>🔗 View Strategy</a>"
-    )
 
-    await notify_group_chat(msg)
+@at_priority("report")
+async def report_status(bot: TinyBot) -> None:
+    # tinybot awaits its handlers one at a time, so build the report in the background: its reads wait
+    # for RPC budget in a worker thread while tend ticks carry on
+    task = asyncio.create_task(send_status_report(bot))
+    _report_tasks.add(task)
+    task.add_done_callback(_report_done)
+
+
+def _report_done(task: asyncio.Task[None]) -> None:
+    _report_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Status report failed: {task.exception()}")
+
+
+@at_priority("report")
+async def send_status_report(bot: TinyBot) -> None:
+    reports = await asyncio.to_thread(network_reports, bot.w3, network(), int(time.time()))
+    state = load_state()
+    previous: dict[str, dict[str, Any]] = state.get("status_snapshots", {})
+    if not reports and not previous:
+        return
+
+    if STATUS_REPORT_MODE == "full":
+        messages = [r.message for r in reports]
+        snapshots = {r.address: r.metrics for r in reports}
+    else:
+        messages, snapshots = build_digest(network(), reports, previous, explorer_base_url())
+
+    # Move the baselines only once every message went out, otherwise a change whose send failed would
+    # never be reported
+    try:
+        for msg in messages:
+            await notify(msg, strict=True)
+    except Exception as e:
+        print(f"Status report send failed, keeping the previous snapshots: {e}")
+        return
+    state = load_state()
+    state["status_snapshots"] = snapshots
+    save_state(state)
 
 
 # =============================================================================
@@ -540,7 +569,7 @@ async def check_signer_balance(bot: TinyBot) -> None:
     balance = bot.executor.balance
     min_balance = MIN_SIGNER_BALANCE if network() == "ethereum" else MIN_SIGNER_BALANCE // 10
     if balance < min_balance:
-        await notify_group_chat(
+        await notify(
             f"⚠️ <b>Low signer balance!</b>\n\n"
             f"<b>Balance:</b> {balance / 1e18:.4f} ETH\n"
             f"<b>Minimum:</b> {min_balance / 1e18:.4f} ETH\n"
@@ -555,22 +584,72 @@ async def check_signer_balance(bot: TinyBot) -> None:
 
 
 async def ping_uptime_monitor(bot: TinyBot) -> None:
-    url = uptime_push_url()
+    # Only push "up" while the loop is responsive and every supervised handler is within its SLO;
+    # otherwise push "down" with the lag / stale handler details so the monitor shows why
+    healthy, details, lag_ms = health()
+    url = uptime_push_url(status="up" if healthy else "down", msg=details, ping=f"{lag_ms:.0f}")
     if not url:
         return
     try:
         req = Request(url, headers={"User-Agent": "ydegen-monitor-bot"})  # noqa: S310
-        urlopen(req, timeout=10)  # noqa: S310
+        await asyncio.to_thread(urlopen, req, timeout=10)  # noqa: S310
     except Exception as e:
         print(f"Uptime ping failed: {e}")
 
 
+# =============================================================================
+# RPC Budget and Caches
+# =============================================================================
+
+
+async def log_rpc_budget(bot: TinyBot) -> None:
+    for line in budget_lines():
+        print(f"RPC budget {line}")
+
+
+async def log_cache_stats(bot: TinyBot) -> None:
+    for line in cache_lines():
+        print(f"Cache {line}")
+
+
+# =============================================================================
+# Config Reload
+# =============================================================================
+
+
+async def reload_network_config(bot: TinyBot) -> None:
+    """Apply NETWORKS_FILE edits live. Handlers read the config on every run, so new strategies are
+    picked up on their next tick; only the vault listeners and the pending-tend tracking need a nudge.
+    Caches and listener cursors of everything still configured are kept."""
+    diff = reload_networks().get(network())
+    if diff is None:
+        return
+
+    for addrs in diff.removed.values():
+        for addr in addrs:
+            _pending_tends.pop(addr)
+    if "allocator_vaults" in diff.added or "allocator_vaults" in diff.removed:
+        _sync_vault_listeners(bot)
+
+    lines = [f"+ {key}: {', '.join(addrs)}" for key, addrs in diff.added.items()]
+    lines += [f"− {key}: {', '.join(addrs)}" for key, addrs in diff.removed.items()]
+    lines += [f"~ {key}" for key in diff.changed]
+    if not lines:
+        return
+    print(f"Network config reloaded: {'; '.join(lines)}")
+    await notify(f"🔧 <b>{network().capitalize()} config reloaded</b>\n\n" + "\n".join(lines))
+
+
 # =============================================================================
 # Allocator Vault Event Monitoring
 # =============================================================================
 
+VAULT_EVENTS = ("Deposit", "Withdraw", "StrategyReported")
+
 # vault address -> (vault_name, asset_symbol, asset_decimals, vault_decimals)
-_vault_meta_cache: dict[str, tuple[str, str, int, int]] = {}
+_vault_meta_cache: CacheNamespace[str, tuple[str, str, int, int]] = cache_namespace(
+    "vault_meta", max_entries=256, ttl=VAULT_META_TTL
+)
 
 
 def _short_addr(addr: str) -> str:
@@ -589,17 +668,69 @@ def _vault_meta(w3: Web3, vault_address: str) -> tuple[str, str, int, int]:
     asset = w3_contract(w3, asset_address, ERC20_ABI)
     asset_symbol, asset_decimals = multicall(w3, [asset.functions.symbol(), asset.functions.decimals()])
     meta = (name, asset_symbol, asset_decimals, vault_decimals)
-    _vault_meta_cache[key] = meta
+    _vault_meta_cache.set(key, meta)
     return meta
 
 
 def _strategy_name(w3: Web3, address: str) -> str:
     try:
-        return str(w3_contract(w3, address, TOKENIZED_STRATEGY_ABI).functions.name().call())
+        (name,) = strategy_names(w3, network(), [address])
+        return name
     except Exception:
         return _short_addr(address)
 
 
+async def _track_flow(w3: Web3, vault_address: str, name: str, symbol: str, assets: float, deposit: bool) -> None:
+    now_ts = int(time.time())
+    flow_tracker.record(vault_address, name, symbol, assets, deposit, now_ts)
+    if deposit:
+        return  # a deposit can only shrink the net outflow
+
+    _, _, asset_decimals, _ = _vault_meta(w3, vault_address)
+    (total_assets,) = cached_multicall(
+        w3, network(), [w3_contract(w3, vault_address, VAULT_ABI).functions.totalAssets()]
+    )
+    total = total_assets / 10**asset_decimals
+    for window, stats in flow_tracker.crossed(vault_address, total, now_ts).items():
+        await notify(
+            f"🌊 <b>Outflow alert</b> — {name}\n\n"
+            f"<b>Last {window}:</b> {flow_line(stats, symbol)}\n"
+            f"<b>Net Outflow:</b> {outflow_pct(stats, total):.1f}% of the vault "
+            f"(alert at {FLOW_ALERT_OUTFLOW_PCT[window]:g}%), {total:,.2f} {symbol} left\n"
+            f"<b>Network:</b> {network().capitalize()}\n\n"
+            f"<a href='{explorer_base_url()}{vault_address}'>🔗 View Vault</a>"
+        )
+
+
+def _sync_vault_listeners(bot: TinyBot) -> None:
+    """Point the vault event listeners at the configured allocator vaults, keeping their block cursors."""
+    vault_addrs = [Web3.to_checksum_address(a) for a in allocator_vault_addrs()]
+    for event_name in VAULT_EVENTS:
+        name = f"vault_{event_name.lower()}"
+        try:
+            listener = bot.get_listener(name)
+        except ValueError:
+            if vault_addrs:
+                bot.listen(
+                    event=event_name,
+                    addresses=vault_addrs,
+                    abi=VAULT_ABI,
+                    handler=on_vault_event,
+                    name=name,
+                    poll_interval=VAULT_EVENT_POLL_INTERVAL,
+                )
+            continue
+
+        for addr in [a for a in listener.addresses if a not in vault_addrs]:
+            listener.remove_address(addr)
+        for addr in vault_addrs:
+            listener.add_address(addr)
+        if not listener.addresses:
+            # tinybot can't poll a listener without addresses and has no way to unregister one. Its cursor
+            # stays in bot.state.last_block, so re-listening under the same name resumes from there
+            bot._listeners.remove(listener)
+
+
 async def on_vault_event(bot: TinyBot, log: Any) -> None:
     w3 = bot.w3
     name, asset_symbol, asset_decimals, vault_decimals = _vault_meta(w3, log["address"])
@@ -612,6 +743,9 @@ async def on_vault_event(bot: TinyBot, log: Any) -> None:
     event = log["event"]
     args = log["args"]
 
+    if event in ("Deposit", "Withdraw"):
+        await _track_flow(w3, log["address"], name, asset_symbol, args["assets"] / asset_scale, event == "Deposit")
+
     if event == "Deposit":
         msg = (
             f"💰 <b>Deposit</b> — {name}\n\n"
@@ -639,7 +773,7 @@ async def on_vault_event(bot: TinyBot, log: Any) -> None:
     else:
         return
 
-    await notify_group_chat(msg)
+    await notify(msg)
 
 
 # =============================================================================
@@ -647,35 +781,53 @@ async def on_vault_event(bot: TinyBot, log: Any) -> None:
 # =============================================================================
 
 
-async def run() -> None:
+def make_bot(private_key: str, rpc_url: str = "") -> TinyBot:
+    """rpc_url defaults to RPC_URL, then the network's own RPC variable."""
     from bot.config import NETWORK_RPC_ENVS
 
-    rpc_url = os.environ.get("RPC_URL") or os.environ[NETWORK_RPC_ENVS.get(network(), "RPC_URL")]
-    private_key = os.getenv("BOT_PRIVATE_KEY", "")
-
+    rpc_url = rpc_url or os.environ.get("RPC_URL") or os.environ[NETWORK_RPC_ENVS.get(network(), "RPC_URL")]
     bot = TinyBot(rpc_url=rpc_url, name=f"📡 {network()} yDegen", private_key=private_key)
+    govern(attach_cassette(attach_timing(bot.w3), network()), network())
+    return bot
+
+
+async def run() -> None:
+    if CASSETTE_MODE == "replay":
+        # the full bot would still message Telegram, take commands and ping Uptime Kuma
+        raise SystemExit("CASSETTE_MODE=replay only runs one-shot: python -m bot run <handler>")
+    bot = make_bot(os.getenv("BOT_PRIVATE_KEY", ""))
+    start_watchdog()
 
     if network() == "ethereum":
         from bot.tg import start_command_listener
 
         start_command_listener()
 
-    bot.every(interval=TEND_CHECK_INTERVAL, handler=check_tend_triggers)
+    bot.every(interval=DISCOVERY_INTERVAL, handler=refresh_discovery)
+    bot.every(interval=FEE_REFRESH_INTERVAL, handler=refresh_fee_oracle)
+    bot.every(
+        interval=TEND_CHECK_INTERVAL,
+        handler=supervised("tend_check", TEND_CHECK_INTERVAL * HANDLER_SLO_FACTOR, check_tend_triggers),
+    )
+    bot.every(
+        interval=RISK_CHECK_INTERVAL,
+        handler=supervised("risk_check", RISK_CHECK_INTERVAL * HANDLER_SLO_FACTOR, check_risk_thresholds),
+    )
+    bot.every(interval=DISCOVERY_INTERVAL, handler=learn_oracle_feeds)
+    bot.every(interval=ORACLE_POLL_INTERVAL, handler=check_oracle_updates)
+    bot.every(interval=STRESS_CHECK_INTERVAL, handler=check_stress)
+    bot.every(
+        interval=TROVE_INDEX_SYNC_INTERVAL,
+        handler=supervised("redemption_check", TROVE_INDEX_SYNC_INTERVAL * HANDLER_SLO_FACTOR, check_redemption_risk),
+    )
     bot.every(interval=BALANCE_CHECK_INTERVAL, handler=check_signer_balance)
     bot.every(interval=UPTIME_PING_INTERVAL, handler=ping_uptime_monitor)
+    bot.every(interval=RPC_BUDGET_LOG_INTERVAL, handler=log_rpc_budget)
+    bot.every(interval=CACHE_STATS_LOG_INTERVAL, handler=log_cache_stats)
+    bot.every(interval=NETWORK_CONFIG_POLL_INTERVAL, handler=reload_network_config)
 
     bot.cron(expression=STATUS_REPORT_CRON, handler=report_status)
 
-    vault_addrs = allocator_vault_addrs()
-    if vault_addrs:
-        for event_name in ("Deposit", "Withdraw", "StrategyReported"):
-            bot.listen(
-                event=event_name,
-                addresses=vault_addrs,
-                abi=VAULT_ABI,
-                handler=on_vault_event,
-                name=f"vault_{event_name.lower()}",
-                poll_interval=VAULT_EVENT_POLL_INTERVAL,
-            )
+    _sync_vault_listeners(bot)
 
     await bot.run()
@@ -0,0 +1,110 @@
+import json
+import os
+from collections.abc import Sequence
+from typing import Any
+
+from web3 import Web3
+
+# =============================================================================
+# Oracle Feeds
+# =============================================================================
+#
+# Which price feeds a strategy depends on is learned by tracing its getCurrentLTV() with debug_traceCall
+# and keeping every contract that answers latestRoundData()/latestAnswer(). That catches both the
+# Chainlink proxy and the aggregator behind it, and the aggregator is what emits AnswerUpdated. The
+# mapping is cached on disk and each strategy is traced once: later calls only trace strategies missing
+# from the cache, like newly discovered ones (delete an entry to re-trace it). After that a single
+# eth_getLogs per poll over all feeds tells us which strategies saw a new price. RPCs without the debug
+# namespace simply learn nothing and those strategies stay on the regular polling.
+
+ORACLE_FEEDS_FILE = "oracle_feeds.json"
+ORACLE_POLL_MAX_BLOCKS = int(os.getenv("ORACLE_POLL_MAX_BLOCKS", "1000"))  # cap on a catch-up getLogs range
+
+_GET_CURRENT_LTV = Web3.to_hex(Web3.keccak(text="getCurrentLTV()")[:4])
+_PRICE_SELECTORS = {
+    Web3.to_hex(Web3.keccak(text="latestRoundData()")[:4]),
+    Web3.to_hex(Web3.keccak(text="latestAnswer()")[:4]),
+}
+ANSWER_UPDATED_TOPIC = Web3.to_hex(Web3.keccak(text="AnswerUpdated(int256,uint256,uint256)"))
+
+
+def _price_callees(frame: dict[str, Any]) -> set[str]:
+    feeds = set()
+    if str(frame.get("input", ""))[:10] in _PRICE_SELECTORS and frame.get("to"):
+        feeds.add(str(frame["to"]).lower())
+    for sub in frame.get("calls", []) or []:
+        feeds |= _price_callees(sub)
+    return feeds
+
+
+def trace_price_feeds(w3: Web3, strategy: str) -> list[str]:
+    """Price feeds touched by the strategy's getCurrentLTV(). Raises if the RPC can't trace."""
+    response = w3.provider.make_request(
+        "debug_traceCall",  # type: ignore[arg-type]
+        [{"to": Web3.to_checksum_address(strategy), "data": _GET_CURRENT_LTV}, "latest", {"tracer": "callTracer"}],
+    )
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return sorted(_price_callees(dict(response["result"])))
+
+
+class OracleWatcher:
+    def __init__(self) -> None:
+        self.feeds: dict[str, list[str]] = {}  # strategy -> feeds
+        self.last_block: int | None = None
+        try:
+            with open(ORACLE_FEEDS_FILE) as f:
+                self.feeds = dict(json.load(f))
+        except FileNotFoundError:
+            pass
+
+    def learn(self, w3: Web3, strategies: Sequence[str]) -> None:
+        """Trace the strategies without cached feeds and drop the ones no longer given. A failed trace
+        leaves the strategy out of the cache, so the next call tries it again."""
+        # built aside and swapped in, so poll() never sees it half-done
+        feeds = {strategy: self.feeds[strategy] for strategy in strategies if strategy in self.feeds}
+        for strategy in strategies:
+            if strategy in feeds:
+                continue
+            try:
+                feeds[strategy] = trace_price_feeds(w3, strategy)
+            except Exception as e:
+                print(f"Could not trace price feeds of {strategy}: {e}")
+        if feeds == self.feeds:
+            return
+        self.feeds = feeds
+        with open(ORACLE_FEEDS_FILE, "w") as f:
+            json.dump(self.feeds, f)
+
+    def poll(self, w3: Web3) -> set[str]:
+        """Strategies whose price feeds updated since the previous poll."""
+        by_feed: dict[str, set[str]] = {}
+        for strategy, feeds in self.feeds.items():
+            for feed in feeds:
+                by_feed.setdefault(feed, set()).add(strategy)
+
+        head = w3.eth.block_number
+        if self.last_block is None or not by_feed:
+            self.last_block = head
+            return set()
+        if head <= self.last_block:
+            return set()
+
+        from_block = max(self.last_block + 1, head - ORACLE_POLL_MAX_BLOCKS)
+        logs = w3.eth.get_logs(
+            {
+                "address": [Web3.to_checksum_address(feed) for feed in by_feed],
+                "fromBlock": from_block,
+                "toBlock": head,
+                "topics": [ANSWER_UPDATED_TOPIC],
+            }
+        )
+        self.last_block = head
+
+        affected: set[str] = set()
+        for log in logs:
+            affected |= by_feed.get(str(log["address"]).lower(), set())
+        return affected
+
+
+oracle_watcher = OracleWatcher()
@@ -0,0 +1,190 @@
+import math
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from web3 import Web3
+
+from bot.cache import cached_multicall
+from bot.config import (
+    AAVE_DATA_PROVIDER_ABI,
+    ERC20_ABI,
+    LOOPER_ABI,
+    MORPHO_ABI,
+    MORPHO_IRM_ABI,
+    PAWN_BROKER_ABI,
+    TROVE_MANAGER_ABI,
+    w3_contract,
+)
+
+# =============================================================================
+# Borrow Rates
+# =============================================================================
+#
+# Resolves the borrow rate of every looper in three batched stages instead of up to three sequential
+# calls per looper: (1) venue pointers, (2) venue state, (3) Morpho IRM state. All reads go through
+# the block-keyed cache, so the report, /status and alerting share one lookup per block.
+
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
+
+# Morpho AdaptiveCurveIrm deployments, whose rate we compute off-chain from market state.
+# Markets on any other IRM fall back to borrowRateView().
+ADAPTIVE_CURVE_IRMS = {
+    "0x870ac11d48b15db9a138cf899d20f13f79ba00bc",  # ethereum
+    "0x46415998764c29ab2a25cbea6254146d50d22687",  # base
+}
+
+# AdaptiveCurveIrm constants (per-second rates, WAD-free floats)
+_CURVE_STEEPNESS = 4.0
+_ADJUSTMENT_SPEED = 50.0 / SECONDS_PER_YEAR
+_TARGET_UTILIZATION = 0.9
+_INITIAL_RATE_AT_TARGET = 0.04 / SECONDS_PER_YEAR
+_MIN_RATE_AT_TARGET = 0.001 / SECONDS_PER_YEAR
+_MAX_RATE_AT_TARGET = 2.0 / SECONDS_PER_YEAR
+
+
+@dataclass(frozen=True)
+class BorrowRate:
+    venue: str
+    apr: float  # fraction, 0.05 == 5%
+    apy: float
+
+    def __str__(self) -> str:
+        if self.venue == "morpho":
+            return f"{self.apy * 100:.2f}% APY"
+        if self.venue == "aave":
+            return f"{self.apr * 100:.2f}% APR ({self.apy * 100:.2f}% APY)"
+        return f"{self.apr * 100:.2f}% APR"
+
+
+def _curve(rate_at_target: float, err: float) -> float:
+    coeff = 1 - 1 / _CURVE_STEEPNESS if err < 0 else _CURVE_STEEPNESS - 1
+    return (coeff * err + 1) * rate_at_target
+
+
+def _new_rate_at_target(start: float, linear_adaptation: float) -> float:
+    return min(max(start * math.exp(linear_adaptation), _MIN_RATE_AT_TARGET), _MAX_RATE_AT_TARGET)
+
+
+def adaptive_curve_rate(market: tuple[int, ...], rate_at_target_wad: int, now_ts: int) -> float:
+    """Per-second borrow rate AdaptiveCurveIrm.borrowRateView() would return, as a float rather than WAD."""
+    total_supply, _, total_borrow, _, last_update, _ = market
+    utilization = total_borrow / total_supply if total_supply > 0 else 0.0
+    err_norm = 1 - _TARGET_UTILIZATION if utilization > _TARGET_UTILIZATION else _TARGET_UTILIZATION
+    err = (utilization - _TARGET_UTILIZATION) / err_norm
+
+    start = rate_at_target_wad / 1e18
+    if start == 0:
+        avg_rate_at_target = _INITIAL_RATE_AT_TARGET
+    else:
+        linear_adaptation = _ADJUSTMENT_SPEED * err * max(now_ts - last_update, 0)
+        if linear_adaptation == 0:
+            avg_rate_at_target = start
+        else:
+            end = _new_rate_at_target(start, linear_adaptation)
+            mid = _new_rate_at_target(start, linear_adaptation / 2)
+            avg_rate_at_target = (start + end + 2 * mid) / 4
+    return _curve(avg_rate_at_target, err)
+
+
+def _morpho_rate(rate_per_second: float) -> BorrowRate:
+    return BorrowRate("morpho", rate_per_second * SECONDS_PER_YEAR, math.exp(rate_per_second * SECONDS_PER_YEAR) - 1)
+
+
+def _resolve(w3: Web3, network_key: str, morpho: str, venues: Mapping[str, str]) -> dict[str, BorrowRate]:
+    addrs = list(venues)
+
+    # Stage 1: the venue pointer of every looper (+ asset, which Aave and Flex need)
+    calls: list[Any] = []
+    for addr in addrs:
+        looper = w3_contract(w3, addr, LOOPER_ABI)
+        calls.append(looper.functions.asset())
+        if venues[addr] == "morpho":
+            calls.append(looper.functions.marketId())
+        elif venues[addr] == "aave":
+            calls.append(looper.functions.DATA_PROVIDER())
+        elif venues[addr] == "flex":
+            calls.extend([looper.functions.troveId(), looper.functions.TROVE_MANAGER()])
+        elif venues[addr] == "pawnbroker":
+            calls.append(looper.functions.PAWN_BROKER())
+    results = iter(cached_multicall(w3, network_key, calls))
+    pointers = {addr: [next(results) for _ in range(3 if venues[addr] == "flex" else 2)] for addr in addrs}
+
+    # Stage 2: venue state
+    calls = []
+    for addr in addrs:
+        asset, *ptr = pointers[addr]
+        if venues[addr] == "morpho":
+            morpho_contract = w3_contract(w3, morpho, MORPHO_ABI)
+            calls.extend([morpho_contract.functions.idToMarketParams(ptr[0]), morpho_contract.functions.market(ptr[0])])
+        elif venues[addr] == "aave":
+            data_provider = w3_contract(w3, ptr[0], AAVE_DATA_PROVIDER_ABI)
+            calls.append(data_provider.functions.getReserveData(Web3.to_checksum_address(asset)))
+        elif venues[addr] == "flex":
+            trove_manager = w3_contract(w3, ptr[1], TROVE_MANAGER_ABI)
+            calls.extend(
+                [trove_manager.functions.troves(ptr[0]), w3_contract(w3, asset, ERC20_ABI).functions.decimals()]
+            )
+        elif venues[addr] == "pawnbroker":
+            calls.append(w3_contract(w3, ptr[0], PAWN_BROKER_ABI).functions.rate())
+    results = iter(cached_multicall(w3, network_key, calls))
+    state = {addr: [next(results) for _ in range(2 if venues[addr] in ("morpho", "flex") else 1)] for addr in addrs}
+
+    # Stage 3: Morpho IRM state (rateAtTarget for AdaptiveCurve, the IRM's own view otherwise)
+    calls = []
+    morpho_addrs = [addr for addr in addrs if venues[addr] == "morpho"]
+    for addr in morpho_addrs:
+        market_id = pointers[addr][1]
+        market_params, market = state[addr]
+        irm = w3_contract(w3, market_params[3], MORPHO_IRM_ABI)
+        if market_params[3].lower() in ADAPTIVE_CURVE_IRMS:
+            calls.append(irm.functions.rateAtTarget(market_id))
+        else:
+            calls.append(irm.functions.borrowRateView(tuple(market_params), tuple(market)))
+    irm_results = dict(zip(morpho_addrs, cached_multicall(w3, network_key, calls)))
+
+    now_ts = int(time.time())
+    rates: dict[str, BorrowRate] = {}
+    for addr in addrs:
+        venue = venues[addr]
+        if venue == "morpho":
+            market_params, market = state[addr]
+            if market_params[3].lower() in ADAPTIVE_CURVE_IRMS:
+                rate_per_second = adaptive_curve_rate(tuple(market), irm_results[addr], now_ts)
+            else:
+                rate_per_second = irm_results[addr] / 1e18
+            rates[addr] = _morpho_rate(rate_per_second)
+        elif venue == "aave":
+            apr = state[addr][0][6] / 1e27  # variableBorrowRate, in RAY
+            rates[addr] = BorrowRate(venue, apr, (1 + apr / SECONDS_PER_YEAR) ** SECONDS_PER_YEAR - 1)
+        elif venue == "flex":
+            # the trove's annualInterestRate is scaled by the borrow token's decimals
+            trove, decimals = state[addr]
+            apr = trove[2] / 10**decimals
+            rates[addr] = BorrowRate(venue, apr, apr)
+        elif venue == "pawnbroker":
+            apr = state[addr][0] / 1e4  # rate() is annualized, in bps
+            rates[addr] = BorrowRate(venue, apr, apr)
+    return rates
+
+
+def borrow_rates(
+    w3: Web3, network_key: str, morpho: str, venues: Mapping[str, str]
+) -> dict[str, BorrowRate | Exception]:
+    """Borrow rate per looper address (looper -> venue). A looper whose lookup fails maps to the error."""
+    if not venues:
+        return {}
+    try:
+        return dict(_resolve(w3, network_key, morpho, venues))
+    except Exception as e:
+        if len(venues) == 1:
+            return {addr: e for addr in venues}
+    # One bad looper fails the whole batch; isolate it by resolving each looper on its own
+    rates: dict[str, BorrowRate | Exception] = {}
+    for addr, venue in venues.items():
+        try:
+            rates.update(_resolve(w3, network_key, morpho, {addr: venue}))
+        except Exception as e:
+            rates[addr] = e
+    return rates
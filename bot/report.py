@@ -0,0 +1,383 @@
+import random
+from dataclasses import dataclass
+from typing import Any
+
+from tinybot import multicall
+from web3 import Web3
+
+from bot.cache import cached_multicall
+from bot.config import (
+    APR_ORACLE_ABI,
+    APR_ORACLE_ADDRESS,
+    DEBT_IN_FRONT_HELPER_ABI,
+    EMOJIS,
+    ERC20_ABI,
+    LENDER_BORROWER_ABI,
+    LENDER_VAULT_ABI,
+    LOOPER_ABI,
+    TOKENIZED_STRATEGY_ABI,
+    TROVE_MANAGER_ABI,
+    looper_venues,
+    network_cfg,
+    w3_contract,
+)
+from bot.rates import BorrowRate, borrow_rates
+from bot.rpc import RpcBatch
+from bot.troves import sync_trove_index
+from bot.utils import format_time_ago
+
+# =============================================================================
+# Strategy Reports
+# =============================================================================
+#
+# The full per-strategy status messages, plus the handful of metrics the daily digest compares
+# (see bot/digest.py). Built for any network, so /report can produce the same dump on demand.
+
+DEBT_IN_FRONT_HELPER = "0x4bb5E28FDB12891369b560f2Fab3C032600677c6"
+MAX_UINT256 = 2**256 - 1
+TROVE_STATUS = ["Non Existent", "Active", "Closed By Owner", "Closed By Liquidation", "Zombie"]
+LOOPER_VENUE_LABELS = {"morpho": "Morpho", "aave": "Aave", "flex": "Flex", "pawnbroker": "Pawn Broker"}
+
+
+@dataclass
+class StrategyReport:
+    address: str
+    message: str
+    metrics: dict[str, Any]  # see DIGEST_METRICS in bot/digest.py; "name" is always set
+
+
+def network_reports(w3: Web3, network_key: str, now_ts: int) -> list[StrategyReport]:
+    """Reports for every lender-borrower and looper of a network with assets, in config order."""
+    net_cfg = network_cfg(network_key)
+    liquity_map = dict(net_cfg["liquity_lender_borrowers"])
+    lb_addrs = list(net_cfg["lender_borrowers"]) + list(liquity_map.keys())
+    venues = looper_venues(network_key)
+    if not lb_addrs and not venues:
+        return []
+
+    explorer_url = net_cfg["explorer"]
+    oracle = w3_contract(w3, APR_ORACLE_ADDRESS, APR_ORACLE_ABI)
+
+    reports = [
+        strategy_report(
+            w3, network_key, addr, addr in liquity_map, liquity_map.get(addr, 0), now_ts, oracle, explorer_url
+        )
+        for addr in lb_addrs
+    ]
+    rates = borrow_rates(w3, network_key, net_cfg["morpho"], venues)
+    reports += [
+        looper_report(w3, network_key, addr, venue, rates[addr], now_ts, oracle, explorer_url)
+        for addr, venue in venues.items()
+    ]
+    return [r for r in reports if r is not None]
+
+
+def strategy_report(
+    w3: Web3,
+    network_key: str,
+    address: str,
+    is_liquity: bool,
+    coll_index: int,
+    now_ts: int,
+    oracle: object,
+    explorer_url: str,
+) -> StrategyReport | None:
+    addr = Web3.to_checksum_address(address)
+    contract = w3_contract(w3, address, LENDER_BORROWER_ABI)
+    strategy = w3_contract(w3, address, TOKENIZED_STRATEGY_ABI)
+
+    # Prepare base multicall
+    calls = [
+        strategy.functions.totalAssets(),
+        contract.functions.name(),
+        contract.functions.getCurrentLTV(),
+        contract.functions.getLiquidateCollateralFactor(),
+        contract.functions.targetLTVMultiplier(),
+        contract.functions.warningLTVMultiplier(),
+        contract.functions.balanceOfDebt(),
+        contract.functions.balanceOfLentAssets(),
+        contract.functions.lastReport(),
+        contract.functions.tendTrigger(),
+        contract.functions.asset(),
+        contract.functions.borrowToken(),
+    ]
+
+    if not is_liquity:
+        calls.append(contract.functions.lenderVault())
+
+    if is_liquity:
+        calls.append(contract.functions.troveId())
+        calls.append(contract.functions.TROVE_MANAGER())
+
+    results = cached_multicall(w3, network_key, calls)
+
+    # Skip if no assets
+    total_assets = results[0]
+    if total_assets == 0:
+        return None
+
+    # Unpack base results
+    (
+        _,
+        name,
+        raw_current_ltv,
+        collateral_factor,
+        target_ltv_mult,
+        warning_ltv_mult,
+        balance_of_debt,
+        balance_of_lent_assets,
+        last_report,
+        tend_trigger_result,
+        asset_address,
+        borrow_token_address,
+    ) = results[:12]
+
+    # Second multicall: token info + APR + conditional data
+    borrow_token = w3_contract(w3, borrow_token_address, ERC20_ABI)
+    calls2 = [
+        borrow_token.functions.decimals(),
+        borrow_token.functions.symbol(),
+        oracle.functions.getStrategyApr(addr, 0),
+    ]
+
+    # For non-liquity, fetch lender vault max withdraw
+    if not is_liquity:
+        lender_vault_address = results[12]
+        lender_vault = w3_contract(w3, lender_vault_address, LENDER_VAULT_ABI)
+        calls2.append(lender_vault.functions.maxWithdraw(addr))
+
+    # For liquity, getLatestTroveData() returns a struct multicall can't decode: read the trove in one JSON-RPC batch
+    if is_liquity:
+        trove_id, trove_manager_address = results[12], results[13]
+        trove_manager = w3_contract(w3, trove_manager_address, TROVE_MANAGER_ABI)
+        trove_batch = RpcBatch(w3)
+        trove_batch.call(trove_manager.functions.getLatestTroveData(trove_id))
+        trove_batch.call(trove_manager.functions.getTroveStatus(trove_id))
+        trove_data, trove_status_raw = trove_batch.execute()
+
+    token_results = multicall(w3, calls2)
+    borrow_decimals, borrow_symbol = token_results[0], token_results[1]
+    expected_apr = token_results[2] / 1e16
+
+    # Calculate values
+    debt_formatted = balance_of_debt / (10**borrow_decimals)
+    lent_formatted = balance_of_lent_assets / (10**borrow_decimals)
+
+    if not is_liquity:
+        lender_max_withdraw = token_results[3]
+        max_withdraw_formatted = lender_max_withdraw / (10**borrow_decimals)
+        max_withdraw_pct = (lender_max_withdraw / balance_of_lent_assets * 100) if balance_of_lent_assets > 0 else 0.0
+
+    expected_profit = max(0, lent_formatted - debt_formatted)
+    time_str = format_time_ago(now_ts - last_report)
+    tend_status = tend_trigger_result[0]
+    liquidation_threshold = collateral_factor / 1e16
+
+    metrics: dict[str, Any] = {
+        "name": name,
+        "ltv": raw_current_ltv / 1e16,
+        "apr": expected_apr,
+        "debt": debt_formatted,
+        "tend_trigger": tend_status,
+    }
+    if not is_liquity:
+        metrics["max_withdraw"] = max_withdraw_pct
+
+    # Build message
+    msg = (
+        f"{random.choice(EMOJIS)} <b>{name}</b>\n\n"
+        f"<b>LTV:</b> {raw_current_ltv / 1e16:.1f}%\n"
+        f"<b>Target:</b> {liquidation_threshold * target_ltv_mult / 1e4:.1f}%\n"
+        f"<b>Warning:</b> {liquidation_threshold * warning_ltv_mult / 1e4:.1f}%\n"
+        f"<b>Liquidation:</b> {liquidation_threshold:.1f}%\n"
+        f"<b>Expected APR:</b> {expected_apr:.2f}%\n"
+    )
+
+    if is_liquity:
+        annual_interest_rate = trove_data[6]  # annualInterestRate is at index 6
+        last_rate_adj_time = trove_data[9]  # lastInterestRateAdjTime is at index 9
+        trove_status = TROVE_STATUS[trove_status_raw]
+        debt_in_front = _debt_in_front(w3, trove_manager_address, coll_index, trove_id, now_ts)
+        metrics.update(
+            trove_status=trove_status, trove_rate=annual_interest_rate / 1e16, debt_in_front=debt_in_front / 1e18
+        )
+        msg += f"\n<b>Trove Status:</b> {trove_status}\n"
+        msg += f"<b>Trove Interest Rate:</b> {annual_interest_rate / 1e16:.2f}%\n"
+        msg += f"<b>Last Rate Adjustment:</b> {format_time_ago(now_ts - last_rate_adj_time)}\n"
+        msg += f"<b>Debt In Front:</b> {debt_in_front / 1e18:,.2f} {borrow_symbol}\n"
+
+    msg += (
+        f"\n<b>Amount Borrowed:</b> {debt_formatted:.2f} {borrow_symbol}\n"
+        f"<b>Amount in Lender Vault:</b> {lent_formatted:.2f} {borrow_symbol}\n"
+        f"<b>Expected Profit:</b> {expected_profit:.2f} {borrow_symbol}\n"
+    )
+
+    if not is_liquity:
+        msg += f"<b>Lender Max Withdraw:</b> {max_withdraw_formatted:,.2f} {borrow_symbol} ({max_withdraw_pct:.1f}%)\n"
+
+    msg += (
+        f"\n<b>Last Report:</b> {time_str}\n"
+        f"<b>Tend Trigger:</b> {tend_status}\n"
+        f"<b>Network:</b> {network_key.capitalize()}\n\n"
+        f"<a href='{explorer_url}{address}'>🔗 View Strategy</a>"
+    )
+
+    return StrategyReport(address, msg, metrics)
+
+
+def _debt_in_front(w3: Web3, trove_manager_address: str, coll_index: int, trove_id: int, now_ts: int) -> float:
+    # Prefer the local trove index; fall back to the on-chain helper scan until it has caught up
+    index = sync_trove_index(w3, trove_manager_address)
+    if index.ready:
+        debt_in_front = index.debt_in_front(trove_id, now_ts)
+        if debt_in_front is not None:
+            return debt_in_front
+    debt_helper = w3_contract(w3, DEBT_IN_FRONT_HELPER, DEBT_IN_FRONT_HELPER_ABI)
+    debt_result = debt_helper.functions.getDebtBetweenInterestRateAndTrove(
+        coll_index, 0, MAX_UINT256, trove_id, 0, 0
+    ).call()
+    return float(debt_result[0])
+
+
+def looper_report(
+    w3: Web3,
+    network_key: str,
+    address: str,
+    venue: str,
+    borrow_rate: BorrowRate | Exception,
+    now_ts: int,
+    oracle: object,
+    explorer_url: str,
+) -> StrategyReport | None:
+    addr = Web3.to_checksum_address(address)
+    looper = w3_contract(w3, address, LOOPER_ABI)
+
+    # Base multicall
+    calls = [
+        looper.functions.totalAssets(),
+        looper.functions.name(),
+        looper.functions.asset(),
+        looper.functions.collateralToken(),
+        looper.functions.estimatedTotalAssets(),
+        looper.functions.balanceOfCollateral(),
+        looper.functions.balanceOfAsset(),
+        looper.functions.position(),
+        looper.functions.getCurrentLTV(),
+        looper.functions.getCurrentLeverageRatio(),
+        looper.functions.targetLeverageRatio(),
+        looper.functions.leverageBuffer(),
+        looper.functions.maxLeverageRatio(),
+        looper.functions.getLiquidateCollateralFactor(),
+        looper.functions.minTendInterval(),
+        looper.functions.reportBuffer(),
+        looper.functions.lastTend(),
+        looper.functions.lastReport(),
+        looper.functions.tendTrigger(),
+    ]
+
+    results = cached_multicall(w3, network_key, calls)
+
+    total_assets = results[0]
+    if total_assets == 0:
+        return None
+
+    (
+        _,
+        name,
+        asset_addr,
+        collateral_addr,
+        estimated_assets,
+        collateral_amount,
+        idle_amount,
+        position_data,
+        current_ltv,
+        current_leverage,
+        target_leverage,
+        buffer,
+        max_leverage,
+        liquidation_ltv,
+        min_tend,
+        report_buffer,
+        last_tend,
+        last_report,
+        tend_trigger_result,
+    ) = results[:19]
+
+    collateral_value, position_debt = position_data[0], position_data[1]
+    trigger = tend_trigger_result[0]
+
+    # Token info multicall
+    asset_token = w3_contract(w3, asset_addr, ERC20_ABI)
+    collateral_token = w3_contract(w3, collateral_addr, ERC20_ABI)
+    token_results = multicall(
+        w3,
+        [
+            asset_token.functions.decimals(),
+            asset_token.functions.symbol(),
+            collateral_token.functions.decimals(),
+            collateral_token.functions.symbol(),
+            oracle.functions.getStrategyApr(addr, 0),
+        ],
+    )
+    asset_decimals, asset_symbol, collateral_decimals, collateral_symbol, expected_apr_raw = token_results
+    expected_apr = expected_apr_raw / 1e16
+
+    asset_scale = 10**asset_decimals
+    collateral_scale = 10**collateral_decimals
+
+    borrow_rate_str = str(borrow_rate) if isinstance(borrow_rate, BorrowRate) else f"n/a ({borrow_rate})"
+
+    # Calculations
+    target_min = target_leverage - buffer if target_leverage > buffer else 0
+    target_max = target_leverage + buffer
+    report_discount_amount = collateral_value * report_buffer // 10_000 if report_buffer > 0 else 0
+    no_buffer_estimated_assets = estimated_assets + report_discount_amount
+
+    # Build message
+    venue_label = LOOPER_VENUE_LABELS.get(venue, venue.capitalize())
+    msg = (
+        f"{random.choice(EMOJIS)} <b>{name}</b>\n\n"
+        f"<b>Venue:</b> {venue_label}\n"
+        f"<b>Collateral:</b> {collateral_symbol}\n"
+        f"<b>Borrowed:</b> {asset_symbol}\n\n"
+        f"<b>Total Assets:</b> {total_assets / asset_scale:,.4f} {asset_symbol}\n"
+        f"<b>Estimated Assets:</b> {estimated_assets / asset_scale:,.4f} {asset_symbol}\n"
+        f"<b>Idle Assets:</b> {idle_amount / asset_scale:,.4f} {asset_symbol}\n"
+        f"<b>Report Buffer:</b> {report_buffer / 100:.2f}%\n"
+    )
+    if report_buffer > 0:
+        msg += (
+            f"<b>No-Buffer Estimated:</b> {no_buffer_estimated_assets / asset_scale:,.4f} {asset_symbol} "
+            f"(discount {report_discount_amount / asset_scale:,.4f})\n"
+        )
+    msg += (
+        f"\n<b>Collateral:</b> {collateral_amount / collateral_scale:,.4f} {collateral_symbol}\n"
+        f"<b>Collateral Value:</b> {collateral_value / asset_scale:,.4f} {asset_symbol}\n"
+        f"<b>Debt:</b> {position_debt / asset_scale:,.4f} {asset_symbol}\n\n"
+        f"<b>Current LTV:</b> {current_ltv / 1e16:.2f}%\n"
+        f"<b>Liquidation LTV:</b> {liquidation_ltv / 1e16:.2f}%\n\n"
+        f"<b>Current Leverage:</b> {current_leverage / 1e18:.2f}x\n"
+        f"<b>Target Leverage:</b> {target_leverage / 1e18:.2f}x "
+        f"(range {target_min / 1e18:.2f}x - {target_max / 1e18:.2f}x)\n"
+        f"<b>Max Leverage:</b> {max_leverage / 1e18:.2f}x\n\n"
+        f"<b>Borrow Rate:</b> {borrow_rate_str}\n"
+        f"<b>Expected APR:</b> {expected_apr:.2f}%\n\n"
+        f"<b>Tend Trigger:</b> {trigger}\n"
+        f"<b>Min Tend Interval:</b> {min_tend // 60} min\n"
+        f"<b>Last Tend:</b> {format_time_ago(now_ts - last_tend)}\n"
+        f"<b>Last Report:</b> {format_time_ago(now_ts - last_report)}\n\n"
+        f"<b>Network:</b> {network_key.capitalize()}\n\n"
+        f"<a href='{explorer_url}{address}'>🔗 View Strategy</a>"
+    )
+
+    metrics = {
+        "name": name,
+        "ltv": current_ltv / 1e16,
+        "leverage": current_leverage / 1e18,
+        "apr": expected_apr,
+        "total_assets": total_assets / asset_scale,
+        "tend_trigger": trigger,
+    }
+    if isinstance(borrow_rate, BorrowRate):
+        metrics["borrow_rate"] = borrow_rate.apr * 100
+    return StrategyReport(address, msg, metrics)
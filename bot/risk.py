@@ -0,0 +1,229 @@
+import os
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+from web3 import Web3
+from web3.contract.contract import ContractFunction
+
+from bot.cache import cached_multicall
+from bot.config import LENDER_BORROWER_ABI, LOOPER_ABI, w3_contract
+
+# =============================================================================
+# Risk Snapshot
+# =============================================================================
+#
+# All lender-borrowers and loopers are read in one multicall and laid out as parallel arrays, so
+# headroom / liquidation distance / leverage drift are computed for the whole fleet in one pass.
+# Ratios are fractions (0.8 == 80%), leverage is a multiple (3.0 == 3x). Fields that don't apply to
+# a strategy kind are NaN (lender-borrowers have no leverage target, loopers no warning LTV), and
+# NaN compares False, so it never trips a threshold.
+
+Array = npt.NDArray[np.float64]
+
+_LB_FIELDS = 3  # getCurrentLTV, getLiquidateCollateralFactor, warningLTVMultiplier
+_LOOPER_FIELDS = 5  # getCurrentLTV, getLiquidateCollateralFactor, getCurrentLeverageRatio, target, max
+
+
+@dataclass(frozen=True)
+class RiskSnapshot:
+    addrs: list[str]
+    is_looper: npt.NDArray[np.bool_]
+    ltv: Array
+    liquidation_ltv: Array
+    warning_ltv: Array
+    leverage: Array
+    target_leverage: Array
+    max_leverage: Array
+
+    @property
+    def active(self) -> npt.NDArray[np.bool_]:
+        """Positions that actually carry debt."""
+        return self.ltv > 0
+
+    @property
+    def warning_headroom(self) -> Array:
+        """LTV left before the warning LTV (negative once past it)."""
+        return self.warning_ltv - self.ltv
+
+    @property
+    def liquidation_distance(self) -> Array:
+        """Relative collateral price drop that would push LTV to the liquidation LTV."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return 1 - self.ltv / self.liquidation_ltv
+
+    @property
+    def leverage_drift(self) -> Array:
+        return self.leverage - self.target_leverage
+
+    @property
+    def leverage_utilization(self) -> Array:
+        """Current leverage as a fraction of maxLeverageRatio."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.leverage / self.max_leverage
+
+
+def risk_calls(w3: Web3, lender_borrowers: Sequence[str], loopers: Sequence[str]) -> list[ContractFunction]:
+    """The reads behind a RiskSnapshot, in the order risk_snapshot() expects them."""
+    calls = []
+    for addr in lender_borrowers:
+        lb = w3_contract(w3, addr, LENDER_BORROWER_ABI)
+        calls.extend(
+            [
+                lb.functions.getCurrentLTV(),
+                lb.functions.getLiquidateCollateralFactor(),
+                lb.functions.warningLTVMultiplier(),
+            ]
+        )
+    for addr in loopers:
+        looper = w3_contract(w3, addr, LOOPER_ABI)
+        calls.extend(
+            [
+                looper.functions.getCurrentLTV(),
+                looper.functions.getLiquidateCollateralFactor(),
+                looper.functions.getCurrentLeverageRatio(),
+                looper.functions.targetLeverageRatio(),
+                looper.functions.maxLeverageRatio(),
+            ]
+        )
+    return calls
+
+
+def risk_snapshot(lender_borrowers: Sequence[str], loopers: Sequence[str], values: Sequence[float]) -> RiskSnapshot:
+    """Lay out the results of risk_calls(). A NaN value (e.g. a failed read) leaves that field NaN."""
+    raw = np.array(values, dtype=np.float64)
+    n_lb, n_looper = len(lender_borrowers), len(loopers)
+    lb_raw = raw[: n_lb * _LB_FIELDS].reshape(n_lb, _LB_FIELDS)
+    looper_raw = raw[n_lb * _LB_FIELDS :].reshape(n_looper, _LOOPER_FIELDS) / 1e18
+
+    lb_ltv = lb_raw[:, 0] / 1e18
+    lb_liquidation = lb_raw[:, 1] / 1e18
+    lb_warning = lb_liquidation * lb_raw[:, 2] / 1e4  # warningLTVMultiplier is in bps of the liquidation LTV
+    lb_nan = np.full(n_lb, np.nan)
+    looper_nan = np.full(n_looper, np.nan)
+
+    return RiskSnapshot(
+        addrs=list(lender_borrowers) + list(loopers),
+        is_looper=np.concatenate([np.zeros(n_lb, dtype=np.bool_), np.ones(n_looper, dtype=np.bool_)]),
+        ltv=np.concatenate([lb_ltv, looper_raw[:, 0]]),
+        liquidation_ltv=np.concatenate([lb_liquidation, looper_raw[:, 1]]),
+        warning_ltv=np.concatenate([lb_warning, looper_nan]),
+        leverage=np.concatenate([lb_nan, looper_raw[:, 2]]),
+        target_leverage=np.concatenate([lb_nan, looper_raw[:, 3]]),
+        max_leverage=np.concatenate([lb_nan, looper_raw[:, 4]]),
+    )
+
+
+def fetch_risk_snapshot(
+    w3: Web3, network_key: str, lender_borrowers: Sequence[str], loopers: Sequence[str]
+) -> RiskSnapshot:
+    values = cached_multicall(w3, network_key, risk_calls(w3, lender_borrowers, loopers))
+    return risk_snapshot(lender_borrowers, loopers, values)
+
+
+# =============================================================================
+# Thresholds
+# =============================================================================
+
+
+@dataclass(frozen=True)
+class RiskThresholds:
+    min_warning_headroom: float  # LTV fraction that must remain below the warning LTV
+    min_liquidation_distance: float  # price drop fraction that must remain before liquidation
+    max_leverage_utilization: float  # max fraction of maxLeverageRatio
+
+
+RISK_THRESHOLDS = RiskThresholds(
+    min_warning_headroom=float(os.getenv("RISK_MIN_WARNING_HEADROOM", "0")),  # alert once LTV reaches warning
+    min_liquidation_distance=float(os.getenv("RISK_MIN_LIQUIDATION_DISTANCE", "0.05")),  # 5% price drop
+    max_leverage_utilization=float(os.getenv("RISK_MAX_LEVERAGE_UTILIZATION", "0.98")),  # 98% of max leverage
+)
+
+
+def breached_thresholds(snapshot: RiskSnapshot, thresholds: RiskThresholds) -> list[list[str]]:
+    """Per strategy, the names of the thresholds it currently breaches."""
+    active = snapshot.active
+    flags = {
+        "warning": active & (snapshot.warning_headroom < thresholds.min_warning_headroom),
+        "liquidation": active & (snapshot.liquidation_distance < thresholds.min_liquidation_distance),
+        "leverage": active & (snapshot.leverage_utilization > thresholds.max_leverage_utilization),
+    }
+    return [[name for name, mask in flags.items() if mask[i]] for i in range(len(snapshot.addrs))]
+
+
+# =============================================================================
+# Stress Testing
+# =============================================================================
+#
+# A collateral price shock `s` leaves debt untouched and scales collateral value by (1 - s), so every
+# position's LTV becomes ltv / (1 - s) and a looper's leverage 1 / (1 - ltv'). The whole
+# (shocks x strategies) grid is one broadcast, so hundreds of scenarios over the fleet stay in the
+# millisecond range. "Warning" means the warning LTV for lender-borrowers and maxLeverageRatio for loopers.
+
+STRESS_MAX_SHOCK = float(os.getenv("STRESS_MAX_SHOCK", "0.5"))  # up to a 50% collateral drop
+STRESS_GRID_STEP = float(os.getenv("STRESS_GRID_STEP", "0.001"))  # 0.1% steps -> 500 scenarios
+STRESS_REPORT_LEVELS = [float(x) for x in os.getenv("STRESS_REPORT_LEVELS", "0.05,0.1,0.15,0.2,0.3").split(",")]
+
+
+def shock_grid(max_shock: float = STRESS_MAX_SHOCK, step: float = STRESS_GRID_STEP) -> Array:
+    return np.round(np.arange(step, max_shock + step / 2, step), 6)
+
+
+@dataclass(frozen=True)
+class StressResult:
+    shocks: Array  # (scenarios,)
+    ltv: Array  # (scenarios, strategies) shocked LTV
+    crosses_warning: npt.NDArray[np.bool_]  # (scenarios, strategies)
+    crosses_liquidation: npt.NDArray[np.bool_]  # (scenarios, strategies)
+
+    def first_shock(self, crosses: npt.NDArray[np.bool_]) -> Array:
+        """Smallest shock in the grid at which each strategy crosses, NaN if it never does."""
+        return np.where(crosses.any(axis=0), self.shocks[crosses.argmax(axis=0)], np.nan)
+
+    def at(self, shock: float) -> int:
+        """Index of the grid scenario closest to `shock`."""
+        return int(np.abs(self.shocks - shock).argmin())
+
+
+def stress_test(snapshot: RiskSnapshot, shocks: Array) -> StressResult:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ltv = snapshot.ltv[np.newaxis, :] / (1 - shocks[:, np.newaxis])
+        leverage = 1 / (1 - ltv)
+    # past 100% LTV the position is underwater; treat it as infinitely levered
+    leverage = np.where(ltv >= 1, np.inf, leverage)
+    active = snapshot.active[np.newaxis, :]
+
+    crosses_warning = np.where(
+        snapshot.is_looper[np.newaxis, :],
+        leverage >= snapshot.max_leverage[np.newaxis, :],
+        ltv >= snapshot.warning_ltv[np.newaxis, :],
+    )
+    crosses_liquidation = ltv >= snapshot.liquidation_ltv[np.newaxis, :]
+    return StressResult(
+        shocks=shocks,
+        ltv=ltv,
+        crosses_warning=active & crosses_warning,
+        crosses_liquidation=active & crosses_liquidation,
+    )
+
+
+def stress_lines(names: Sequence[str], result: StressResult, levels: Sequence[float]) -> list[str]:
+    """Summary per shock level, then the first warning/liquidation shock of every exposed strategy."""
+    lines = []
+    for level in levels:
+        i = result.at(level)
+        lines.append(
+            f"<b>-{level * 100:g}%:</b> {int(result.crosses_warning[i].sum())} warning, "
+            f"{int(result.crosses_liquidation[i].sum())} liquidated"
+        )
+
+    first_warning = result.first_shock(result.crosses_warning)
+    first_liquidation = result.first_shock(result.crosses_liquidation)
+    for name, warning, liquidation in zip(names, first_warning, first_liquidation):
+        if np.isnan(warning) and np.isnan(liquidation):
+            continue
+        warning_str = f"-{warning * 100:.1f}%" if not np.isnan(warning) else "n/a"
+        liquidation_str = f"-{liquidation * 100:.1f}%" if not np.isnan(liquidation) else "n/a"
+        lines.append(f"<b>{name}</b> — warning at {warning_str}, liquidation at {liquidation_str}")
+    return lines
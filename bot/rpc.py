@@ -0,0 +1,167 @@
+import asyncio
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from eth_abi.abi import decode
+from eth_utils.abi import get_abi_output_types
+from web3 import Web3
+from web3._utils.abi import map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3.contract.contract import ContractFunction
+
+# =============================================================================
+# JSON-RPC Batching
+# =============================================================================
+
+ERROR_STRING_SELECTOR = "0x08c379a0"  # Error(string)
+
+
+def batch_request(w3: Web3, requests: Sequence[tuple[str, list[Any]]]) -> list[dict[str, Any]]:
+    """Send raw JSON-RPC requests as one HTTP batch. Responses come back in request order, each
+    with either a "result" or an "error" key; params must already be JSON-encodable."""
+    if not requests:
+        return []
+    batch = [(method, params) for method, params in requests]
+    responses = w3.provider.make_batch_request(batch)  # type: ignore[attr-defined]
+    if isinstance(responses, dict):
+        # the node rejected the batch as a whole
+        raise RuntimeError(f"Batch request failed: {responses.get('error', responses)}")
+    return sorted((dict(r) for r in responses), key=lambda r: int(r["id"]))
+
+
+def wrap_provider(
+    w3: Web3,
+    wrap: Callable[[Callable[..., Any]], Callable[..., Any]],
+    wrap_batch: Callable[[Callable[..., Any]], Callable[..., Any]],
+) -> Web3:
+    """Wrap the provider's make_request / make_batch_request. Unlike a middleware this also sees raw
+    w3.provider calls (batch_request, debug_traceCall)."""
+    provider = w3.provider
+    provider.make_request = wrap(provider.make_request)  # type: ignore[method-assign]
+    provider.make_batch_request = wrap_batch(provider.make_batch_request)  # type: ignore[attr-defined]
+    # web3 caches the middleware pipeline around the bound methods, drop it so the next request rebuilds it
+    for cache in ("_request_func_cache", "_batch_request_func_cache"):
+        if hasattr(provider, cache):
+            setattr(provider, cache, (None, None))
+    return w3
+
+
+def revert_reason(error: dict[str, Any]) -> str:
+    """Human-readable reason from a JSON-RPC execution error."""
+    message = str(error.get("message", "reverted"))
+    data = error.get("data")
+    if isinstance(data, str) and data.startswith(ERROR_STRING_SELECTOR):
+        try:
+            (reason,) = decode(["string"], bytes.fromhex(data[len(ERROR_STRING_SELECTOR) :]))
+            return f"execution reverted: {reason}"
+        except Exception:
+            pass
+    return message
+
+
+def decode_output(w3: Web3, fn: ContractFunction, data: bytes) -> Any:
+    """fn's return data, decoded the way fn.call() would decode it."""
+    output_types = get_abi_output_types(fn.abi)
+    decoded = w3.codec.decode(output_types, data)
+    normalized = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, decoded)
+    return normalized[0] if len(normalized) == 1 else tuple(normalized)
+
+
+_BLOCK_INT_FIELDS = ("number", "timestamp", "baseFeePerGas", "gasLimit", "gasUsed")
+
+
+def _hex_int(result: str) -> int:
+    return int(result, 16)
+
+
+def _block(result: dict[str, Any] | None) -> dict[str, Any]:
+    if result is None:
+        raise ValueError("block not found")
+    block = dict(result)
+    for field in _BLOCK_INT_FIELDS:
+        if field in block:
+            block[field] = int(block[field], 16)
+    return block
+
+
+class RpcError(RuntimeError):
+    def __init__(self, method: str, error: dict[str, Any]) -> None:
+        super().__init__(f"{method} failed: {revert_reason(error)}")
+        self.error = error
+
+    @property
+    def reverted(self) -> bool:
+        """The call itself reverted, as opposed to the node failing to run it (rate limits, pruned state)."""
+        return self.error.get("code") == 3 or "revert" in str(self.error.get("message", "")).lower()
+
+
+class RpcBatch:
+    """Queue reads that can't go through multicall (nonces, balances, blocks, calls with struct returns)
+    and send them as a single JSON-RPC batch. Each queue method returns the index of its result.
+
+        batch = RpcBatch(w3)
+        nonce = batch.nonce(signer)
+        block = batch.block("latest")
+        results = await batch.gather()
+        results[nonce], results[block]["baseFeePerGas"]
+    """
+
+    def __init__(self, w3: Web3, block_identifier: str | int = "latest") -> None:
+        self.w3 = w3
+        self.block_identifier = block_identifier if isinstance(block_identifier, str) else hex(block_identifier)
+        self._requests: list[tuple[str, list[Any]]] = []
+        self._decoders: list[Callable[[Any], Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._requests)
+
+    def raw(self, method: str, params: list[Any], decoder: Callable[[Any], Any] = lambda r: r) -> int:
+        self._requests.append((method, params))
+        self._decoders.append(decoder)
+        return len(self._requests) - 1
+
+    def call(self, fn: ContractFunction) -> int:
+        """eth_call a contract function, decoded the way fn.call() would decode it."""
+        tx = {"to": fn.address, "data": fn._encode_transaction_data()}
+
+        def _decode(result: str) -> Any:
+            return decode_output(self.w3, fn, bytes.fromhex(result[2:]))
+
+        return self.raw("eth_call", [tx, self.block_identifier], _decode)
+
+    def nonce(self, address: str) -> int:
+        return self.raw("eth_getTransactionCount", [Web3.to_checksum_address(address), self.block_identifier], _hex_int)
+
+    def balance(self, address: str) -> int:
+        return self.raw("eth_getBalance", [Web3.to_checksum_address(address), self.block_identifier], _hex_int)
+
+    def block(self, block_identifier: str | int | None = None) -> int:
+        """Block header (no transactions), with the quantity fields web3 would return as ints."""
+        tag = self.block_identifier if block_identifier is None else block_identifier
+        return self.raw("eth_getBlockByNumber", [tag if isinstance(tag, str) else hex(tag), False], _block)
+
+    def execute(self, return_exceptions: bool = False) -> list[Any]:
+        """Send the queue. A failed request raises RpcError, or is returned in its slot with
+        return_exceptions=True."""
+        results: list[Any] = []
+        for (method, _), decoder, response in zip(
+            self._requests, self._decoders, batch_request(self.w3, self._requests)
+        ):
+            if "error" in response:
+                error = RpcError(method, response["error"])
+                if not return_exceptions:
+                    raise error
+                results.append(error)
+                continue
+            try:
+                results.append(decoder(response["result"]))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        self._requests, self._decoders = [], []
+        return results
+
+    async def gather(self, return_exceptions: bool = False) -> list[Any]:
+        """execute() off the event loop."""
+        return await asyncio.to_thread(self.execute, return_exceptions)
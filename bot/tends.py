@@ -0,0 +1,71 @@
+import os
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+from bot.risk import RiskSnapshot
+
+# =============================================================================
+# Tend Queue
+# =============================================================================
+#
+# Due tends are ranked by urgency and funded from the signer balance in that order, so when ETH runs
+# short it's the healthiest positions that wait. Urgency is a weighted sum of three 0..1 terms:
+# closeness to liquidation, leverage relative to maxLeverageRatio, and time since the last tend.
+# Strategies without a position (e.g. yBOLD) only score on the last one. A tend's cost is what the
+# node reserves at submission, gas limit x maxFeePerGas, so the budget is conservative. execute_tend
+# sends the same tend_gas_limit() it was budgeted with.
+
+URGENCY_DISTANCE_RANGE = float(os.getenv("URGENCY_DISTANCE_RANGE", "0.5"))  # price drop at which risk scores 0
+TEND_STALE_AFTER = int(os.getenv("TEND_STALE_AFTER", "86400"))  # seconds since last tend at which staleness is 1
+TEND_GAS_FALLBACK = int(os.getenv("TEND_GAS_FALLBACK", "1500000"))  # used when a tend couldn't be estimated
+TEND_GAS_MARGIN = float(os.getenv("TEND_GAS_MARGIN", "1.2"))  # estimate -> gas limit headroom
+
+URGENCY_WEIGHTS = (4.0, 2.0, 1.0)  # liquidation, leverage, staleness
+
+
+@dataclass
+class TendJob:
+    address: str
+    name: str
+    urgency: float
+    gas: int | None  # simulated gas, if the simulation ran
+    cost: int = 0  # wei
+    funded: bool = False
+
+
+def urgency_scores(snapshot: RiskSnapshot, last_tend: dict[str, int], now_ts: int) -> dict[str, float]:
+    """Urgency per strategy in `last_tend`; those also in the snapshot add the position terms."""
+    w_liq, w_lev, w_stale = URGENCY_WEIGHTS
+    scores = {addr: w_stale * min(max(now_ts - ts, 0) / TEND_STALE_AFTER, 1.0) for addr, ts in last_tend.items()}
+    liquidation = np.clip(1 - snapshot.liquidation_distance / URGENCY_DISTANCE_RANGE, 0, 1)
+    leverage = np.clip(snapshot.leverage_utilization, 0, 1)
+    for i, addr in enumerate(snapshot.addrs):
+        if addr not in scores or not snapshot.active[i]:
+            continue
+        scores[addr] += w_liq * float(np.nan_to_num(liquidation[i]))
+        scores[addr] += w_lev * float(np.nan_to_num(leverage[i]))
+    return scores
+
+
+def tend_gas_limit(gas: int | None) -> int:
+    """Gas limit a tend is sent with: its simulated gas (or the fallback) plus TEND_GAS_MARGIN."""
+    return int((gas if gas is not None else TEND_GAS_FALLBACK) * TEND_GAS_MARGIN)
+
+
+def tend_cost(gas: int | None, max_fee_gwei: float) -> int:
+    """Wei the node reserves for a tend submitted with this maxFeePerGas."""
+    return int(tend_gas_limit(gas) * max_fee_gwei * 1e9)
+
+
+def fund_tends(jobs: Sequence[TendJob], balance: int) -> list[TendJob]:
+    """Sort jobs by urgency and mark the ones the balance covers, spending it in that order. A job that
+    doesn't fit is skipped rather than ending the pass, so a cheaper, less urgent tend can still go."""
+    ranked = sorted(jobs, key=lambda job: job.urgency, reverse=True)
+    remaining = balance
+    for job in ranked:
+        job.funded = job.cost <= remaining
+        if job.funded:
+            remaining -= job.cost
+    return ranked
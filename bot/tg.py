@@ -1,16 +1,58 @@
 import asyncio
+import functools
+import hmac
 import json
 import os
 import random
 import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from urllib.parse import urlparse
 from urllib.request import Request, urlopen
 
+from aiohttp import web
 from telegram import Update
 from telegram.ext import Application, CommandHandler, ContextTypes
 from tinybot import multicall
 from tinybot.tg import BOT_ACCESS_TOKEN, DEV_GROUP_CHAT_ID, GROUP_CHAT_ID
 from web3 import Web3
 
+from bot import discovery
+from bot.cache import CacheNamespace, cache_lines, cache_namespace, cached_multicall, strategy_names
+from bot.cassette import attach_cassette, taped_http
+from bot.config import (
+    BASE_STRATEGY_ABI,
+    EMOJIS,
+    ERC20_ABI,
+    LENDER_BORROWER_ABI,
+    LOOPER_ABI,
+    NETWORK_RPC_ENVS,
+    NETWORKS,
+    TOKENIZED_STRATEGY_ABI,
+    VAULT_ABI,
+    looper_venues,
+    network,
+    network_cfg,
+    w3_contract,
+)
+from bot.flows import flow_tracker
+from bot.governor import budget_lines, govern, rpc_priority
+from bot.rates import BorrowRate, borrow_rates
+from bot.report import network_reports
+from bot.risk import (
+    STRESS_GRID_STEP,
+    STRESS_MAX_SHOCK,
+    STRESS_REPORT_LEVELS,
+    fetch_risk_snapshot,
+    shock_grid,
+    stress_lines,
+    stress_test,
+)
+from bot.timing import attach_timing, timed
+from bot.utils import chunk_messages, format_time_ago
+
 CHAIN_IDS: dict[str, int] = {
     "ethereum": 1,
     "base": 8453,
@@ -23,35 +65,150 @@ CHAIN_IDS: dict[str, int] = {
 def _fetch_kong_snapshot(chain_id: int, vault_addr: str) -> dict | None:
     """Fetch Yearn Kong snapshot for a vault. Returns None on any failure."""
     url = f"https://kong.yearn.fi/api/rest/snapshot/{chain_id}/{vault_addr}"
-    try:
+
+    def _fetch() -> dict:  # type: ignore[type-arg]
         req = Request(url, headers={"User-Agent": "ydegen-monitor-bot"})  # noqa: S310
-        with urlopen(req, timeout=10) as resp:  # noqa: S310
+        with timed("http kong"), urlopen(req, timeout=10) as resp:  # noqa: S310
             return json.load(resp)  # type: ignore[no-any-return]
+
+    try:
+        return taped_http(url, _fetch)  # type: ignore[no-any-return]
     except Exception:
         return None
 
-from bot.config import (
-    BASE_STRATEGY_ABI,
-    EMOJIS,
-    ERC20_ABI,
-    LENDER_BORROWER_ABI,
-    LOOPER_ABI,
-    MULTI_STRATEGY_VAULT_TYPE,
-    NETWORK_RPC_ENVS,
-    NETWORKS,
-    REGISTRY_ABI,
-    REGISTRY_ADDRESSES,
-    TOKENIZED_STRATEGY_ABI,
-    VAULT_ABI,
-    w3_contract,
-)
+
+EXPOSURE_REFRESH_INTERVAL = int(os.getenv("EXPOSURE_REFRESH_INTERVAL", "900"))  # 15 minutes default
+EXPOSURE_KONG = os.getenv("EXPOSURE_KONG", "0") == "1"  # also ask Kong for strategies the chain scan missed
+
+
+# (network, rpc url) -> Web3, so commands reuse the HTTP session and the provider is wrapped only once
+_w3_clients: CacheNamespace[tuple[str, str], Web3] = cache_namespace("web3_clients", max_entries=16)
 
 
 def _get_w3(network_key: str) -> Web3 | None:
     rpc_url = os.getenv(NETWORK_RPC_ENVS.get(network_key, ""), "")
     if not rpc_url:
         return []
-    return Web3(Web3.HTTPProvider(rpc_url))
+    return _w3_clients.get_or_load(
+        (network_key, rpc_url),
+        lambda: govern(attach_cassette(attach_timing(Web3(Web3.HTTPProvider(rpc_url))), network_key), network_key),
+    )
+
+
+# =============================================================================
+# Command Workers
+# =============================================================================
+#
+# Command work is blocking (web3 + urllib), so it runs on a bounded thread pool, one job per network,
+# instead of on the listener loop. Handlers are registered non-blocking, reply "working…" straight away
+# and post each network's result as soon as it lands. /cancel drops whatever hasn't run yet.
+
+COMMAND_WORKERS = int(os.getenv("COMMAND_WORKERS", "4"))
+COMMAND_TIMEOUT = int(os.getenv("COMMAND_TIMEOUT", "300"))  # 5 minutes default
+COMMAND_CONCURRENCY = {"status": 2, "stress": 1, "report": 1}  # max in-flight runs per command
+
+_command_pool = ThreadPoolExecutor(max_workers=COMMAND_WORKERS, thread_name_prefix="tg-command")
+_command_limits = {command: asyncio.Semaphore(limit) for command, limit in COMMAND_CONCURRENCY.items()}
+# chat id -> running command tasks, for /cancel
+_running_commands: dict[int, set[asyncio.Task[Any]]] = {}
+
+
+def _network_messages(build: Callable[[str], str | list[str] | None], network_key: str) -> list[str]:
+    try:
+        with rpc_priority("command"):
+            result = build(network_key)
+    except Exception as e:
+        return [f"{random.choice(EMOJIS)} <b>{network_key.capitalize()}</b>\n\nFailed: {e}"]
+    if not result:
+        return []
+    return [result] if isinstance(result, str) else list(result)
+
+
+async def _run_per_network(
+    update: Update, command: str, build: Callable[[str], str | list[str] | None], empty_message: str
+) -> None:
+    message = update.message
+    chat_id = update.effective_chat.id  # type: ignore[union-attr]
+    limit = _command_limits[command]
+    if limit.locked():
+        await message.reply_text(f"⏳ /{command} is already running, try again shortly.")  # type: ignore[union-attr]
+        return
+
+    async with limit:
+        total = len(NETWORKS)
+        progress = await message.reply_text(f"⏳ Working… 0/{total} networks")  # type: ignore[union-attr]
+        loop = asyncio.get_running_loop()
+        jobs = [loop.run_in_executor(_command_pool, _network_messages, build, network_key) for network_key in NETWORKS]
+        task = asyncio.current_task()
+        running = _running_commands.setdefault(chat_id, set())
+        if task is not None:
+            running.add(task)
+
+        done = sent = 0
+        outcome = "✅ Done"
+        try:
+            for next_job in asyncio.as_completed(jobs, timeout=COMMAND_TIMEOUT):
+                messages = await next_job
+                done += 1
+                for msg in messages:
+                    await message.reply_text(msg, parse_mode="HTML", disable_web_page_preview=True)  # type: ignore[union-attr]
+                    sent += 1
+                if done < total:
+                    await progress.edit_text(f"⏳ Working… {done}/{total} networks")
+        except TimeoutError:
+            outcome = "⌛ Timed out"
+        except asyncio.CancelledError:
+            outcome = "🛑 Cancelled"
+        finally:
+            for job in jobs:
+                job.cancel()  # networks still queued in the pool never start
+            if task is not None:
+                running.discard(task)
+
+        if outcome == "✅ Done" and not sent:
+            await message.reply_text(empty_message)  # type: ignore[union-attr]
+        await progress.edit_text(f"{outcome} — {done}/{total} networks")
+
+
+async def _rpc_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.effective_chat is None or update.effective_chat.id not in (GROUP_CHAT_ID, DEV_GROUP_CHAT_ID):
+        return
+
+    # Only this process's traffic: the listener's own commands plus this container's network
+    lines = budget_lines() or ["No RPC traffic yet."]
+    await update.message.reply_text("📶 <b>RPC budget</b>\n\n" + "\n".join(lines), parse_mode="HTML")  # type: ignore[union-attr]
+
+
+async def _flows_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.effective_chat is None or update.effective_chat.id not in (GROUP_CHAT_ID, DEV_GROUP_CHAT_ID):
+        return
+
+    # Straight from the in-memory aggregates, no RPC. Like /rpc, only this container's network is tracked here.
+    blocks = flow_tracker.lines(int(time.time()))
+    if not blocks:
+        await update.message.reply_text("No deposits or withdrawals seen since startup.")  # type: ignore[union-attr]
+        return
+    header = f"🌊 <b>{network().capitalize()} vault flows</b>"
+    for msg in chunk_messages(header, blocks):
+        await update.message.reply_text(msg, parse_mode="HTML", disable_web_page_preview=True)  # type: ignore[union-attr]
+
+
+async def _cache_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.effective_chat is None or update.effective_chat.id not in (GROUP_CHAT_ID, DEV_GROUP_CHAT_ID):
+        return
+
+    # Like /rpc: the listener's caches plus this container's network
+    await update.message.reply_text("🗄 <b>Caches</b>\n\n" + "\n".join(cache_lines()), parse_mode="HTML")  # type: ignore[union-attr]
+
+
+async def _cancel_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.effective_chat is None or update.effective_chat.id not in (GROUP_CHAT_ID, DEV_GROUP_CHAT_ID):
+        return
+
+    tasks = _running_commands.get(update.effective_chat.id, set())
+    for task in list(tasks):
+        task.cancel()
+    await update.message.reply_text(f"Cancelled {len(tasks)} running command(s).")  # type: ignore[union-attr]
 
 
 def _build_network_status(network_key: str) -> str | None:
@@ -59,15 +216,15 @@ def _build_network_status(network_key: str) -> str | None:
     if not w3:
         return []
 
-    network_cfg = NETWORKS[network_key]
-    lb_addrs = list(network_cfg["lender_borrowers"])
-    liquity_addrs = list(network_cfg["liquity_lender_borrowers"].keys())
-    ybold_addrs = list(network_cfg["ybold"])
+    net_cfg = network_cfg(network_key)
+    lb_addrs = list(net_cfg["lender_borrowers"])
+    liquity_addrs = list(net_cfg["liquity_lender_borrowers"].keys())
+    ybold_addrs = list(net_cfg["ybold"])
     looper_addrs = (
-        list(network_cfg["morpho_loopers"])
-        + list(network_cfg["aave_loopers"])
-        + list(network_cfg["flex_loopers"])
-        + list(network_cfg["pawnbroker_loopers"])
+        list(net_cfg["morpho_loopers"])
+        + list(net_cfg["aave_loopers"])
+        + list(net_cfg["flex_loopers"])
+        + list(net_cfg["pawnbroker_loopers"])
     )
     all_addrs = lb_addrs + liquity_addrs + ybold_addrs + looper_addrs
 
@@ -77,8 +234,10 @@ def _build_network_status(network_key: str) -> str | None:
     ltv_addrs = lb_addrs + liquity_addrs + looper_addrs
     ltv_addr_set = set(ltv_addrs)
 
-    tend_results = multicall(w3, [w3_contract(w3, a, BASE_STRATEGY_ABI).functions.tendTrigger() for a in all_addrs])
-    name_results = multicall(w3, [w3_contract(w3, a, TOKENIZED_STRATEGY_ABI).functions.name() for a in all_addrs])
+    tend_results = cached_multicall(
+        w3, network_key, [w3_contract(w3, a, BASE_STRATEGY_ABI).functions.tendTrigger() for a in all_addrs]
+    )
+    name_results = strategy_names(w3, network_key, all_addrs)
 
     ltv_map: dict[str, float] = {}
     if ltv_addrs:
@@ -88,16 +247,21 @@ def _build_network_status(network_key: str) -> str | None:
         for a in ltv_addrs:
             abi = LOOPER_ABI if a in looper_set else LENDER_BORROWER_ABI
             ltv_calls.append(w3_contract(w3, a, abi).functions.getCurrentLTV())
-        ltv_results = multicall(w3, ltv_calls)
+        ltv_results = cached_multicall(w3, network_key, ltv_calls)
         for addr, raw_ltv in zip(ltv_addrs, ltv_results):
             ltv_map[addr] = raw_ltv / 1e16
 
+    rates = borrow_rates(w3, network_key, net_cfg["morpho"], looper_venues(network_key))
+
     lines = [f"{random.choice(EMOJIS)} <b>{network_key.capitalize()}</b>"]
     for addr, name, (needs_tend, _) in zip(all_addrs, name_results, tend_results):
         line = f"<b>Name:</b> {name}\n"
         line += f"<b>Tend Trigger:</b> {needs_tend}"
         if addr in ltv_addr_set:
             line += f"\n<b>LTV:</b> {ltv_map.get(addr, 0.0):.1f}%"
+        if addr in rates:
+            rate = rates[addr]
+            line += f"\n<b>Borrow Rate:</b> {rate if isinstance(rate, BorrowRate) else 'n/a'}"
         lines.append(line)
 
     return "\n\n".join(lines)
@@ -106,12 +270,7 @@ def _build_network_status(network_key: str) -> str | None:
 def build_status_messages() -> list[str]:
     messages = []
     for network_key in NETWORKS:
-        try:
-            msg = _build_network_status(network_key)
-            if msg:
-                messages.append(msg)
-        except Exception as e:
-            messages.append(f"{random.choice(EMOJIS)} <b>{network_key.capitalize()}</b>\n\nFailed: {e}")
+        messages.extend(_network_messages(_build_network_status, network_key))
     return messages
 
 
@@ -119,41 +278,117 @@ async def _status_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     if update.effective_chat is None or update.effective_chat.id not in (GROUP_CHAT_ID, DEV_GROUP_CHAT_ID):
         return
 
+    await _run_per_network(update, "status", _build_network_status, "No strategies configured.")
+
+
+def _build_network_stress(network_key: str, levels: list[float]) -> str | None:
+    w3 = _get_w3(network_key)
+    if not w3:
+        return None
+
+    net_cfg = network_cfg(network_key)
+    lb_addrs = list(net_cfg["lender_borrowers"]) + list(net_cfg["liquity_lender_borrowers"].keys())
+    looper_addrs = (
+        list(net_cfg["morpho_loopers"])
+        + list(net_cfg["aave_loopers"])
+        + list(net_cfg["flex_loopers"])
+        + list(net_cfg["pawnbroker_loopers"])
+    )
+    if not lb_addrs and not looper_addrs:
+        return None
+
+    snapshot = fetch_risk_snapshot(w3, network_key, lb_addrs, looper_addrs)
+    result = stress_test(snapshot, shock_grid())
+    names = strategy_names(w3, network_key, snapshot.addrs)
+    lines = stress_lines(names, result, levels)
+    return f"💥 <b>{network_key.capitalize()}</b> — collateral price shocks\n\n" + "\n".join(lines)
+
+
+def build_stress_messages(levels: list[float]) -> list[str]:
+    build = functools.partial(_build_network_stress, levels=levels)
+    messages = []
+    for network_key in NETWORKS:
+        messages.extend(_network_messages(build, network_key))
+    return messages
+
+
+async def _stress_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.effective_chat is None or update.effective_chat.id not in (GROUP_CHAT_ID, DEV_GROUP_CHAT_ID):
+        return
+
+    # `/stress 15 25` reports those drops (in %); without args the default levels are used
     try:
-        messages = build_status_messages()
-    except Exception as e:
-        messages = [f"Failed to fetch status: {e}"]
+        levels = [float(a.rstrip("%")) / 100 for a in context.args or []] or STRESS_REPORT_LEVELS
+    except ValueError:
+        await update.message.reply_text("Usage: /stress [drop% ...], e.g. /stress 15 25")  # type: ignore[union-attr]
+        return
 
-    if not messages:
-        messages = ["No strategies configured."]
+    # the shock grid only spans STRESS_GRID_STEP..STRESS_MAX_SHOCK; a level outside it would be reported
+    # against the nearest grid point under the requested label
+    if any(not STRESS_GRID_STEP <= level <= STRESS_MAX_SHOCK for level in levels):
+        await update.message.reply_text(  # type: ignore[union-attr]
+            f"Drops must be between {STRESS_GRID_STEP * 100:g}% and {STRESS_MAX_SHOCK * 100:g}%."
+        )
+        return
 
-    for msg in messages:
-        await update.message.reply_text(msg, parse_mode="HTML", disable_web_page_preview=True)  # type: ignore[union-attr]
+    build = functools.partial(_build_network_stress, levels=levels)
+    await _run_per_network(update, "stress", build, "No leveraged positions configured.")
 
 
-def _chunk_messages(header: str, blocks: list[str], max_len: int = 3500) -> list[str]:
-    """Pack vault blocks into Telegram-sized messages, repeating the header per chunk."""
-    chunks = []
-    current = header
-    for block in blocks:
-        if len(current) + len(block) + 2 > max_len:
-            chunks.append(current)
-            current = header
-        current += "\n\n" + block
-    if current != header:
-        chunks.append(current)
-    return chunks
+def _build_network_report(network_key: str, name_filter: str) -> list[str]:
+    w3 = _get_w3(network_key)
+    if not w3:
+        return []
+    reports = network_reports(w3, network_key, int(time.time()))
+    return [r.message for r in reports if name_filter in str(r.metrics["name"]).lower()]
+
+
+async def _report_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.effective_chat is None or update.effective_chat.id not in (GROUP_CHAT_ID, DEV_GROUP_CHAT_ID):
+        return
+
+    # The full per-strategy dump the daily digest leaves out; `/report morpho` keeps names containing "morpho"
+    build = functools.partial(_build_network_report, name_filter=" ".join(context.args or []).lower())
+    await _run_per_network(update, "report", build, "No matching strategies with assets.")
 
 
 # Min-amount thresholds by asset category. Symbols are matched lowercased.
 _STABLE_SYMBOLS = {
-    "usdc", "usdt", "dai", "usds", "usde", "susde", "frax", "lusd", "gho",
-    "rlusd", "pyusd", "bold", "crvusd", "usdaf", "usnd", "ysusd", "usdc.e",
-    "tusd", "yvusd", "yvbold", "vbUSDS", "vbUSDT",
+    "usdc",
+    "usdt",
+    "dai",
+    "usds",
+    "usde",
+    "susde",
+    "frax",
+    "lusd",
+    "gho",
+    "rlusd",
+    "pyusd",
+    "bold",
+    "crvusd",
+    "usdaf",
+    "usnd",
+    "ysusd",
+    "usdc.e",
+    "tusd",
+    "yvusd",
+    "yvbold",
+    "vbUSDS",
+    "vbUSDT",
 }
 _ETH_SYMBOLS = {
-    "weth", "eth", "steth", "wsteth", "reth", "cbeth", "frxeth", "sfrxeth",
-    "weeth", "ezeth", "oeth",
+    "weth",
+    "eth",
+    "steth",
+    "wsteth",
+    "reth",
+    "cbeth",
+    "frxeth",
+    "sfrxeth",
+    "weeth",
+    "ezeth",
+    "oeth",
 }
 _BTC_SYMBOLS = {"wbtc", "cbbtc", "tbtc", "lbtc", "btc", "wbtc18", "vbwbtc"}
 
@@ -176,42 +411,8 @@ def _build_network_exposure(network_key: str) -> list[str]:
 
     explorer = NETWORKS[network_key]["explorer"]
 
-    # 1. Collect endorsed vaults from BOTH registries, tracking which registry knows each vault
-    vault_addrs: list[str] = []
-    registry_for_vault: dict[str, str] = {}
-    for registry_addr in REGISTRY_ADDRESSES:
-        registry = w3_contract(w3, registry_addr, REGISTRY_ABI)
-        try:
-            nested = registry.functions.getAllEndorsedVaults().call()
-            for sub in nested:
-                for a in sub:
-                    key = a.lower()
-                    if key not in registry_for_vault:
-                        registry_for_vault[key] = registry_addr
-                        vault_addrs.append(a)
-        except Exception:
-            continue
-
-    if not vault_addrs:
-        return []
-
-    # 2. Multicall vaultInfo against the registry that actually knows each vault
-    info_calls = []
-    for addr in vault_addrs:
-        reg_addr = registry_for_vault[addr.lower()]
-        registry = w3_contract(w3, reg_addr, REGISTRY_ABI)
-        info_calls.append(registry.functions.vaultInfo(Web3.to_checksum_address(addr)))
-    info_results = multicall(w3, info_calls)
-
-    multi_strategy_vaults: list[str] = []
-    for addr, info in zip(vault_addrs, info_results):
-        # info: (asset, releaseVersion, vaultType, deploymentTimestamp, index, tag)
-        try:
-            if info[2] == MULTI_STRATEGY_VAULT_TYPE:
-                multi_strategy_vaults.append(addr)
-        except Exception:
-            continue
-
+    # 1-2. Endorsed multi-strategy vaults from BOTH registries
+    multi_strategy_vaults = discovery.multi_strategy_vaults(w3)
     if not multi_strategy_vaults:
         return []
 
@@ -219,13 +420,15 @@ def _build_network_exposure(network_key: str) -> list[str]:
     vault_calls = []
     for addr in multi_strategy_vaults:
         v = w3_contract(w3, addr, VAULT_ABI)
-        vault_calls.extend([
-            v.functions.name(),
-            v.functions.asset(),
-            v.functions.totalAssets(),
-            v.functions.decimals(),
-            v.functions.get_default_queue(),
-        ])
+        vault_calls.extend(
+            [
+                v.functions.name(),
+                v.functions.asset(),
+                v.functions.totalAssets(),
+                v.functions.decimals(),
+                v.functions.get_default_queue(),
+            ]
+        )
     vault_results = multicall(w3, vault_calls)
 
     # 4. Collect unique asset + strategy addresses
@@ -251,31 +454,58 @@ def _build_network_exposure(network_key: str) -> list[str]:
         ]
         sym_results = multicall(w3, sym_calls + idle_calls)
         asset_symbols = sym_results[: len(asset_addrs)]
-        for v, idle in zip(multi_strategy_vaults, sym_results[len(asset_addrs):]):
+        for v, idle in zip(multi_strategy_vaults, sym_results[len(asset_addrs) :]):
             idle_map[v.lower()] = idle
 
-    # 6. Pull strategy names + debts from Kong (one call per vault).
-    #    Composition includes both queued strategies (debt may be 0) and any orphan with non-zero debt.
+    # 6. Strategy debts + names on-chain, in one multicall: vault.strategies(s) for every (vault, strategy)
+    #    pair and name() for every strategy. Composition is the default queue (debt may be 0) plus any
+    #    strategy the vault added and still has debt in, found from its StrategyChanged logs.
+    try:
+        added_per_vault = discovery.vault_strategies(w3, network_key, multi_strategy_vaults)
+    except Exception as e:
+        print(f"Vault strategy scan failed for {network_key}, showing default queues only: {e}")
+        added_per_vault = {}
+    pairs: list[tuple[str, str]] = []
+    for vault_addr, strategies in zip(multi_strategy_vaults, strategies_per_vault):
+        composition = {s.lower(): s for s in strategies}
+        for s in added_per_vault.get(vault_addr.lower(), []):
+            composition.setdefault(s.lower(), s)
+        pairs.extend((vault_addr, s) for s in composition.values())
+    strategy_addrs = list({s.lower(): s for _, s in pairs}.values())
+    debt_calls = [w3_contract(w3, v, VAULT_ABI).functions.strategies(Web3.to_checksum_address(s)) for v, s in pairs]
+    name_calls = [w3_contract(w3, s, TOKENIZED_STRATEGY_ABI).functions.name() for s in strategy_addrs]
+    strategy_results = multicall(w3, debt_calls + name_calls)
+
     strategy_name_map: dict[str, str] = {}
     balance_map: dict[tuple[str, str], int] = {}
     extras_per_vault: list[list[tuple[str, int]]] = [[] for _ in multi_strategy_vaults]
+    for (vault_addr, s), params in zip(pairs, strategy_results):
+        # params: (activation, last_report, current_debt, max_debt)
+        balance_map[(vault_addr.lower(), s.lower())] = params[2]
+    for s, sname in zip(strategy_addrs, strategy_results[len(pairs) :]):
+        strategy_name_map[s.lower()] = sname
+    for i, vault_addr in enumerate(multi_strategy_vaults):
+        queue_set = {s.lower() for s in strategies_per_vault[i]}
+        for s in added_per_vault.get(vault_addr.lower(), []):
+            debt = balance_map.get((vault_addr.lower(), s.lower()), 0)
+            if s.lower() not in queue_set and debt != 0:
+                extras_per_vault[i].append((s, debt))
+
+    # 6b. Optional Kong enrichment: strategies with debt the log scan hasn't reached yet (backfill still
+    #     running, or the node refused the range). Anything already read on-chain is left alone.
     chain_id = CHAIN_IDS.get(network_key)
-    if chain_id is not None:
+    if EXPOSURE_KONG and chain_id is not None:
         for i, vault_addr in enumerate(multi_strategy_vaults):
-            queue_set = {s.lower() for s in strategies_per_vault[i]}
             snapshot = _fetch_kong_snapshot(chain_id, vault_addr)
             if not snapshot:
                 continue
             for entry in snapshot.get("composition", []) or []:
                 addr = entry.get("address", "")
-                if not addr:
+                if not addr or (vault_addr.lower(), addr.lower()) in balance_map:
                     continue
                 debt = int(str(entry.get("currentDebt", "0")))
-                ename = entry.get("name", addr)
-                strategy_name_map[addr.lower()] = ename
-                if addr.lower() in queue_set:
-                    balance_map[(vault_addr.lower(), addr.lower())] = debt
-                elif debt != 0:
+                strategy_name_map.setdefault(addr.lower(), entry.get("name", addr))
+                if debt != 0:
                     extras_per_vault[i].append((addr, debt))
 
     # 7. Build vault blocks (skip below threshold + name filters)
@@ -321,7 +551,7 @@ def _build_network_exposure(network_key: str) -> list[str]:
         return []
 
     header = f"{random.choice(EMOJIS)} <b>{network_key.capitalize()}</b>"
-    return _chunk_messages(header, blocks)
+    return chunk_messages(header, blocks)
 
 
 def build_exposure_messages() -> list[str]:
@@ -334,12 +564,74 @@ def build_exposure_messages() -> list[str]:
     return messages
 
 
+# Materialized exposure view: network -> (built_at, messages). Refreshed in the background so
+# /exposure can answer immediately instead of scanning registries and vault logs on request.
+_exposure_views: CacheNamespace[str, tuple[float, list[str]]] = cache_namespace("exposure_views", max_entries=16)
+_exposure_refresh_task: asyncio.Task[None] | None = None
+
+# Strong references to long-running tasks on the listener loop
+_background_tasks: set[asyncio.Task[None]] = set()
+
+
+async def _refresh_network_exposure(network_key: str) -> None:
+    try:
+        with rpc_priority("report"):  # to_thread carries the priority over to the worker thread
+            messages = await asyncio.to_thread(_build_network_exposure, network_key)
+    except Exception as e:
+        print(f"Exposure refresh failed for {network_key}: {e}")
+        if _exposure_views.get(network_key) is not None:
+            return  # keep serving the last good view, its age shows it's stale
+        messages = [f"{random.choice(EMOJIS)} <b>{network_key.capitalize()}</b>\n\nFailed: {e}"]
+    _exposure_views.set(network_key, (time.time(), messages))
+
+
+async def _refresh_all_exposure() -> None:
+    await asyncio.gather(*(_refresh_network_exposure(network_key) for network_key in NETWORKS))
+
+
+def refresh_exposure_views() -> asyncio.Task[None]:
+    """Start a refresh of every network's view, or join the one already running."""
+    global _exposure_refresh_task
+    if _exposure_refresh_task is None or _exposure_refresh_task.done():
+        _exposure_refresh_task = asyncio.get_running_loop().create_task(_refresh_all_exposure())
+    return _exposure_refresh_task
+
+
+async def _exposure_refresh_loop() -> None:
+    while True:
+        try:
+            await asyncio.shield(refresh_exposure_views())
+        except Exception as e:
+            print(f"Exposure refresh failed: {e}")
+        await asyncio.sleep(EXPOSURE_REFRESH_INTERVAL)
+
+
+def exposure_view_messages() -> list[str]:
+    now = time.time()
+    messages = []
+    for network_key in NETWORKS:
+        view = _exposure_views.get(network_key)
+        if not view or not view[1]:
+            continue
+        built_at, network_messages = view
+        age_line = f"\n\n<i>Updated {format_time_ago(int(now - built_at))}</i>"
+        messages.extend(network_messages[:-1])
+        messages.append(network_messages[-1] + age_line)
+    return messages
+
+
 async def _exposure_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if update.effective_chat is None or update.effective_chat.id not in (GROUP_CHAT_ID, DEV_GROUP_CHAT_ID):
         return
 
+    # `/exposure refresh` forces a rebuild; it joins any refresh already in flight. With no view yet
+    # (right after startup) we also wait for the first build rather than reply with nothing.
+    args = context.args or []
+    force = bool(args) and args[0].lower() == "refresh"
     try:
-        messages = build_exposure_messages()
+        if force or not _exposure_views:
+            await asyncio.shield(refresh_exposure_views())
+        messages = exposure_view_messages()
     except Exception as e:
         messages = [f"Failed to fetch exposure: {e}"]
 
@@ -351,16 +643,87 @@ async def _exposure_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
         await asyncio.sleep(0.5)
 
 
+# =============================================================================
+# Webhook
+# =============================================================================
+#
+# With TG_WEBHOOK_URL and TG_WEBHOOK_SECRET set, Telegram pushes updates to a small aiohttp server in
+# this process instead of being long-polled. Each update is put on the application's update queue, so
+# the same handlers serve it. Telegram keeps updates that arrive while the bot is down and delivers them
+# once the webhook answers again. If the server or setWebhook fails, the listener falls back to polling.
+# TG_API_BASE_URL points the bot at a local stand-in of the Bot API for testing.
+
+TG_WEBHOOK_URL = os.getenv("TG_WEBHOOK_URL", "")  # public https URL Telegram posts updates to
+TG_WEBHOOK_SECRET = os.getenv("TG_WEBHOOK_SECRET", "")
+TG_WEBHOOK_LISTEN = os.getenv("TG_WEBHOOK_LISTEN", "0.0.0.0")  # noqa: S104
+TG_WEBHOOK_PORT = int(os.getenv("TG_WEBHOOK_PORT", "8443"))
+TG_API_BASE_URL = os.getenv("TG_API_BASE_URL", "")  # e.g. http://localhost:8081, without the /bot suffix
+
+_webhook_runners: list[web.AppRunner] = []
+
+
+def _webhook_server(app: Application) -> web.Application:  # type: ignore[type-arg]
+    async def _handle(request: web.Request) -> web.Response:
+        received = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+        if not hmac.compare_digest(received.encode(), TG_WEBHOOK_SECRET.encode()):
+            return web.Response(status=403)
+        try:
+            data = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+        await app.update_queue.put(Update.de_json(data, app.bot))
+        return web.Response()
+
+    server = web.Application()
+    server.router.add_post(urlparse(TG_WEBHOOK_URL).path or "/", _handle)
+    return server
+
+
+async def _start_webhook(app: Application) -> bool:  # type: ignore[type-arg]
+    """Serve updates on TG_WEBHOOK_URL. Returns False, with nothing left running, if that isn't possible."""
+    if not TG_WEBHOOK_URL or not TG_WEBHOOK_SECRET:
+        if TG_WEBHOOK_URL:
+            print("TG_WEBHOOK_URL is set without TG_WEBHOOK_SECRET, falling back to polling")
+        return False
+
+    runner = web.AppRunner(_webhook_server(app))
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, TG_WEBHOOK_LISTEN, TG_WEBHOOK_PORT).start()
+        await app.bot.set_webhook(url=TG_WEBHOOK_URL, secret_token=TG_WEBHOOK_SECRET, allowed_updates=Update.ALL_TYPES)
+    except Exception as e:
+        print(f"Webhook setup failed, falling back to polling: {e}")
+        await runner.cleanup()
+        return False
+    _webhook_runners.append(runner)
+    return True
+
+
 def start_command_listener() -> None:
     def _run() -> None:
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
-        app = Application.builder().token(BOT_ACCESS_TOKEN).build()
-        app.add_handler(CommandHandler("status", _status_command))
-        app.add_handler(CommandHandler("exposure", _exposure_command))
+        builder = Application.builder().token(BOT_ACCESS_TOKEN)
+        if TG_API_BASE_URL:
+            builder = builder.base_url(f"{TG_API_BASE_URL.rstrip('/')}/bot")
+        app = builder.build()
+        # block=False: a slow command must not hold up the updates queued behind it
+        app.add_handler(CommandHandler("status", _status_command, block=False))
+        app.add_handler(CommandHandler("exposure", _exposure_command, block=False))
+        app.add_handler(CommandHandler("stress", _stress_command, block=False))
+        app.add_handler(CommandHandler("report", _report_command, block=False))
+        app.add_handler(CommandHandler("rpc", _rpc_command, block=False))
+        app.add_handler(CommandHandler("cache", _cache_command, block=False))
+        app.add_handler(CommandHandler("flows", _flows_command, block=False))
+        app.add_handler(CommandHandler("cancel", _cancel_command, block=False))
         loop.run_until_complete(app.initialize())
-        loop.run_until_complete(app.updater.start_polling(drop_pending_updates=True))  # type: ignore[union-attr]
+        if not loop.run_until_complete(_start_webhook(app)):
+            # plain polling starts fresh as it always has; a failed webhook setup keeps what Telegram queued
+            loop.run_until_complete(
+                app.updater.start_polling(drop_pending_updates=not TG_WEBHOOK_URL)  # type: ignore[union-attr]
+            )
         loop.run_until_complete(app.start())
+        _background_tasks.add(loop.create_task(_exposure_refresh_loop()))
         loop.run_forever()
 
     threading.Thread(target=_run, daemon=True).start()
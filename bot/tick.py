@@ -0,0 +1,93 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from web3 import Web3
+
+from bot.cache import known_strategy_names, remember_strategy_names
+from bot.config import BASE_STRATEGY_ABI, MULTICALL3_ABI, MULTICALL3_ADDRESS, TOKENIZED_STRATEGY_ABI, w3_contract
+from bot.rpc import RpcBatch, decode_output
+
+# =============================================================================
+# Tend Tick Context
+# =============================================================================
+#
+# Everything a tend tick decides on comes from one JSON-RPC batch. The first request is an eth_call
+# to Multicall3.aggregate3, so every read in it sees the same block: its number and timestamp, the
+# base fee, the signer balance, each strategy's tendTrigger() and name() for the strategies whose
+# name isn't cached. Names are read for all of them, not only the due ones, since which are due isn't
+# known until the call returns; once cached (STRATEGY_NAME_TTL) the call carries triggers only. A
+# reverting tendTrigger() leaves that strategy out instead of failing the tick. The nonce can't be
+# read from a contract, so eth_getTransactionCount rides in the same batch against "latest". The node
+# answers both from its current head, but one that advances mid-batch can leave the nonce a block
+# ahead, which is harmless: it's only compared against our own pending tends.
+
+
+@dataclass
+class TickContext:
+    block_number: int
+    timestamp: int
+    base_fee: int  # wei
+    balance: int | None  # signer balance in wei, None without a signer
+    nonce: int | None  # signer's confirmed transaction count, None without a signer
+    triggers: dict[str, bool]  # strategy -> tendTrigger(); strategies whose call reverted are missing
+    names: dict[str, str]  # strategy -> name(), for every strategy whose trigger was read
+
+    @property
+    def due(self) -> list[str]:
+        return [addr for addr, needs_tend in self.triggers.items() if needs_tend]
+
+
+def fetch_tick_context(w3: Web3, network_key: str, strategies: Sequence[str], signer: str | None) -> TickContext:
+    """One tick's view of the chain (see above) in a single round trip; signer=None skips balance and nonce."""
+    mc = w3_contract(w3, MULTICALL3_ADDRESS, MULTICALL3_ABI)
+    builtins = [mc.functions.getBlockNumber(), mc.functions.getCurrentBlockTimestamp(), mc.functions.getBasefee()]
+    if signer:
+        builtins.append(mc.functions.getEthBalance(Web3.to_checksum_address(signer)))
+    triggers = [w3_contract(w3, addr, BASE_STRATEGY_ABI).functions.tendTrigger() for addr in strategies]
+    names = known_strategy_names(network_key, strategies)
+    unnamed = list(dict.fromkeys(addr for addr in strategies if addr.lower() not in names))
+    name_calls = [w3_contract(w3, addr, TOKENIZED_STRATEGY_ABI).functions.name() for addr in unnamed]
+
+    # built-ins must succeed, strategy calls may revert on their own
+    fns = builtins + triggers + name_calls
+    calls = [(fn.address, i >= len(builtins), fn._encode_transaction_data()) for i, fn in enumerate(fns)]
+
+    batch = RpcBatch(w3)
+    aggregate_i = batch.call(mc.functions.aggregate3(calls))
+    nonce_i = batch.nonce(signer) if signer else None
+    results = batch.execute()
+
+    aggregated = results[aggregate_i]
+    # a reverting built-in reverts the whole aggregate3, so these always decode
+    block_number, timestamp, base_fee, *signer_balance = (
+        int(decode_output(w3, fn, data)) for fn, (_, data) in zip(builtins, aggregated)
+    )
+    balance = signer_balance[0] if signer else None
+    decoded = [
+        decode_output(w3, fn, data) if success else None
+        for fn, (success, data) in zip(fns[len(builtins) :], aggregated[len(builtins) :])
+    ]
+    trigger_results = decoded[: len(triggers)]
+    name_results = decoded[len(triggers) :]
+
+    fetched = {addr.lower(): str(name) for addr, name in zip(unnamed, name_results) if name is not None}
+    remember_strategy_names(network_key, fetched)
+    names.update(fetched)
+
+    ctx_triggers = {}
+    for addr, result in zip(strategies, trigger_results):
+        if result is None:
+            print(f"tendTrigger() reverted for {addr}")
+            continue
+        ctx_triggers[addr] = bool(result[0])
+
+    return TickContext(
+        block_number=block_number,
+        timestamp=timestamp,
+        base_fee=base_fee,
+        balance=balance,
+        nonce=results[nonce_i] if nonce_i is not None else None,
+        triggers=ctx_triggers,
+        # a strategy whose name() reverted shows up under its address
+        names={addr: names.get(addr.lower(), addr) for addr in ctx_triggers},
+    )
@@ -0,0 +1,88 @@
+import contextlib
+import threading
+import time
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from web3 import Web3
+
+from bot.rpc import wrap_provider
+
+# =============================================================================
+# Phase Timing
+# =============================================================================
+#
+# Lets the one-shot CLI show where a handler spends its time. While timing() is active, every JSON-RPC
+# request (on a Web3 passed through attach_timing) and every outbound HTTP call (timed("http ...")) adds
+# its wall time to a phase; whatever is left of the run is computation and message formatting. The
+# collector is process-wide rather than a context variable so worker threads are counted too. When
+# nothing is being timed the hooks cost one global lookup.
+
+# phase -> [calls, seconds]
+Phases = dict[str, list[float]]
+
+_phases: Phases | None = None
+_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def timing() -> Iterator[Phases]:
+    global _phases
+    _phases = {}
+    try:
+        yield _phases
+    finally:
+        _phases = None
+
+
+@contextlib.contextmanager
+def timed(phase: str) -> Iterator[None]:
+    if _phases is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            if _phases is not None:
+                entry = _phases.setdefault(phase, [0, 0.0])
+                entry[0] += 1
+                entry[1] += elapsed
+
+
+def attach_timing(w3: Web3) -> Web3:
+    """Count w3's requests under "rpc <method>" (a batch as "rpc batch") while timing() is active."""
+
+    def wrap(make_request: Callable[..., Any]) -> Callable[..., Any]:
+        def timed_request(method: Any, params: Any) -> Any:
+            with timed(f"rpc {method}"):
+                return make_request(method, params)
+
+        return timed_request
+
+    def wrap_batch(make_batch_request: Callable[..., Any]) -> Callable[..., Any]:
+        def timed_batch(requests_info: Any) -> Any:
+            with timed("rpc batch"):
+                return make_batch_request(requests_info)
+
+        return timed_batch
+
+    return wrap_provider(w3, wrap, wrap_batch)
+
+
+def timing_lines(phases: Phases, total: float) -> list[str]:
+    """Per-phase breakdown: RPC and HTTP totals with their parts, then the remainder."""
+    lines = []
+    accounted = 0.0
+    for group in ("rpc", "http"):
+        parts = sorted(((p, v) for p, v in phases.items() if p.split(" ")[0] == group), key=lambda pv: -pv[1][1])
+        seconds = sum(v[1] for _, v in parts)
+        accounted += seconds
+        lines.append(f"{group.upper():<10} {seconds * 1000:>9.1f} ms  {int(sum(v[0] for _, v in parts))} calls")
+        for phase, (calls, secs) in parts:
+            lines.append(f"  {phase.split(' ', 1)[-1]:<28} {secs * 1000:>9.1f} ms  {int(calls)}x")
+    lines.append(f"{'other':<10} {max(total - accounted, 0.0) * 1000:>9.1f} ms  (compute, formatting)")
+    lines.append(f"{'total':<10} {total * 1000:>9.1f} ms")
+    return lines
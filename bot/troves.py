@@ -0,0 +1,206 @@
+import json
+import os
+import threading
+from typing import Any
+
+import numpy as np
+from hexbytes import HexBytes
+from web3 import Web3
+
+from bot.config import TROVE_MANAGER_ABI
+from bot.rpc import RpcBatch
+
+# =============================================================================
+# Local Liquity Trove Index
+# =============================================================================
+#
+# Mirrors a collateral branch's SortedTroves from TroveManager events so debt-in-front is a prefix sum
+# over troves ordered by interest rate, instead of DebtInFrontHelper walking the whole list on-chain.
+# Batches are a single node at the batch rate (batched troves sit contiguously in the list).
+# Approximations: interest accrues as simple interest since the last event (no batch management fee,
+# no pending redistribution gains), block timestamps are interpolated within each log chunk, equal-rate
+# ties are ordered by insertion, and troves below MIN_DEBT are treated as zombies (out of the list).
+
+TROVE_INDEX_FILE = "trove_index.json"
+TROVE_INDEX_START_BLOCK = int(os.getenv("TROVE_INDEX_START_BLOCK", "22400000"))  # before Liquity v2 launch
+TROVE_INDEX_LOG_CHUNK = int(os.getenv("TROVE_INDEX_LOG_CHUNK", "10000"))  # blocks per eth_getLogs
+TROVE_INDEX_MAX_CHUNKS = int(os.getenv("TROVE_INDEX_MAX_CHUNKS", "50"))  # per sync, spreads the backfill
+
+ONE_YEAR = 365 * 24 * 60 * 60
+MIN_DEBT = 2000 * 10**18
+OP_CLOSE_TROVE = 1
+OP_LIQUIDATE = 5
+
+_EVENTS = ("TroveUpdated", "BatchedTroveUpdated", "BatchUpdated", "TroveOperation")
+
+# entry: [annualInterestRate, recordedDebt, updatedAt, insertion seq]
+Entry = list[int]
+
+# the redemption check, the daily report and Telegram /report threads all sync and read the same indexes
+_trove_index_lock = threading.Lock()
+
+
+def _event_topic(name: str) -> bytes:
+    abi = next(e for e in TROVE_MANAGER_ABI if e["type"] == "event" and e["name"] == name)
+    signature = f"{name}({','.join(i['type'] for i in abi['inputs'])})"
+    return bytes(Web3.keccak(text=signature))
+
+
+class TroveIndex:
+    def __init__(self, trove_manager: str, data: dict[str, Any] | None = None) -> None:
+        data = data or {}
+        self.trove_manager = Web3.to_checksum_address(trove_manager)
+        self.last_block: int = data.get("last_block", TROVE_INDEX_START_BLOCK - 1)
+        self.seq: int = data.get("seq", 0)
+        self.troves: dict[str, Entry] = data.get("troves", {})
+        self.batches: dict[str, Entry] = data.get("batches", {})
+        self.trove_batch: dict[str, str] = data.get("trove_batch", {})
+        self.ready = False  # set once a sync catches up with the chain head
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "last_block": self.last_block,
+            "seq": self.seq,
+            "troves": self.troves,
+            "batches": self.batches,
+            "trove_batch": self.trove_batch,
+        }
+
+    # -------------------------------------------------------------------------
+    # Sync
+    # -------------------------------------------------------------------------
+
+    def sync(self, w3: Web3) -> bool:
+        """Apply new TroveManager events up to the head. Returns True if anything changed."""
+        contract = w3.eth.contract(address=self.trove_manager, abi=TROVE_MANAGER_ABI)
+        events = {_event_topic(name): getattr(contract.events, name)() for name in _EVENTS}
+        head = w3.eth.block_number
+        changed = False
+
+        for _ in range(TROVE_INDEX_MAX_CHUNKS):
+            if self.last_block >= head:
+                break
+            from_block = self.last_block + 1
+            to_block = min(from_block + TROVE_INDEX_LOG_CHUNK - 1, head)
+            logs = w3.eth.get_logs(
+                {
+                    "address": self.trove_manager,
+                    "fromBlock": from_block,
+                    "toBlock": to_block,
+                    "topics": [[HexBytes(topic) for topic in events]],
+                }
+            )
+            if logs:
+                batch = RpcBatch(w3)
+                batch.block(from_block)
+                batch.block(to_block)
+                from_ts, to_ts = (block["timestamp"] for block in batch.execute())
+                span = max(to_block - from_block, 1)
+                for log in logs:
+                    block = log["blockNumber"]
+                    ts = from_ts + (to_ts - from_ts) * (block - from_block) // span
+                    self._apply(events[bytes(log["topics"][0])].process_log(log), ts)
+                changed = True
+            self.last_block = to_block
+
+        self.ready = self.last_block >= head
+        return changed
+
+    def _apply(self, event: Any, ts: int) -> None:
+        args = event["args"]
+        name = event["event"]
+        if name == "TroveUpdated":
+            trove_id = str(args["_troveId"])
+            self.trove_batch.pop(trove_id, None)
+            if args["_debt"] == 0:
+                self.troves.pop(trove_id, None)
+            else:
+                self._upsert(self.troves, trove_id, args["_annualInterestRate"], args["_debt"], ts)
+        elif name == "BatchedTroveUpdated":
+            trove_id = str(args["_troveId"])
+            self.troves.pop(trove_id, None)
+            self.trove_batch[trove_id] = args["_interestBatchManager"].lower()
+        elif name == "BatchUpdated":
+            manager = args["_interestBatchManager"].lower()
+            if args["_debt"] == 0:
+                self.batches.pop(manager, None)
+            else:
+                self._upsert(self.batches, manager, args["_annualInterestRate"], args["_debt"], ts)
+        elif name == "TroveOperation" and args["_operation"] in (OP_CLOSE_TROVE, OP_LIQUIDATE):
+            trove_id = str(args["_troveId"])
+            self.troves.pop(trove_id, None)
+            self.trove_batch.pop(trove_id, None)
+
+    def _upsert(self, entries: dict[str, Entry], key: str, rate: int, debt: int, ts: int) -> None:
+        existing = entries.get(key)
+        # a rate change re-inserts the node in SortedTroves, so it goes behind existing equal-rate troves
+        if existing is None or existing[0] != rate:
+            self.seq += 1
+            seq = self.seq
+        else:
+            seq = existing[3]
+        entries[key] = [rate, debt, ts, seq]
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def debt_in_front(self, trove_id: int, now_ts: int) -> float | None:
+        """Debt redeemed before `trove_id` (lower rate, or equal rate and inserted earlier), in wei."""
+        key = str(trove_id)
+        with _trove_index_lock:
+            own = self.troves.get(key)
+            if own is None:
+                batch = self.trove_batch.get(key)
+                own = self.batches.get(batch) if batch else None
+            if own is None:
+                return None
+            nodes = [e for e in self.troves.values() if e[1] >= MIN_DEBT] + list(self.batches.values())
+        if not nodes:
+            return 0.0
+        arr = np.array(nodes, dtype=np.float64)
+        rates, debts, updated, seqs = arr[:, 0], arr[:, 1], arr[:, 2], arr[:, 3]
+        debts = debts * (1 + rates / 1e18 * np.maximum(now_ts - updated, 0) / ONE_YEAR)
+
+        order = np.lexsort((seqs, rates))
+        prefix = np.concatenate([[0.0], np.cumsum(debts[order])])
+        # position of our node = number of nodes strictly before it in (rate, seq) order
+        in_front = np.count_nonzero((rates < own[0]) | ((rates == own[0]) & (seqs < own[3])))
+        return float(prefix[in_front])
+
+
+# =============================================================================
+# Registry
+# =============================================================================
+
+# trove manager address -> index
+_indexes: dict[str, TroveIndex] = {}
+
+
+def _load_indexes() -> dict[str, Any]:
+    try:
+        with open(TROVE_INDEX_FILE) as f:
+            return dict(json.load(f))
+    except FileNotFoundError:
+        return {}
+
+
+def trove_index(trove_manager: str) -> TroveIndex:
+    key = trove_manager.lower()
+    index = _indexes.get(key)
+    if index is None:
+        index = _indexes[key] = TroveIndex(trove_manager, _load_indexes().get(key))
+    return index
+
+
+def sync_trove_index(w3: Web3, trove_manager: str) -> TroveIndex:
+    """Bring the index up to date and persist it. Blocking: the backfill can take TROVE_INDEX_MAX_CHUNKS
+    eth_getLogs, so callers on the event loop run it in a thread."""
+    with _trove_index_lock:
+        index = trove_index(trove_manager)
+        if index.sync(w3):
+            data = _load_indexes()
+            data[trove_manager.lower()] = index.to_json()
+            with open(TROVE_INDEX_FILE, "w") as f:
+                json.dump(data, f)
+    return index
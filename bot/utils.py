@@ -1,6 +1,15 @@
+import contextlib
 import json
+from collections.abc import Iterator
+from contextvars import ContextVar
 from typing import Any, cast
 
+from telegram import Bot
+from tinybot import notify_group_chat
+from tinybot.tg import BOT_ACCESS_TOKEN, GROUP_CHAT_ID
+
+from bot.timing import timed
+
 STATE_FILE = "bot_state.json"
 
 
@@ -13,10 +22,49 @@ def load_state() -> dict[str, Any]:
 
 
 def save_state(state: dict[str, Any]) -> None:
+    if _outbox.get() is not None:
+        return  # dry run, see below
     with open(STATE_FILE, "w") as f:
         json.dump(state, f)
 
 
+# =============================================================================
+# Dry Run
+# =============================================================================
+#
+# The one-shot CLI (bot/cli.py) runs handlers inside dry_run(): messages are collected instead of sent
+# to Telegram, and state is read but never written, so a trial run leaves cooldowns and report
+# baselines as they were.
+
+_outbox: ContextVar[list[str] | None] = ContextVar("dry_run_outbox", default=None)
+
+
+@contextlib.contextmanager
+def dry_run() -> Iterator[list[str]]:
+    outbox: list[str] = []
+    token = _outbox.set(outbox)
+    try:
+        yield outbox
+    finally:
+        _outbox.reset(token)
+
+
+async def notify(text: str, strict: bool = False) -> None:
+    """Send to the group chat, or collect the message during a dry run. notify_group_chat only logs a
+    failed send; with strict=True it raises instead, for callers that must know the message arrived."""
+    outbox = _outbox.get()
+    if outbox is not None:
+        outbox.append(text)
+        return
+    with timed("http telegram"):
+        if strict:
+            await Bot(token=BOT_ACCESS_TOKEN).send_message(
+                chat_id=GROUP_CHAT_ID, text=text, parse_mode="HTML", disable_web_page_preview=True
+            )
+        else:
+            await notify_group_chat(text)
+
+
 def format_duration(seconds: int) -> str:
     """Format seconds into a human-readable duration string."""
     if seconds < 60:
@@ -38,3 +86,17 @@ def format_duration(seconds: int) -> str:
 def format_time_ago(seconds: int) -> str:
     """Format seconds into a human-readable time ago string."""
     return f"{format_duration(seconds)} ago"
+
+
+def chunk_messages(header: str, blocks: list[str], max_len: int = 3500) -> list[str]:
+    """Pack blocks into Telegram-sized messages, repeating the header per chunk."""
+    chunks = []
+    current = header
+    for block in blocks:
+        if len(current) + len(block) + 2 > max_len:
+            chunks.append(current)
+            current = header
+        current += "\n\n" + block
+    if current != header:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,100 @@
+import asyncio
+import functools
+import os
+import sys
+import threading
+import time
+import traceback
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+# =============================================================================
+# Watchdog
+# =============================================================================
+#
+# A loop task ticks every LAG_SAMPLE_INTERVAL and records how late it woke up (event-loop lag). Critical
+# handlers are wrapped with `supervised()`, which records their last successful completion against an
+# SLO. `health()` folds both into the uptime push. A separate thread watches the loop's heartbeat so a
+# loop that is stuck in blocking code (and so can't report on itself) still gets a stack dump.
+
+LAG_SAMPLE_INTERVAL = float(os.getenv("LAG_SAMPLE_INTERVAL", "1"))  # seconds
+MAX_LOOP_LAG = float(os.getenv("MAX_LOOP_LAG", "5"))  # seconds of lag before we report unhealthy
+STALL_THRESHOLD = float(os.getenv("STALL_THRESHOLD", "60"))  # no heartbeat for this long = stalled
+LAG_WINDOW = 60  # samples kept for the max-lag figure
+
+_started_at = time.time()
+_heartbeat = time.monotonic()
+_lags: list[float] = []
+# handler name -> (slo seconds, last success ts)
+_handlers: dict[str, tuple[float, float]] = {}
+_lock = threading.Lock()
+_tasks: set[asyncio.Task[None]] = set()
+
+
+def supervised(name: str, slo: float, handler: Callable[[Any], Awaitable[None]]) -> Callable[[Any], Awaitable[None]]:
+    """Wrap a handler so each successful run counts towards its liveness SLO (max seconds between runs)."""
+    with _lock:
+        _handlers[name] = (slo, _started_at)
+
+    @functools.wraps(handler)
+    async def _run(bot: Any) -> None:
+        await handler(bot)
+        with _lock:
+            _handlers[name] = (slo, time.time())
+
+    return _run
+
+
+def health() -> tuple[bool, str, float]:
+    """(healthy, details, current lag in ms) for the uptime push."""
+    now = time.time()
+    problems = []
+    lag = _lags[-1] if _lags else 0.0
+    max_lag = max(_lags, default=0.0)
+    if max_lag > MAX_LOOP_LAG:
+        problems.append(f"loop lag {max_lag:.1f}s")
+    with _lock:
+        handlers = dict(_handlers)
+    for name, (slo, last_ok) in handlers.items():
+        if now - last_ok > slo:
+            problems.append(f"{name} stale {int(now - last_ok)}s")
+    return not problems, ", ".join(problems) or "OK", lag * 1000
+
+
+async def _measure_lag() -> None:
+    global _heartbeat
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(LAG_SAMPLE_INTERVAL)
+        _lags.append(max(loop.time() - start - LAG_SAMPLE_INTERVAL, 0.0))
+        del _lags[:-LAG_WINDOW]
+        _heartbeat = time.monotonic()
+
+
+def _dump_stacks(stalled_for: float) -> None:
+    print(f"⚠️ Event loop stalled for {stalled_for:.0f}s, dumping stacks:", file=sys.stderr)
+    for thread_id, frame in sys._current_frames().items():
+        print(f"\n--- thread {thread_id} ---", file=sys.stderr)
+        traceback.print_stack(frame, file=sys.stderr)
+
+
+def _watch_stalls() -> None:
+    dumped = False
+    while True:
+        time.sleep(STALL_THRESHOLD / 4)
+        stalled_for = time.monotonic() - _heartbeat
+        if stalled_for > STALL_THRESHOLD:
+            if not dumped:  # once per stall
+                _dump_stacks(stalled_for)
+                dumped = True
+        else:
+            dumped = False
+
+
+def start_watchdog() -> None:
+    """Start lag sampling on the running loop, plus the stall-watching thread."""
+    global _heartbeat
+    _heartbeat = time.monotonic()
+    _tasks.add(asyncio.get_running_loop().create_task(_measure_lag()))
+    threading.Thread(target=_watch_stalls, daemon=True, name="watchdog").start()
@@ -0,0 +1,6 @@
+import os
+
+# tinybot.tg reads these at import
+os.environ.setdefault("BOT_ACCESS_TOKEN", "123456:test-token")
+os.environ.setdefault("GROUP_CHAT_ID", "1")
+os.environ.setdefault("DEV_GROUP_CHAT_ID", "2")
@@ -0,0 +1,127 @@
+import socket
+import unittest
+from typing import Any
+from unittest import mock
+
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+from telegram import Update
+from telegram.ext import Application
+
+from bot import tg
+
+SECRET = "s3cret"
+UPDATE = {
+    "update_id": 7,
+    "message": {
+        "message_id": 1,
+        "date": 0,
+        "chat": {"id": 1, "type": "group"},
+        "text": "/status",
+    },
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+class FakeBotApi:
+    """Local stand-in of the Bot API: answers getMe, and setWebhook unless told to fail."""
+
+    def __init__(self, fail_set_webhook: bool = False) -> None:
+        self.fail_set_webhook = fail_set_webhook
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+        self.server = web.Application()
+        self.server.router.add_post("/bot{token}/{method}", self._handle)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.calls.append((method, dict(await request.post())))
+        if method == "getMe":
+            user = {"id": 123456, "is_bot": True, "first_name": "test", "username": "test_bot"}
+            return web.json_response({"ok": True, "result": user})
+        if method == "setWebhook" and not self.fail_set_webhook:
+            return web.json_response({"ok": True, "result": True})
+        return web.json_response({"ok": False, "error_code": 400, "description": "Bad Request"}, status=400)
+
+
+class WebhookTest(unittest.IsolatedAsyncioTestCase):
+    async def _start(self, fail_set_webhook: bool = False) -> tuple[FakeBotApi, Application, str]:  # type: ignore[type-arg]
+        api = FakeBotApi(fail_set_webhook)
+        api_server = TestServer(api.server)
+        await api_server.start_server()
+        self.addAsyncCleanup(api_server.close)
+
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}/tg/hook"
+        patches = {
+            "TG_WEBHOOK_URL": url,
+            "TG_WEBHOOK_SECRET": SECRET,
+            "TG_WEBHOOK_LISTEN": "127.0.0.1",
+            "TG_WEBHOOK_PORT": port,
+        }
+        for name, value in patches.items():
+            patcher = mock.patch.object(tg, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        base_url = str(api_server.make_url("/bot"))
+        app = Application.builder().token("123456:test-token").base_url(base_url).updater(None).build()
+        await app.initialize()
+        self.addAsyncCleanup(app.shutdown)
+        return api, app, url
+
+    async def asyncTearDown(self) -> None:
+        while tg._webhook_runners:
+            await tg._webhook_runners.pop().cleanup()
+
+    async def test_updates_reach_the_queue(self) -> None:
+        api, app, url = await self._start()
+        self.assertTrue(await tg._start_webhook(app))
+        set_webhook = [params for method, params in api.calls if method == "setWebhook"]
+        self.assertEqual(set_webhook[0]["url"], url)
+        self.assertEqual(set_webhook[0]["secret_token"], SECRET)
+
+        async with ClientSession() as session:
+            async with session.post(url, json=UPDATE, headers={"X-Telegram-Bot-Api-Secret-Token": SECRET}) as resp:
+                self.assertEqual(resp.status, 200)
+
+        update = app.update_queue.get_nowait()
+        assert isinstance(update, Update) and update.message is not None
+        self.assertEqual(update.update_id, 7)
+        self.assertEqual(update.message.text, "/status")
+
+    async def test_bad_secret_is_rejected(self) -> None:
+        _, app, url = await self._start()
+        self.assertTrue(await tg._start_webhook(app))
+
+        async with ClientSession() as session:
+            for headers in ({"X-Telegram-Bot-Api-Secret-Token": "wrong"}, {}):
+                async with session.post(url, json=UPDATE, headers=headers) as resp:
+                    self.assertEqual(resp.status, 403)
+            async with session.post(url, data="{", headers={"X-Telegram-Bot-Api-Secret-Token": SECRET}) as resp:
+                self.assertEqual(resp.status, 400)
+
+        self.assertTrue(app.update_queue.empty())
+
+    async def test_failed_set_webhook_leaves_nothing_running(self) -> None:
+        _, app, url = await self._start(fail_set_webhook=True)
+        self.assertFalse(await tg._start_webhook(app))
+        self.assertEqual(tg._webhook_runners, [])
+
+        # the port was released, so polling can take over without a half-open server
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", tg.TG_WEBHOOK_PORT))
+
+    async def test_without_secret_it_falls_back(self) -> None:
+        _, app, _ = await self._start()
+        with mock.patch.object(tg, "TG_WEBHOOK_SECRET", ""):
+            self.assertFalse(await tg._start_webhook(app))
+        self.assertEqual(tg._webhook_runners, [])
+
+
+if __name__ == "__main__":
+    unittest.main()